@@ -1,13 +1,37 @@
+import asyncio
 import logging
+import time
 from typing import Any
 
 import httpx
 
+from backend.cache_snapshot import register_cache
+from backend.circuit_breaker import get_breaker
 from backend.config import RAPIDAPI_KEY, RAPIDAPI_SOUNDNET_HOST
+from backend.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
-_CACHE: dict[str, dict[str, Any]] = {}
+ANALYSIS_CACHE_MAX_ENTRIES = 5000
+ANALYSIS_CACHE_TTL_SECONDS = 7 * 24 * 3600
+# Failed or empty lookups are remembered briefly so retries do not hit the paid API again.
+ANALYSIS_NEGATIVE_TTL_SECONDS = 30 * 60
+ANALYSIS_TIMEOUT_SECONDS = 8.0
+MAX_ANALYSIS_CONCURRENCY = 4
+# A RapidAPI 429 opens the breaker for Retry-After (or the base cooldown, doubling
+# on each consecutive trip); errors and slow calls trip it through the error rate.
+ANALYSIS_BREAKER_BASE_SECONDS = 60.0
+ANALYSIS_BREAKER_MAX_SECONDS = 900.0
+
+_CACHE: TTLCache[dict[str, Any]] = TTLCache(ANALYSIS_CACHE_MAX_ENTRIES, ANALYSIS_CACHE_TTL_SECONDS)
+register_cache("soundnet.metrics", _CACHE)
+_sem = asyncio.Semaphore(MAX_ANALYSIS_CONCURRENCY)
+_breaker = get_breaker(
+    "soundnet",
+    base_cooldown=ANALYSIS_BREAKER_BASE_SECONDS,
+    max_cooldown=ANALYSIS_BREAKER_MAX_SECONDS,
+    slow_call_seconds=ANALYSIS_TIMEOUT_SECONDS * 0.75,
+)
 
 
 def _cache_key(artist: str, title: str) -> str:
@@ -40,6 +64,11 @@ def _normalize_payload(raw: dict[str, Any]) -> dict[str, Any]:
     return normalized
 
 
+def cached_analysis_metrics(artist: str, title: str) -> dict[str, Any] | None:
+    """Cache-only lookup: metrics ({} for a remembered miss), or None if never fetched."""
+    return _CACHE.get(_cache_key(artist, title))
+
+
 async def fetch_analysis_metrics(
     *,
     artist: str,
@@ -48,8 +77,9 @@ async def fetch_analysis_metrics(
     client: httpx.AsyncClient,
 ) -> dict[str, Any]:
     cache_key = _cache_key(artist, title)
-    if cache_key in _CACHE:
-        return _CACHE[cache_key]
+    cached = _CACHE.get(cache_key)
+    if cached is not None:
+        return cached
     if not RAPIDAPI_KEY:
         return {}
 
@@ -58,26 +88,43 @@ async def fetch_analysis_metrics(
         "x-rapidapi-host": RAPIDAPI_SOUNDNET_HOST,
     }
     payload: dict[str, Any] = {}
-    try:
-        if spotify_id:
-            resp = await client.get(
-                f"https://{RAPIDAPI_SOUNDNET_HOST}/pktx/spotify/{spotify_id}",
-                headers=headers,
-            )
+    async with _sem:
+        if not _breaker.allow():
+            return {}
+        started = time.monotonic()
+        try:
+            if spotify_id:
+                resp = await client.get(
+                    f"https://{RAPIDAPI_SOUNDNET_HOST}/pktx/spotify/{spotify_id}",
+                    headers=headers,
+                    timeout=ANALYSIS_TIMEOUT_SECONDS,
+                )
+            else:
+                resp = await client.get(
+                    f"https://{RAPIDAPI_SOUNDNET_HOST}/pktx/analysis",
+                    headers=headers,
+                    params={"song": title, "artist": artist},
+                    timeout=ANALYSIS_TIMEOUT_SECONDS,
+                )
+            if resp.status_code == 429:
+                retry_after = resp.headers.get("Retry-After")
+                _breaker.trip(float(retry_after) if retry_after and retry_after.isdigit() else None)
+                return {}
+            if resp.status_code >= 500:
+                _breaker.record_failure()
+            else:
+                _breaker.record_success(time.monotonic() - started)
             resp.raise_for_status()
             payload = resp.json()
-        else:
-            resp = await client.get(
-                f"https://{RAPIDAPI_SOUNDNET_HOST}/pktx/analysis",
-                headers=headers,
-                params={"song": title, "artist": artist},
-            )
-            resp.raise_for_status()
-            payload = resp.json()
-    except Exception as exc:
-        logger.warning("SoundNet analysis fetch failed for %s - %s: %s", artist, title, exc)
-        return {}
+        except Exception as exc:
+            if isinstance(exc, httpx.TransportError):
+                _breaker.record_failure()
+            else:
+                _breaker.release()
+            logger.warning("SoundNet analysis fetch failed for %s - %s: %s", artist, title, exc)
+            _CACHE.set(cache_key, {}, ANALYSIS_NEGATIVE_TTL_SECONDS)
+            return {}
 
     normalized = _normalize_payload(payload if isinstance(payload, dict) else {})
-    _CACHE[cache_key] = normalized
+    _CACHE.set(cache_key, normalized, None if normalized else ANALYSIS_NEGATIVE_TTL_SECONDS)
     return normalized
@@ -0,0 +1,108 @@
+"""Versioned snapshots of the in-process provider caches.
+
+A running instance periodically writes every registered :class:`TTLCache`
+(Spotify lookups, SoundNet metrics, Last.fm artist tags, known mapping misses)
+to one gzip-compressed JSON file; a new replica loads it during warm-up, before
+``/api/ready`` flips, and serves at warm-cache latency from its first request.
+
+Entries keep their remaining TTL, minus the snapshot's age. A snapshot with a
+different :data:`SNAPSHOT_VERSION`, or an unreadable one, is ignored: the
+replica starts cold, as it did before snapshots existed. Caches register with
+an encoder/decoder pair when their values are not plain JSON.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from backend.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever a registered cache changes its key or value shape.
+SNAPSHOT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class _Registered:
+    cache: TTLCache
+    encode: Callable[[Any], Any]
+    decode: Callable[[Any], Any]
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+_registry: dict[str, _Registered] = {}
+
+
+def register_cache(
+    name: str,
+    cache: TTLCache,
+    *,
+    encode: Callable[[Any], Any] = _identity,
+    decode: Callable[[Any], Any] = _identity,
+) -> None:
+    """Include *cache* in snapshots under *name*; *encode* must return JSON-serialisable values."""
+    _registry[name] = _Registered(cache, encode, decode)
+
+
+def cache_stats() -> dict[str, dict[str, int]]:
+    """Entries, hits and misses of every registered cache since process start."""
+    return {
+        name: {"entries": len(registered.cache), "hits": registered.cache.hits, "misses": registered.cache.misses}
+        for name, registered in _registry.items()
+    }
+
+
+def export_snapshot(path: str) -> dict[str, int]:
+    """Write all registered caches to *path* atomically; returns entries written per cache."""
+    caches: dict[str, list[list[Any]]] = {}
+    for name, registered in _registry.items():
+        caches[name] = [
+            [key, registered.encode(value), round(remaining, 1)]
+            for key, value, remaining in registered.cache.export_entries()
+        ]
+    payload = {"version": SNAPSHOT_VERSION, "created_at": time.time(), "caches": caches}
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as fh:
+        json.dump(payload, fh, separators=(",", ":"))
+    os.replace(tmp_path, path)
+    return {name: len(entries) for name, entries in caches.items()}
+
+
+def load_snapshot(path: str) -> dict[str, int]:
+    """Load *path* into the registered caches; returns entries loaded per cache ({} when unusable)."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            payload = json.load(fh)
+    except (OSError, ValueError) as exc:
+        logger.warning("Cache snapshot %s unreadable: %s", path, exc)
+        return {}
+    if not isinstance(payload, dict) or payload.get("version") != SNAPSHOT_VERSION:
+        logger.info("Cache snapshot %s has another version; starting cold", path)
+        return {}
+    age = max(0.0, time.time() - float(payload.get("created_at") or 0.0))
+    loaded: dict[str, int] = {}
+    for name, entries in (payload.get("caches") or {}).items():
+        registered = _registry.get(name)
+        if registered is None:
+            continue
+        try:
+            loaded[name] = registered.cache.load_entries(
+                (key, registered.decode(value), remaining - age) for key, value, remaining in entries
+            )
+        except (TypeError, ValueError) as exc:
+            logger.warning("Cache snapshot section %s skipped: %s", name, exc)
+    return loaded
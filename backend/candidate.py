@@ -0,0 +1,93 @@
+"""Internal track row for the enrichment and ranking pipeline.
+
+``TrackInfo`` is the API schema; validating and deep-copying it for every
+candidate on every rerank costs more than the scoring itself. The pipeline
+works on :class:`Candidate` instead, a slotted dataclass with the same fields,
+and converts to ``TrackInfo`` once, for the rows that end up in a response.
+
+Pipeline code replaces a candidate's fields rather than mutating its lists
+and dicts in place, so :meth:`Candidate.copy` can stay shallow.
+"""
+
+from __future__ import annotations
+
+import operator
+from dataclasses import dataclass, field, fields
+
+from backend.models import AudioFeatures, TrackInfo
+
+
+@dataclass(slots=True)
+class Candidate:
+    name: str
+    artists: list[str]
+    album: str = ""
+    album_art: str | None = None
+    preview_url: str | None = None
+    spotify_url: str | None = None
+    spotify_id: str | None = None
+    mapping_source: str | None = None
+    external_links: dict[str, str] = field(default_factory=dict)
+    external_primary_provider: str | None = None
+    spotify_mapping_status: str = "mapped"
+    match_score: float | None = None
+    bpm: float | None = None
+    popularity: int | None = None
+    release_year: int | None = None
+    tags: list[str] = field(default_factory=list)
+    audio_features: AudioFeatures | None = None
+    analysis_metrics: dict[str, float | str | bool | None] = field(default_factory=dict)
+
+    @classmethod
+    def from_info(cls, info: TrackInfo) -> Candidate:
+        """Own copy of *info*; provider caches hand out shared ``TrackInfo`` objects."""
+        return cls(
+            name=info.name,
+            artists=list(info.artists),
+            album=info.album,
+            album_art=info.album_art,
+            preview_url=info.preview_url,
+            spotify_url=info.spotify_url,
+            spotify_id=info.spotify_id,
+            mapping_source=info.mapping_source,
+            external_links=dict(info.external_links),
+            external_primary_provider=info.external_primary_provider,
+            spotify_mapping_status=info.spotify_mapping_status,
+            match_score=info.match_score,
+            bpm=info.bpm,
+            popularity=info.popularity,
+            release_year=info.release_year,
+            tags=list(info.tags),
+            audio_features=info.audio_features,
+            analysis_metrics=dict(info.analysis_metrics),
+        )
+
+    def copy(self) -> Candidate:
+        return Candidate(*_field_values(self))
+
+    def to_info(self) -> TrackInfo:
+        """Response model without re-validation: every field was built from validated data."""
+        return TrackInfo.model_construct(
+            name=self.name,
+            artists=self.artists,
+            album=self.album,
+            album_art=self.album_art,
+            preview_url=self.preview_url,
+            spotify_url=self.spotify_url,
+            spotify_id=self.spotify_id,
+            mapping_source=self.mapping_source,
+            external_links=self.external_links,
+            external_primary_provider=self.external_primary_provider,
+            spotify_mapping_status=self.spotify_mapping_status,
+            match_score=self.match_score,
+            bpm=self.bpm,
+            popularity=self.popularity,
+            release_year=self.release_year,
+            tags=self.tags,
+            audio_features=self.audio_features,
+            analysis_metrics=self.analysis_metrics,
+        )
+
+
+# All fields in declaration order, for the positional constructor call in Candidate.copy.
+_field_values = operator.attrgetter(*(f.name for f in fields(Candidate)))
@@ -0,0 +1,93 @@
+"""Short-lived, in-process store of enriched candidate pools.
+
+A unified search spends nearly all of its time on upstream I/O (Last.fm,
+Deezer, Spotify mapping, MusicBrainz, Odesli, SoundNet). The result of that
+work is kept here under a random pool ID so weight and filter changes can be
+re-scored against the same candidates without calling any provider again.
+Pools also keep the not-yet-enriched Last.fm tail, so "load more" cursors
+enrich only the next slice instead of restarting the pipeline. Pools hold live
+``Candidate`` objects, so the store is per-process only.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from backend.candidate import Candidate
+
+
+@dataclass
+class CandidatePool:
+    seed: Candidate
+    seed_tags: list[str]
+    limit: int
+    strict_mapped_only: bool
+    use_metadata_fallback: bool
+    # Full Last.fm ranking; rows from ``next_offset`` on have not been enriched yet.
+    lastfm_rows: list[dict]
+    listener_tracks: list[Candidate] = field(default_factory=list)
+    audio_tracks: list[Candidate] = field(default_factory=list)
+    # Enriched cursor pages keyed by Last.fm offset: (listener, audio, next offset).
+    pages: dict[int, tuple[list[Candidate], list[Candidate], int]] = field(default_factory=dict)
+    next_offset: int = 0
+    mapping_degraded_reason: str | None = None
+    external_links_degraded_reason: str | None = None
+    # Blend keys whose SoundNet analysis was already attempted for this pool.
+    analyzed_keys: set[str] = field(default_factory=set)
+    # Serializes page enrichment so two requests for one cursor do the work once.
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    created_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def exhausted(self) -> bool:
+        return self.next_offset >= len(self.lastfm_rows)
+
+
+def encode_cursor(pool_id: str, offset: int) -> str:
+    return f"{pool_id}:{offset}"
+
+
+def decode_cursor(cursor: str) -> tuple[str, int] | None:
+    pool_id, _, raw_offset = (cursor or "").rpartition(":")
+    if not pool_id or not raw_offset.isdigit():
+        return None
+    return pool_id, int(raw_offset)
+
+
+class CandidatePoolStore:
+    """LRU-bounded pool store; entries expire ``ttl_seconds`` after their last use."""
+
+    def __init__(self, ttl_seconds: int, max_entries: int) -> None:
+        self._ttl = ttl_seconds
+        self._max_entries = max(1, max_entries)
+        self._items: OrderedDict[str, tuple[CandidatePool, float]] = OrderedDict()
+
+    def _cleanup(self) -> None:
+        now = time.monotonic()
+        expired = [k for k, (_, expires_at) in self._items.items() if expires_at <= now]
+        for key in expired:
+            self._items.pop(key, None)
+
+    def put(self, pool: CandidatePool) -> str:
+        self._cleanup()
+        pool_id = secrets.token_urlsafe(12)
+        self._items[pool_id] = (pool, time.monotonic() + self._ttl)
+        while len(self._items) > self._max_entries:
+            self._items.popitem(last=False)
+        return pool_id
+
+    def get(self, pool_id: str) -> CandidatePool | None:
+        self._cleanup()
+        item = self._items.get(pool_id)
+        if item is None:
+            return None
+        self._items[pool_id] = (item[0], time.monotonic() + self._ttl)
+        self._items.move_to_end(pool_id)
+        return item[0]
+
+    def __len__(self) -> int:
+        return len(self._items)
@@ -0,0 +1,110 @@
+"""Canonical artist/title keys for clustering track variants.
+
+Last.fm similar lists often carry one song several times: remasters,
+"(Live)", "- Radio Edit", feat. credits. Variants are collapsed to one
+canonical key before any provider call, so each cluster is enriched once and
+``limit`` rows are actually distinct songs. Remixes keep their annotation,
+remixer credit included; they are different recordings, not versions of the
+same one.
+"""
+
+from __future__ import annotations
+
+import re
+
+# Annotations that only name a version of the same recording. In () or [] any
+# mention counts ("(2011 Remaster)", "[feat. X]"); after " - " the whole suffix
+# must be a version label, so "Song - Live Forever" stays its own song.
+_VERSION_WORDS = (
+    r"remaster(?:ed)?|live|radio edit|single edit|edit|version|mono|stereo|"
+    r"acoustic|demo|bonus track|explicit|clean|feat\.?|ft\.?|featuring"
+)
+_BRACKET_VERSION = re.compile(rf"\b(?:{_VERSION_WORDS})(?!\w)", re.IGNORECASE)
+_SUFFIX_VERSION = re.compile(
+    r"(?:\d{4}\s+)?(?:"
+    r"remaster(?:ed)?(?:\s+\d{4})?(?:\s+version)?|"
+    r"live(?:\s+(?:at|from|in|on)\s.+|\s+version|\s+\d{4})?|"
+    r"(?:radio|single|album|original|extended)\s+(?:edit|version|mix)|edit|"
+    r"mono|stereo|acoustic(?:\s+version)?|demo(?:\s+version)?|bonus\s+track|explicit|clean|"
+    r"(?:feat\.?|ft\.?|featuring|with)\s.+"
+    r")",
+    re.IGNORECASE,
+)
+_BRACKETED = re.compile(r"\(([^)]*)\)|\[([^\]]*)\]")
+_DASH = re.compile(r"\s+[-–—]\s+")
+_REMIX = re.compile(r"\bremix\b", re.IGNORECASE)
+_FEATURING = re.compile(r"\s+(?:feat\.?|ft\.?|featuring)\s+.*$", re.IGNORECASE)
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_track_title(value: str) -> str:
+    """Loose title form for fuzzy Spotify matching: drops brackets and everything after feat/remix/edit/version.
+
+    Too lossy for identity; canonical keys use :func:`canonical_title`.
+    """
+    normalized = value.lower()
+    normalized = re.sub(r"\([^)]*\)", " ", normalized)
+    normalized = re.sub(r"\[[^\]]*\]", " ", normalized)
+    normalized = re.sub(r"\b(feat|ft|remix|edit|version)\b.*$", " ", normalized)
+    normalized = re.sub(r"[^a-z0-9\s]", " ", normalized)
+    normalized = re.sub(r"\s+", " ", normalized).strip()
+    return normalized or value.lower().strip()
+
+
+def _plain(value: str) -> str:
+    return _NON_ALNUM.sub(" ", value.lower()).strip()
+
+
+def canonical_title(title: str) -> str:
+    """Title with version annotations removed; remix annotations stay, remixer credit included.
+
+    Only text in (), [] or after " - " is treated as an annotation; the bare
+    title is never cut, so "Another Version of You" keeps every word.
+    """
+    title = title or ""
+    parts = _DASH.split(title)
+    bare, suffixes = parts[0], parts[1:]
+    annotations = [a or b for a, b in _BRACKETED.findall(bare)]
+    bare = _BRACKETED.sub(" ", bare)
+    kept: list[str] = []
+    for annotation in annotations:
+        if _REMIX.search(annotation) or not _BRACKET_VERSION.search(annotation):
+            kept.append(annotation)
+    for suffix in suffixes:
+        for annotation in [a or b for a, b in _BRACKETED.findall(suffix)] + [_BRACKETED.sub(" ", suffix)]:
+            annotation = annotation.strip()
+            if annotation and (_REMIX.search(annotation) or not _SUFFIX_VERSION.fullmatch(annotation)):
+                kept.append(annotation)
+    key = _plain(" ".join([bare, *kept]))
+    return key or title.lower().strip()
+
+
+def canonical_artist(artist: str) -> str:
+    artist = artist or ""
+    return _plain(_FEATURING.sub("", artist)) or artist.lower().strip()
+
+
+def canonical_key(artist: str, title: str) -> str:
+    return f"{canonical_artist(artist)}::{canonical_title(title)}"
+
+
+def dedupe_lastfm_rows(rows: list[dict], *, drop_keys: set[str] | None = None) -> list[dict]:
+    """One row per canonical key, in first-seen order, keeping the cluster's best match.
+
+    The representative is the variant with the shortest title (usually the
+    plain studio version). Rows whose key is in *drop_keys* are removed.
+    """
+    clusters: dict[str, dict] = {}
+    for row in rows:
+        key = canonical_key(row["artist"], row["name"])
+        if drop_keys and key in drop_keys:
+            continue
+        current = clusters.get(key)
+        if current is None:
+            clusters[key] = dict(row)
+            continue
+        best_match = max(current["match"], row["match"])
+        if len(row["name"]) < len(current["name"]):
+            current = clusters[key] = dict(row)
+        current["match"] = best_match
+    return list(clusters.values())
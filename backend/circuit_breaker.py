@@ -0,0 +1,327 @@
+"""Circuit breakers for upstream providers.
+
+Every provider client asks its breaker before calling out and reports how the
+call went. A breaker is *closed* while the provider is healthy, *open* (calls
+fail fast with :class:`CircuitOpen`) after it trips, and *half-open* once the
+cooldown has elapsed: one probe call is let through, and its outcome either
+closes the breaker or trips it again with a doubled cooldown.
+
+A breaker trips when the recent error rate crosses its threshold (slow calls
+count as errors) or immediately on an explicit :meth:`CircuitBreaker.trip`,
+e.g. a 429. A provider's Retry-After sets the cooldown; otherwise it doubles
+with each consecutive trip up to ``max_cooldown``. The trip state (open-until,
+consecutive trips, probe ownership) lives in a :class:`BreakerStore`; with the
+Redis store all workers trip and recover together. Call outcomes stay per
+process.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+# How long a half-open probe may stay unanswered before another caller may probe.
+PROBE_TIMEOUT_SECONDS = 30.0
+# Redis-backed state is re-read at most this often per breaker and process.
+REDIS_STATE_REFRESH_SECONDS = 1.0
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a provider whose breaker is open."""
+
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self.name = name
+
+
+@dataclass
+class BreakerState:
+    # Wall-clock time, so state written by one host is meaningful on another.
+    open_until: float = 0.0
+    trips: int = 0
+
+
+class BreakerStore:
+    backend_key = "none"
+
+    def load(self, name: str) -> BreakerState:
+        raise NotImplementedError
+
+    def save(self, name: str, state: BreakerState) -> None:
+        raise NotImplementedError
+
+    def update(self, name: str, change: Callable[[BreakerState], BreakerState]) -> BreakerState:
+        """Atomically replace the state with ``change(state)`` and return the new state."""
+        raise NotImplementedError
+
+    def try_probe(self, name: str) -> bool:
+        raise NotImplementedError
+
+    def release_probe(self, name: str) -> None:
+        raise NotImplementedError
+
+
+class MemoryBreakerStore(BreakerStore):
+    backend_key = "memory"
+
+    def __init__(self) -> None:
+        self._states: dict[str, BreakerState] = {}
+        self._probes: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def load(self, name: str) -> BreakerState:
+        with self._lock:
+            state = self._states.get(name)
+            return BreakerState(state.open_until, state.trips) if state else BreakerState()
+
+    def save(self, name: str, state: BreakerState) -> None:
+        with self._lock:
+            self._states[name] = BreakerState(state.open_until, state.trips)
+
+    def update(self, name: str, change: Callable[[BreakerState], BreakerState]) -> BreakerState:
+        with self._lock:
+            current = self._states.get(name)
+            state = change(BreakerState(current.open_until, current.trips) if current else BreakerState())
+            self._states[name] = BreakerState(state.open_until, state.trips)
+            return state
+
+    def try_probe(self, name: str) -> bool:
+        now = time.time()
+        with self._lock:
+            if self._probes.get(name, 0.0) > now:
+                return False
+            self._probes[name] = now + PROBE_TIMEOUT_SECONDS
+            return True
+
+    def release_probe(self, name: str) -> None:
+        self._probes.pop(name, None)
+
+
+class RedisBreakerStore(BreakerStore):
+    backend_key = "redis"
+
+    def __init__(self, redis_url: str, key_prefix: str = "catid:cb:") -> None:
+        import redis
+
+        self._redis = redis.Redis.from_url(redis_url, decode_responses=True)
+        self._prefix = key_prefix
+        self._cached: dict[str, tuple[BreakerState, float]] = {}
+
+    def load(self, name: str) -> BreakerState:
+        cached = self._cached.get(name)
+        now = time.monotonic()
+        if cached and cached[1] > now:
+            return BreakerState(cached[0].open_until, cached[0].trips)
+        try:
+            raw = self._redis.hgetall(f"{self._prefix}{name}")
+            state = BreakerState(float(raw.get("open_until", 0.0)), int(raw.get("trips", 0)))
+        except Exception as exc:
+            logger.warning("Circuit breaker state read failed for %s: %s", name, exc)
+            state = cached[0] if cached else BreakerState()
+        self._cached[name] = (state, now + REDIS_STATE_REFRESH_SECONDS)
+        return BreakerState(state.open_until, state.trips)
+
+    def save(self, name: str, state: BreakerState) -> None:
+        self._cached[name] = (
+            BreakerState(state.open_until, state.trips), time.monotonic() + REDIS_STATE_REFRESH_SECONDS,
+        )
+        try:
+            self._redis.hset(
+                f"{self._prefix}{name}", mapping={"open_until": state.open_until, "trips": state.trips},
+            )
+        except Exception as exc:
+            logger.warning("Circuit breaker state write failed for %s: %s", name, exc)
+
+    def update(self, name: str, change: Callable[[BreakerState], BreakerState]) -> BreakerState:
+        key = f"{self._prefix}{name}"
+
+        def apply(pipe) -> BreakerState:
+            raw = pipe.hgetall(key)
+            state = change(BreakerState(float(raw.get("open_until", 0.0)), int(raw.get("trips", 0))))
+            pipe.multi()
+            pipe.hset(key, mapping={"open_until": state.open_until, "trips": state.trips})
+            return state
+
+        try:
+            # WATCH/MULTI: retried if another worker writes the state in between.
+            state = self._redis.transaction(apply, key, value_from_callable=True)
+        except Exception as exc:
+            logger.warning("Circuit breaker state update failed for %s: %s", name, exc)
+            state = change(self.load(name))
+        self._cached[name] = (
+            BreakerState(state.open_until, state.trips), time.monotonic() + REDIS_STATE_REFRESH_SECONDS,
+        )
+        return state
+
+    def try_probe(self, name: str) -> bool:
+        try:
+            probe_key = f"{self._prefix}{name}:probe"
+            return bool(self._redis.set(probe_key, "1", nx=True, ex=int(PROBE_TIMEOUT_SECONDS)))
+        except Exception:
+            return True
+
+    def release_probe(self, name: str) -> None:
+        try:
+            self._redis.delete(f"{self._prefix}{name}:probe")
+        except Exception:
+            pass
+
+
+_store: BreakerStore = MemoryBreakerStore()
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        *,
+        base_cooldown: float,
+        max_cooldown: float,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float | None = None,
+        window: int = 20,
+        min_calls: int = 10,
+    ) -> None:
+        self.name = name
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.min_calls = min_calls
+        # True for a failed (or too slow) call.
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._probing = False
+
+    def remaining(self) -> float:
+        """Seconds until the breaker turns half-open; 0 when closed or half-open."""
+        return max(0.0, _store.load(self.name).open_until - time.time())
+
+    @property
+    def state(self) -> str:
+        state = _store.load(self.name)
+        if state.trips == 0:
+            return "closed"
+        return "open" if state.open_until > time.time() else "half_open"
+
+    def blocked(self) -> bool:
+        """True while open. A pure check: half-open counts as not blocked and takes no probe."""
+        return self.remaining() > 0
+
+    def allow(self) -> bool:
+        """Closed: always. Open: never. Half-open: one probe at a time."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "open" or not _store.try_probe(self.name):
+            return False
+        self._probing = True
+        return True
+
+    def release(self) -> None:
+        """The call ended without an answer (cancelled, deadline): free the probe, keep the state."""
+        if self._probing:
+            self._probing = False
+            _store.release_probe(self.name)
+
+    def record_success(self, elapsed_seconds: float | None = None) -> None:
+        slow = (
+            self.slow_call_seconds is not None
+            and elapsed_seconds is not None
+            and elapsed_seconds > self.slow_call_seconds
+        )
+        if self.state == "half_open":
+            self.release()
+            _store.save(self.name, BreakerState())
+            self._outcomes.clear()
+            logger.info("Circuit breaker %s closed", self.name)
+            return
+        self._record(slow)
+
+    def record_failure(self) -> None:
+        if self.state == "half_open":
+            self.trip()
+            return
+        self._record(True)
+
+    def _record(self, failed: bool) -> None:
+        self._outcomes.append(failed)
+        if len(self._outcomes) >= self.min_calls and sum(self._outcomes) / len(self._outcomes) >= self.failure_rate:
+            self.trip()
+
+    def trip(self, retry_after: float | None = None) -> None:
+        """Open for *retry_after* when the provider sent one, else for the capped doubling backoff.
+
+        Tripping an already open breaker (e.g. several 429s in flight) only extends
+        it to *retry_after*; it does not count as another trip.
+        """
+        self.release()
+        now = time.time()
+        already_open = False
+
+        def change(state: BreakerState) -> BreakerState:
+            nonlocal already_open
+            # May run more than once when a Redis transaction is retried.
+            already_open = state.open_until > now
+            if already_open:
+                if retry_after:
+                    state.open_until = max(state.open_until, now + retry_after)
+                return state
+            state.trips += 1
+            backoff = min(self.max_cooldown, self.base_cooldown * (2 ** (state.trips - 1)))
+            state.open_until = now + max(1.0, retry_after or backoff)
+            return state
+
+        state = _store.update(self.name, change)
+        self._outcomes.clear()
+        if not already_open:
+            logger.warning(
+                "Circuit breaker %s open for %.0fs (trip %d)", self.name, state.open_until - now, state.trips,
+            )
+
+    def snapshot(self) -> dict[str, object]:
+        return {
+            "state": self.state,
+            "remaining_seconds": round(self.remaining(), 1),
+            "recent_calls": len(self._outcomes),
+            "recent_failures": sum(self._outcomes),
+        }
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(name: str, **config) -> CircuitBreaker:
+    """The process-wide breaker for *name*; *config* applies when it is first created."""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = _breakers[name] = CircuitBreaker(name, **config)
+    return breaker
+
+
+def breaker_remaining(name: str) -> float:
+    breaker = _breakers.get(name)
+    return breaker.remaining() if breaker else 0.0
+
+
+def breaker_snapshot() -> dict[str, dict[str, object]]:
+    return {name: breaker.snapshot() for name, breaker in sorted(_breakers.items())}
+
+
+def configure_breaker_store(store: BreakerStore) -> None:
+    global _store
+    _store = store
+
+
+def build_breaker_store(backend: str, redis_url: str) -> BreakerStore:
+    if backend == "redis":
+        try:
+            return RedisBreakerStore(redis_url)
+        except Exception as exc:
+            logger.warning("Circuit breaker backend redis unavailable, falling back to memory: %s", exc)
+    return MemoryBreakerStore()
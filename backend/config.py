@@ -41,12 +41,39 @@ LASTFM_API_KEY = os.getenv("LASTFM_API_KEY", "").strip()
 SESSION_STORE_BACKEND = os.getenv("SESSION_STORE_BACKEND", "memory").strip().lower()
 SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", "3600").strip() or "3600")
 REDIS_URL = os.getenv("REDIS_URL", "").strip()
+CANDIDATE_POOL_TTL_SECONDS = int(os.getenv("CANDIDATE_POOL_TTL_SECONDS", "900").strip() or "900")
+CANDIDATE_POOL_MAX_ENTRIES = int(os.getenv("CANDIDATE_POOL_MAX_ENTRIES", "256").strip() or "256")
+# Cross-provider track identity registry: sqlite (default) | redis | memory | none
+IDENTITY_REGISTRY_BACKEND = os.getenv("IDENTITY_REGISTRY_BACKEND", "sqlite").strip().lower()
+IDENTITY_REGISTRY_PATH = os.getenv("IDENTITY_REGISTRY_PATH", "data/identity_registry.sqlite3").strip()
+IDENTITY_TTL_SECONDS = int(os.getenv("IDENTITY_TTL_SECONDS", str(30 * 24 * 3600)).strip() or "2592000")
+IDENTITY_MIN_CONFIDENCE = float(os.getenv("IDENTITY_MIN_CONFIDENCE", "0.8").strip() or "0.8")
+MUSICBRAINZ_INDEX_PATH = os.getenv("MUSICBRAINZ_INDEX_PATH", "data/musicbrainz.sqlite3").strip()
+# Provider/mapping cache snapshot, loaded at warm-up and rewritten every interval
+# (and at shutdown). Empty path disables snapshots; interval <= 0 only loads.
+CACHE_SNAPSHOT_PATH = os.getenv("CACHE_SNAPSHOT_PATH", "data/cache_snapshot.json.gz").strip()
+CACHE_SNAPSHOT_INTERVAL_SECONDS = int(os.getenv("CACHE_SNAPSHOT_INTERVAL_SECONDS", "600").strip() or "600")
+# Tags + measured audio features recorded for scripts/train_tag_model.py: sqlite (default) | memory | none
+FEATURE_SAMPLES_BACKEND = os.getenv("FEATURE_SAMPLES_BACKEND", "sqlite").strip().lower()
+FEATURE_SAMPLES_PATH = os.getenv("FEATURE_SAMPLES_PATH", "data/feature_samples.sqlite3").strip()
+# Learned tag -> feature weights loaded at warm-up; missing file keeps the hand-written tag table.
+TAG_FEATURE_MODEL_PATH = os.getenv("TAG_FEATURE_MODEL_PATH", "data/tag_feature_model.json").strip()
+CIRCUIT_BREAKER_BACKEND = os.getenv("CIRCUIT_BREAKER_BACKEND", "memory").strip().lower()
+MAPPING_MISS_BACKEND = os.getenv("MAPPING_MISS_BACKEND", "memory").strip().lower()
+MAPPING_MISS_TTL_SECONDS = int(os.getenv("MAPPING_MISS_TTL_SECONDS", str(3 * 24 * 3600)).strip() or "259200")
+MAPPING_MISS_MAX_ENTRIES = int(os.getenv("MAPPING_MISS_MAX_ENTRIES", "50000").strip() or "50000")
 
 ALLOWED_ORIGINS = _parse_csv_env(
     "ALLOWED_ORIGINS",
     ["http://localhost:8000", "https://localhost:8000"],
 )
 ENABLE_DEBUG_ENDPOINT = _bool_env("ENABLE_DEBUG_ENDPOINT", APP_ENV != "production")
+# Open pooled provider connections at startup (off for offline/dev runs without network).
+HTTP_PREWARM_ON_STARTUP = _bool_env("HTTP_PREWARM_ON_STARTUP", True)
+# /api/ready flips once startup warm-up finishes, or after this many seconds regardless.
+WARMUP_TIMEOUT_SECONDS = float(os.getenv("WARMUP_TIMEOUT_SECONDS", "20").strip() or "20")
+# gzip/brotli-compress large similar-tracks responses (Caddy also compresses; disable to leave it to the proxy).
+RESPONSE_COMPRESSION = _bool_env("RESPONSE_COMPRESSION", True)
 
 
 def _validate_runtime_config() -> None:
@@ -68,6 +95,12 @@ def _validate_runtime_config() -> None:
             raise RuntimeError("ENABLE_DEBUG_ENDPOINT must be false in production.")
         if SESSION_STORE_BACKEND == "redis" and not REDIS_URL:
             raise RuntimeError("REDIS_URL must be set when SESSION_STORE_BACKEND=redis.")
+        if IDENTITY_REGISTRY_BACKEND == "redis" and not REDIS_URL:
+            raise RuntimeError("REDIS_URL must be set when IDENTITY_REGISTRY_BACKEND=redis.")
+        if CIRCUIT_BREAKER_BACKEND == "redis" and not REDIS_URL:
+            raise RuntimeError("REDIS_URL must be set when CIRCUIT_BREAKER_BACKEND=redis.")
+        if MAPPING_MISS_BACKEND == "redis" and not REDIS_URL:
+            raise RuntimeError("REDIS_URL must be set when MAPPING_MISS_BACKEND=redis.")
 
 
 _validate_runtime_config()
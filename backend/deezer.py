@@ -2,19 +2,32 @@ import asyncio
 import logging
 
 import httpx
-from backend.http_policy import aget_json_with_policy
+from backend.circuit_breaker import CircuitOpen, get_breaker
+from backend.http_policy import DeadlineExceeded, aget_json_with_policy
 
 DEEZER_SEARCH = "https://api.deezer.com/search"
 DEEZER_TRACK = "https://api.deezer.com/track"
 _sem = asyncio.Semaphore(8)
+_breaker = get_breaker("deezer", base_cooldown=10.0, max_cooldown=120.0, slow_call_seconds=4.0)
 _EMPTY = {"preview": None, "bpm": None, "isrc": None, "link": None, "album_art": None}
+# Same empty values, but distinguishable so callers can tell a miss from a skipped or failed lookup.
+_SKIPPED = dict(_EMPTY)
+_FAILED = dict(_EMPTY)
 logger = logging.getLogger(__name__)
 
 
-async def fetch_track_info(client: httpx.AsyncClient, artist: str, track_name: str) -> dict:
+async def fetch_track_info(
+    client: httpx.AsyncClient,
+    artist: str,
+    track_name: str,
+    *,
+    deadline: float | None = None,
+) -> dict:
     """Search Deezer for a track and return preview URL + BPM.
 
     Returns dict with keys: preview (str|None), bpm (float|None), isrc (str|None), link (str|None), album_art (str|None).
+    Calls are clamped to *deadline* (monotonic); past it the lookup degrades to empty values.
+    Skipped and failed lookups also return empty values; :func:`lookup_outcome` tells them apart.
     """
     async with _sem:
         try:
@@ -25,6 +38,9 @@ async def fetch_track_info(client: httpx.AsyncClient, artist: str, track_name: s
                 params={"q": query},
                 timeout=5,
                 attempts=3,
+                deadline=deadline,
+                hedge="deezer.search",
+                breaker=_breaker,
             )
             items = search_payload.get("data", [])
             if not items:
@@ -47,6 +63,9 @@ async def fetch_track_info(client: httpx.AsyncClient, artist: str, track_name: s
                     params={},
                     timeout=5,
                     attempts=3,
+                    deadline=deadline,
+                    hedge="deezer.track",
+                    breaker=_breaker,
                 )
                 bpm = detail.get("bpm") or None
                 isrc_raw = detail.get("isrc")
@@ -57,6 +76,17 @@ async def fetch_track_info(client: httpx.AsyncClient, artist: str, track_name: s
                     bpm = None
 
             return {"preview": preview, "bpm": bpm, "isrc": isrc, "link": deezer_link, "album_art": album_art}
+        except (DeadlineExceeded, CircuitOpen):
+            return _SKIPPED
         except Exception:
             logger.warning("Deezer lookup failed for '%s - %s'", artist, track_name, exc_info=True)
-            return _EMPTY
+            return _FAILED
+
+
+def lookup_outcome(info: dict) -> str:
+    """Classify a :func:`fetch_track_info` result as ``"ok"``, ``"skipped"`` (deadline/circuit) or ``"failed"``."""
+    if info is _SKIPPED:
+        return "skipped"
+    if info is _FAILED:
+        return "failed"
+    return "ok"
@@ -0,0 +1,177 @@
+"""Per-request enrichment budgets derived from observed provider health.
+
+`_enrich_lastfm` used to enforce fixed call caps through shared counters. The
+controller below sizes each provider's allowance from what the process has
+recently observed (step latency, error rate) plus any active cooldown, and
+hands out calls in candidate-rank order so the top of the Last.fm ranking is
+fully enriched before the tail gets anything.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+
+# Before the first observation a provider is assumed to answer within this many seconds.
+DEFAULT_STEP_LATENCY_SECONDS = {
+    "deezer": 0.6,
+    "spotify": 0.8,
+    "musicbrainz": 0.9,
+    "tags": 0.5,
+    "odesli": 0.9,
+}
+MIN_STEP_LATENCY_SECONDS = 0.05
+HEALTH_EWMA_ALPHA = 0.2
+# Without new samples, observed health drifts back to the defaults with this half-life,
+# so a provider that was starved of calls after a bad spell gets tried again.
+HEALTH_DECAY_HALF_LIFE_SECONDS = 120.0
+# Calls every provider outside a cooldown gets per run, however bad its health looks.
+MIN_PROBE_CALLS = 2
+# admits() never expects a single call to take more than this share of the time budget.
+MAX_ADMIT_LATENCY_FRACTION = 0.5
+# Tail candidates stop starting new provider calls once this share of the budget is left.
+TAIL_RESERVE_FRACTION = 0.25
+# A call is only started when the remaining time covers its expected latency times this factor.
+DEADLINE_SAFETY_FACTOR = 1.2
+
+
+@dataclass
+class StepHealth:
+    latency_seconds: float
+    error_rate: float = 0.0
+    samples: int = 0
+    updated_at: float = 0.0
+
+
+_step_health: dict[str, StepHealth] = {}
+
+
+def _default_latency(provider: str) -> float:
+    return DEFAULT_STEP_LATENCY_SECONDS.get(provider, 1.0)
+
+
+def step_health(provider: str) -> StepHealth:
+    """Current estimate for *provider*: the last observations, decayed toward the defaults by their age."""
+    health = _step_health.get(provider)
+    default = _default_latency(provider)
+    if health is None:
+        return StepHealth(latency_seconds=default)
+    weight = 0.5 ** (max(0.0, time.monotonic() - health.updated_at) / HEALTH_DECAY_HALF_LIFE_SECONDS)
+    return StepHealth(
+        latency_seconds=default + weight * (health.latency_seconds - default),
+        error_rate=weight * health.error_rate,
+        samples=health.samples,
+        updated_at=health.updated_at,
+    )
+
+
+def record_step(provider: str, elapsed_seconds: float, ok: bool) -> None:
+    """Fold one observed provider step into the process-wide health estimate.
+
+    The average starts from the defaults rather than from the first sample, so
+    one early failure or slow call cannot take a provider out on its own.
+    """
+    health = step_health(provider)
+    health.latency_seconds += HEALTH_EWMA_ALPHA * (elapsed_seconds - health.latency_seconds)
+    health.latency_seconds = max(MIN_STEP_LATENCY_SECONDS, health.latency_seconds)
+    health.error_rate += HEALTH_EWMA_ALPHA * ((0.0 if ok else 1.0) - health.error_rate)
+    health.samples += 1
+    health.updated_at = time.monotonic()
+    _step_health[provider] = health
+
+
+class EnrichBudget:
+    """Call allowances for one enrichment run.
+
+    ``ceilings`` are the most calls a perfectly healthy provider may receive.
+    The actual allocation is the number of calls that fit into the time budget
+    at the observed latency across ``concurrency`` workers, discounted by the
+    observed error rate but never below ``MIN_PROBE_CALLS``, and zero while the
+    provider is cooling down for the whole budget. ``acquire`` checks and
+    consumes in one synchronous step, so concurrent tasks on the event loop
+    cannot overshoot an allocation.
+    """
+
+    def __init__(
+        self,
+        *,
+        ceilings: dict[str, int],
+        time_budget: float,
+        concurrency: int,
+        priority_slots: int,
+        cooldowns: dict[str, float] | None = None,
+    ) -> None:
+        self.time_budget = time_budget
+        self.deadline = time.monotonic() + time_budget
+        self.priority_slots = priority_slots
+        cooldowns = cooldowns or {}
+        self._allocations = {
+            provider: self._allocate(
+                provider,
+                ceiling,
+                concurrency=concurrency,
+                cooldown=max(0.0, cooldowns.get(provider, 0.0)),
+            )
+            for provider, ceiling in ceilings.items()
+        }
+        self._used = {provider: 0 for provider in ceilings}
+        self._degraded: dict[str, str] = {}
+
+    def _allocate(self, provider: str, ceiling: int, *, concurrency: int, cooldown: float) -> int:
+        usable = self.time_budget - cooldown
+        if usable <= 0:
+            return 0
+        health = step_health(provider)
+        slots = concurrency * usable / max(health.latency_seconds, MIN_STEP_LATENCY_SECONDS)
+        # The probe calls keep samples coming in, so a bad estimate can recover.
+        return min(ceiling, max(MIN_PROBE_CALLS, int(slots * (1.0 - health.error_rate))))
+
+    def allocation(self, provider: str) -> int:
+        return self._allocations.get(provider, 0)
+
+    def remaining_seconds(self) -> float:
+        return self.deadline - time.monotonic()
+
+    def expired(self) -> bool:
+        return self.remaining_seconds() <= 0
+
+    def is_priority(self, rank: int) -> bool:
+        return rank < self.priority_slots
+
+    def admits(self, rank: int, provider: str = "deezer") -> bool:
+        """True if a candidate at *rank* should still start a call to *provider*."""
+        remaining = self.remaining_seconds()
+        expected = min(step_health(provider).latency_seconds, self.time_budget * MAX_ADMIT_LATENCY_FRACTION)
+        if remaining <= expected * DEADLINE_SAFETY_FACTOR:
+            return False
+        if not self.is_priority(rank) and remaining <= self.time_budget * TAIL_RESERVE_FRACTION:
+            return False
+        return True
+
+    def available(self, provider: str, rank: int) -> bool:
+        """Like :meth:`acquire` but without consuming or recording anything."""
+        return self.admits(rank, provider) and self._used.get(provider, 0) < self._allocations.get(provider, 0)
+
+    def acquire(self, provider: str, rank: int, *, reason_key: str | None = None) -> bool:
+        """Reserve one call to *provider* for the candidate at *rank*.
+
+        On refusal, records a degraded reason under *reason_key* (defaults to the provider).
+        """
+        key = reason_key or provider
+        if not self.admits(rank, provider):
+            self._degraded[key] = "enrich_time_budget_exceeded"
+            return False
+        if self._used.get(provider, 0) >= self._allocations.get(provider, 0):
+            self._degraded[key] = f"{key}_limit_reached"
+            return False
+        self._used[provider] = self._used.get(provider, 0) + 1
+        return True
+
+    def mark_degraded(self, key: str, reason: str) -> None:
+        self._degraded[key] = reason
+
+    def degraded_reason(self, key: str) -> str | None:
+        return self._degraded.get(key)
+
+    def observe(self, provider: str, started: float, ok: bool = True) -> None:
+        record_step(provider, time.monotonic() - started, ok)
@@ -0,0 +1,56 @@
+"""Tiny dependency graph runner for per-candidate enrichment steps.
+
+Each step declares the steps whose results it needs. Steps start as soon as
+those inputs resolve, so independent provider calls (Last.fm tags vs. the
+Deezer → Spotify → MusicBrainz mapping chain) overlap and a candidate costs
+its critical path instead of the sum of all steps.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+StepFn = Callable[[dict[str, Any]], Awaitable[Any]]
+
+
+class StepGraph:
+    def __init__(self) -> None:
+        self._steps: dict[str, tuple[tuple[str, ...], StepFn]] = {}
+
+    def add(self, name: str, fn: StepFn, *, needs: tuple[str, ...] = ()) -> None:
+        """Register *fn* as step *name*; it receives ``{dep: result}`` for each of *needs*.
+
+        Dependencies must already be registered, which keeps the graph acyclic.
+        """
+        if name in self._steps:
+            raise ValueError(f"Duplicate enrichment step: {name}")
+        missing = [dep for dep in needs if dep not in self._steps]
+        if missing:
+            raise ValueError(f"Step {name} depends on unknown steps: {', '.join(missing)}")
+        self._steps[name] = (needs, fn)
+
+    async def run(self, results: dict[str, Any]) -> dict[str, Any]:
+        """Run every step, writing each result into *results* as soon as it is known.
+
+        If a step raises, the remaining steps are cancelled and the error propagates;
+        *results* still holds whatever finished before that (or before cancellation).
+        """
+        tasks: dict[str, asyncio.Task] = {}
+
+        async def run_step(name: str, needs: tuple[str, ...], fn: StepFn) -> None:
+            if needs:
+                await asyncio.gather(*(tasks[dep] for dep in needs))
+            results[name] = await fn({dep: results[dep] for dep in needs})
+
+        for name, (needs, fn) in self._steps.items():
+            tasks[name] = asyncio.create_task(run_step(name, needs, fn))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        return results
@@ -0,0 +1,104 @@
+"""Prioritized work queue drained by a fixed pool of async workers.
+
+Enrichment used to run as two ``asyncio.gather`` waves (tagged head, then
+tail), so the tail idled while the slowest head candidate finished. Here every
+job sits in one priority queue; workers always take the best-ranked pending
+job, and lower-ranked jobs fill any slot that frees up.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueueStats:
+    workers: int
+    submitted: int = 0
+    completed: int = 0
+    cancelled: int = 0
+    dropped: int = 0
+    peak_depth: int = 0
+    busy_seconds: float = 0.0
+    wall_seconds: float = 0.0
+
+    @property
+    def utilization(self) -> float:
+        """Share of worker time spent running jobs (1.0 = every worker always busy)."""
+        capacity = self.workers * self.wall_seconds
+        return min(1.0, self.busy_seconds / capacity) if capacity > 0 else 0.0
+
+    def as_dict(self) -> dict[str, float | int]:
+        return {
+            "workers": self.workers,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "dropped": self.dropped,
+            "peak_depth": self.peak_depth,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "wall_seconds": round(self.wall_seconds, 3),
+            "utilization": round(self.utilization, 3),
+        }
+
+
+class PriorityWorkQueue:
+    """Run submitted jobs lowest-priority-value first on ``workers`` concurrent workers.
+
+    Jobs may be submitted before or while :meth:`drain` runs. Draining stops
+    when the queue is empty and idle, or at ``timeout``: in-flight jobs are then
+    cancelled and jobs never started are counted as dropped.
+    """
+
+    def __init__(self, workers: int) -> None:
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._seq = itertools.count()
+        self.stats = QueueStats(workers=max(1, workers))
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, priority: float, job: Callable[[], Awaitable[None]]) -> None:
+        self._queue.put_nowait((priority, next(self._seq), job))
+        self.stats.submitted += 1
+        self.stats.peak_depth = max(self.stats.peak_depth, self._queue.qsize())
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, job = await self._queue.get()
+            started = time.monotonic()
+            try:
+                await job()
+                self.stats.completed += 1
+            except asyncio.CancelledError:
+                self.stats.cancelled += 1
+                raise
+            except Exception:
+                logger.warning("Queued job failed", exc_info=True)
+                self.stats.completed += 1
+            finally:
+                self.stats.busy_seconds += time.monotonic() - started
+                self._queue.task_done()
+
+    async def drain(self, *, timeout: float | None = None) -> QueueStats:
+        started = time.monotonic()
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.stats.workers)]
+        joiner = asyncio.create_task(self._queue.join())
+        try:
+            await asyncio.wait({joiner}, timeout=timeout)
+        finally:
+            joiner.cancel()
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(joiner, *workers, return_exceptions=True)
+            self.stats.dropped = self._queue.qsize()
+            self.stats.wall_seconds = time.monotonic() - started
+        return self.stats
@@ -0,0 +1,149 @@
+"""Training samples for the learned tag-to-feature model.
+
+Whenever a candidate carries both Last.fm tags and measured audio features
+(SoundNet analysis today), the pair is recorded here, keyed by normalized
+artist/title so repeat sightings overwrite one row. ``scripts/train_tag_model.py``
+reads the samples offline and fits :mod:`backend.tag_model`.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator, Sequence
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from backend.identity_registry import text_key
+
+logger = logging.getLogger(__name__)
+
+# AudioFeatures dimension -> SoundNet metric. SoundNet reports 0-100 percentages.
+SOUNDNET_FEATURE_KEYS = {
+    "energy": "energy",
+    "valence": "happiness",
+    "danceability": "danceability",
+    "acousticness": "acousticness",
+    "instrumentalness": "instrumentalness",
+}
+
+
+@dataclass
+class FeatureSample:
+    artist: str
+    title: str
+    tags: list[str]
+    bpm: float | None
+    # AudioFeatures dimension -> measured value (tempo in BPM, the rest 0..1).
+    features: dict[str, float]
+    source: str
+    updated_at: float = field(default_factory=time.time)
+
+    def key(self) -> str:
+        return text_key(self.artist, self.title)
+
+
+def _unit(percent: float) -> float:
+    # Always a percentage: deciding per value would read 1% as 1.0.
+    return max(0.0, min(1.0, percent / 100.0))
+
+
+def features_from_analysis(metrics: dict[str, Any]) -> dict[str, float]:
+    """Measured AudioFeatures dimensions from SoundNet *metrics* (0..1, tempo in BPM)."""
+    features: dict[str, float] = {}
+    tempo = metrics.get("tempo")
+    if isinstance(tempo, (int, float)) and tempo > 0:
+        features["tempo"] = float(tempo)
+    for dim, key in SOUNDNET_FEATURE_KEYS.items():
+        value = metrics.get(key)
+        if isinstance(value, (int, float)):
+            features[dim] = _unit(float(value))
+    return features
+
+
+class FeatureSampleStore:
+    backend_key = "none"
+
+    def record_many(self, samples: Sequence[FeatureSample]) -> None:
+        raise NotImplementedError
+
+    def iter_samples(self) -> Iterator[FeatureSample]:
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+
+class MemoryFeatureSampleStore(FeatureSampleStore):
+    backend_key = "memory"
+
+    def __init__(self) -> None:
+        self._items: dict[str, FeatureSample] = {}
+
+    def record_many(self, samples: Sequence[FeatureSample]) -> None:
+        for sample in samples:
+            self._items[sample.key()] = sample
+
+    def iter_samples(self) -> Iterator[FeatureSample]:
+        return iter(list(self._items.values()))
+
+    def count(self) -> int:
+        return len(self._items)
+
+
+class SqliteFeatureSampleStore(FeatureSampleStore):
+    backend_key = "sqlite"
+
+    def __init__(self, path: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS feature_samples ("
+                "key TEXT PRIMARY KEY, payload TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def record_many(self, samples: Sequence[FeatureSample]) -> None:
+        rows = [
+            (sample.key(), json.dumps(asdict(sample), separators=(",", ":")), sample.updated_at)
+            for sample in samples
+        ]
+        try:
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO feature_samples (key, payload, updated_at) VALUES (?, ?, ?)",
+                    rows,
+                )
+        except sqlite3.Error as exc:
+            logger.warning("Feature sample write failed: %s", exc)
+
+    def iter_samples(self) -> Iterator[FeatureSample]:
+        with self._lock:
+            rows = self._conn.execute("SELECT payload FROM feature_samples").fetchall()
+        for (payload,) in rows:
+            try:
+                yield FeatureSample(**json.loads(payload))
+            except (TypeError, ValueError):
+                continue
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM feature_samples").fetchone()[0]
+
+
+def build_feature_sample_store(backend: str, *, path: str) -> FeatureSampleStore | None:
+    """Sample store for *backend* (``sqlite``, ``memory``); None when disabled."""
+    if backend in {"", "none", "off"}:
+        return None
+    if backend == "sqlite":
+        try:
+            return SqliteFeatureSampleStore(path)
+        except Exception as exc:
+            logger.warning("Feature sample store %s unavailable, falling back to memory: %s", path, exc)
+    return MemoryFeatureSampleStore()
@@ -0,0 +1,92 @@
+"""Staged evaluation of ``SimilarityFilters``.
+
+Each predicate runs as soon as its input is known during enrichment: BPM right
+after Deezer, tag predicates right after the Last.fm tag fetch, popularity and
+release year once a Spotify mapping exists. A staged check only rejects on a
+*known* value, because a later provider may still fill the field in (SoundNet
+tempo, for example). :meth:`FilterPlan.accepts` is the strict final check that
+``_apply_backend_filters`` applies to fully enriched rows.
+"""
+
+from __future__ import annotations
+
+from backend.candidate import Candidate
+from backend.models import SimilarityFilters
+from backend.tag_categories import INSTRUMENTAL_TAGS, normalize_tag
+
+
+class CandidateRejected(Exception):
+    """Raised by an enrichment step once a filter predicate rejects its candidate."""
+
+    def __init__(self, stage: str) -> None:
+        super().__init__(stage)
+        self.stage = stage
+
+
+def _outside(value: float | None, low: float | None, high: float | None) -> bool:
+    if value is None:
+        return False
+    return (low is not None and value < low) or (high is not None and value > high)
+
+
+class FilterPlan:
+    def __init__(self, filters: SimilarityFilters | None) -> None:
+        self.filters = filters or SimilarityFilters()
+        self.wanted_tags = {normalize_tag(tag) for tag in self.filters.tags_any}
+        self.rejected: dict[str, int] = {}
+
+    @property
+    def needs_bpm(self) -> bool:
+        return self.filters.bpm_min is not None or self.filters.bpm_max is not None
+
+    @property
+    def needs_tags(self) -> bool:
+        return bool(self.wanted_tags) or self.filters.require_instrumental is True
+
+    def _reject(self, stage: str) -> bool:
+        self.rejected[stage] = self.rejected.get(stage, 0) + 1
+        return True
+
+    def rejects_bpm(self, bpm: float | None) -> bool:
+        if _outside(bpm, self.filters.bpm_min, self.filters.bpm_max):
+            return self._reject("bpm")
+        return False
+
+    def rejects_tags(self, tags: list[str]) -> bool:
+        """*tags* must already be normalized."""
+        if not self.needs_tags:
+            return False
+        tag_set = set(tags)
+        if self.filters.require_instrumental is True and not (tag_set & INSTRUMENTAL_TAGS):
+            return self._reject("tags")
+        if self.wanted_tags and not (tag_set & self.wanted_tags):
+            return self._reject("tags")
+        return False
+
+    def rejects_metadata(self, popularity: int | None, release_year: int | None) -> bool:
+        f = self.filters
+        if _outside(popularity, f.popularity_min, f.popularity_max) or _outside(
+            release_year, f.release_year_min, f.release_year_max
+        ):
+            return self._reject("metadata")
+        return False
+
+    def admits(self, track: Candidate) -> bool:
+        """Lenient check on known values only (no rejection counting)."""
+        f = self.filters
+        tags = [normalize_tag(tag) for tag in (track.tags or [])]
+        if _outside(track.bpm, f.bpm_min, f.bpm_max):
+            return False
+        if _outside(track.popularity, f.popularity_min, f.popularity_max):
+            return False
+        if _outside(track.release_year, f.release_year_min, f.release_year_max):
+            return False
+        if f.require_instrumental is True and not (set(tags) & INSTRUMENTAL_TAGS):
+            return False
+        return not self.wanted_tags or bool(set(tags) & self.wanted_tags)
+
+    def accepts(self, track: Candidate) -> bool:
+        """Final check: like :meth:`admits`, but a BPM filter also drops unknown BPM."""
+        if self.needs_bpm and track.bpm is None:
+            return False
+        return self.admits(track)
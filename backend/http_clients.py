@@ -0,0 +1,156 @@
+"""One pooled HTTP client per upstream provider.
+
+Each provider gets its own connection pool sized to its rate limit, its own
+connect/read timeouts and keep-alive expiry, so a slow provider can only
+exhaust its own pool. Connections are reused across requests (and warmed at
+startup), which keeps TLS handshakes and DNS lookups off the hot path.
+HTTP/2 is used for hosts that support it when the optional ``h2`` package is
+installed (``pip install httpx[http2]``); otherwise clients speak HTTP/1.1.
+
+Async clients serve the request pipeline; sync clients serve code that runs
+in worker threads (Last.fm list fetches, Spotify token exchange).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+import threading
+from dataclasses import dataclass
+
+import httpx
+
+from backend.config import RAPIDAPI_SOUNDNET_HOST
+
+logger = logging.getLogger(__name__)
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+PREWARM_TIMEOUT_SECONDS = 3.0
+
+
+@dataclass(frozen=True)
+class ProviderHTTPConfig:
+    # Requested during prewarm; any answer (even 4xx) leaves an open connection in the pool.
+    warm_url: str
+    max_connections: int
+    max_keepalive: int
+    connect_timeout: float
+    read_timeout: float
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+    # Off for quota-limited providers, where a warm-up request may count against the quota.
+    prewarm: bool = True
+
+
+PROVIDERS: dict[str, ProviderHTTPConfig] = {
+    # Deezer: 50 requests / 5 s per IP; deezer.fetch_track_info runs 8 at a time.
+    "deezer": ProviderHTTPConfig(
+        "https://api.deezer.com/", max_connections=10, max_keepalive=8,
+        connect_timeout=2.0, read_timeout=5.0, http2=True,
+    ),
+    # Last.fm: ~5 requests / s; 4 async lookups plus the threaded list fetches.
+    "lastfm": ProviderHTTPConfig(
+        "https://ws.audioscrobbler.com/2.0/", max_connections=8, max_keepalive=6,
+        connect_timeout=3.0, read_timeout=10.0,
+    ),
+    # MusicBrainz: 1 request / s per application, so a couple of connections is plenty.
+    "musicbrainz": ProviderHTTPConfig(
+        "https://musicbrainz.org/ws/2/", max_connections=2, max_keepalive=2,
+        connect_timeout=3.0, read_timeout=8.0, keepalive_expiry=15.0, http2=True,
+    ),
+    # Odesli: 10 requests / min without a key.
+    "odesli": ProviderHTTPConfig(
+        "https://api.song.link/v1-alpha.1/", max_connections=4, max_keepalive=2,
+        connect_timeout=3.0, read_timeout=8.0, http2=True, prewarm=False,
+    ),
+    # SoundNet (RapidAPI): audio_analysis caps concurrency at 4.
+    "soundnet": ProviderHTTPConfig(
+        f"https://{RAPIDAPI_SOUNDNET_HOST}/", max_connections=4, max_keepalive=4,
+        connect_timeout=3.0, read_timeout=8.0, http2=True, prewarm=False,
+    ),
+    # Spotify accounts: token exchange/refresh only.
+    "spotify_accounts": ProviderHTTPConfig(
+        "https://accounts.spotify.com/", max_connections=4, max_keepalive=2,
+        connect_timeout=3.0, read_timeout=10.0, http2=True,
+    ),
+}
+
+_async_clients: dict[str, httpx.AsyncClient] = {}
+_sync_clients: dict[str, httpx.Client] = {}
+_sync_lock = threading.Lock()
+
+
+def _client_kwargs(config: ProviderHTTPConfig) -> dict:
+    return {
+        "timeout": httpx.Timeout(config.read_timeout, connect=config.connect_timeout),
+        "limits": httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive,
+            keepalive_expiry=config.keepalive_expiry,
+        ),
+        "http2": config.http2 and HTTP2_AVAILABLE,
+    }
+
+
+def provider_client(provider: str) -> httpx.AsyncClient:
+    """The shared async client for *provider* (a key of :data:`PROVIDERS`)."""
+    client = _async_clients.get(provider)
+    if client is None or client.is_closed:
+        client = _async_clients[provider] = httpx.AsyncClient(**_client_kwargs(PROVIDERS[provider]))
+    return client
+
+
+def provider_sync_client(provider: str) -> httpx.Client:
+    """The shared sync client for *provider*; safe to use from worker threads."""
+    with _sync_lock:
+        client = _sync_clients.get(provider)
+        if client is None or client.is_closed:
+            client = _sync_clients[provider] = httpx.Client(**_client_kwargs(PROVIDERS[provider]))
+        return client
+
+
+async def _warm(provider: str) -> bool:
+    config = PROVIDERS[provider]
+    client = provider_client(provider)
+    # HTTP/2 multiplexes over one connection; HTTP/1.1 needs one per concurrent request.
+    connections = 1 if _client_kwargs(config)["http2"] else min(2, config.max_keepalive)
+    try:
+        await asyncio.gather(*(
+            client.head(config.warm_url, timeout=PREWARM_TIMEOUT_SECONDS) for _ in range(connections)
+        ))
+        return True
+    except httpx.HTTPError as exc:
+        logger.info("HTTP prewarm for %s failed: %s", provider, exc)
+        return False
+
+
+async def prewarm_clients(providers: list[str] | None = None) -> dict[str, bool]:
+    """Open pooled connections to each provider; returns provider -> warmed. Never raises.
+
+    By default only providers with ``prewarm`` set are warmed.
+    """
+    names = providers or [name for name, config in PROVIDERS.items() if config.prewarm]
+    results = await asyncio.gather(*(_warm(name) for name in names))
+    return dict(zip(names, results))
+
+
+async def close_clients() -> None:
+    for client in _async_clients.values():
+        await client.aclose()
+    _async_clients.clear()
+    with _sync_lock:
+        for client in _sync_clients.values():
+            client.close()
+        _sync_clients.clear()
+
+
+def client_stats() -> dict[str, dict[str, object]]:
+    return {
+        name: {
+            "http2": _client_kwargs(PROVIDERS[name])["http2"],
+            "async_open": name in _async_clients and not _async_clients[name].is_closed,
+            "sync_open": name in _sync_clients and not _sync_clients[name].is_closed,
+        }
+        for name in PROVIDERS
+    }
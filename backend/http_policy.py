@@ -1,12 +1,52 @@
 import asyncio
 import random
 import time
+from collections import deque
 
 import httpx
 
+from backend.circuit_breaker import CircuitBreaker, CircuitOpen
+
 
 RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
 MAX_RETRY_AFTER_SECONDS = 1.5
+# Attempts that would get less time than this before the caller's deadline are not started.
+MIN_ATTEMPT_SECONDS = 0.2
+
+# Hedged GETs: once an endpoint has HEDGE_MIN_SAMPLES latencies, a request still
+# pending after that endpoint's p95 gets one duplicate; the first response wins.
+# Each request earns HEDGE_BUDGET_RATIO hedge tokens (capped at HEDGE_BUDGET_BURST),
+# so duplicates stay a few percent of upstream traffic.
+HEDGE_LATENCY_WINDOW = 200
+HEDGE_MIN_SAMPLES = 20
+HEDGE_PERCENTILE = 0.95
+HEDGE_MIN_DELAY_SECONDS = 0.05
+HEDGE_BUDGET_RATIO = 0.05
+HEDGE_BUDGET_BURST = 5.0
+
+_latencies: dict[str, deque[float]] = {}
+_hedge_tokens = HEDGE_BUDGET_BURST
+_hedge_counts: dict[str, dict[str, int]] = {}
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a caller-supplied deadline leaves no time for another attempt."""
+
+
+def deadline_timeout(timeout: float, deadline: float | None) -> float:
+    """Clamp *timeout* to the time left before *deadline* (a ``time.monotonic()`` value)."""
+    if deadline is None:
+        return timeout
+    remaining = deadline - time.monotonic()
+    if remaining < MIN_ATTEMPT_SECONDS:
+        raise DeadlineExceeded()
+    return min(timeout, remaining)
+
+
+def _retry_fits(delay: float, deadline: float | None) -> bool:
+    if deadline is None:
+        return True
+    return time.monotonic() + delay + MIN_ATTEMPT_SECONDS <= deadline
 
 
 def _retry_delay(attempt: int, retry_after: float | None = None) -> float:
@@ -27,15 +67,143 @@ def _retry_after_seconds(response: httpx.Response) -> float | None:
         return None
 
 
+def _hedge_delay(endpoint: str) -> float | None:
+    samples = _latencies.get(endpoint)
+    if not samples or len(samples) < HEDGE_MIN_SAMPLES:
+        return None
+    ordered = sorted(samples)
+    return max(HEDGE_MIN_DELAY_SECONDS, ordered[int(HEDGE_PERCENTILE * (len(ordered) - 1))])
+
+
+def _record_latency(endpoint: str, seconds: float) -> None:
+    _latencies.setdefault(endpoint, deque(maxlen=HEDGE_LATENCY_WINDOW)).append(seconds)
+
+
+def _spend_hedge_token() -> bool:
+    global _hedge_tokens
+    if _hedge_tokens < 1.0:
+        return False
+    _hedge_tokens -= 1.0
+    return True
+
+
+def _request_timeout(client: httpx.AsyncClient | httpx.Client, seconds: float) -> httpx.Timeout:
+    """Per-call read timeout that keeps the client's own (usually shorter) connect timeout."""
+    connect = client.timeout.connect
+    return httpx.Timeout(seconds, connect=min(seconds, connect) if connect is not None else seconds)
+
+
+def hedge_stats() -> dict[str, dict[str, float | int | None]]:
+    return {
+        endpoint: {**counts, "p95_seconds": _hedge_delay(endpoint)}
+        for endpoint, counts in _hedge_counts.items()
+    }
+
+
+async def _hedged_get(
+    client: httpx.AsyncClient,
+    url: str,
+    params: dict,
+    timeout: float,
+    endpoint: str,
+    deadline: float | None,
+) -> httpx.Response:
+    """GET *url*, firing one duplicate if the first request outlives the endpoint's p95."""
+    global _hedge_tokens
+    _hedge_tokens = min(HEDGE_BUDGET_BURST, _hedge_tokens + HEDGE_BUDGET_RATIO)
+    counts = _hedge_counts.setdefault(endpoint, {"requests": 0, "hedged": 0, "hedge_wins": 0})
+    counts["requests"] += 1
+    started = time.monotonic()
+    delay = _hedge_delay(endpoint)
+    primary = asyncio.ensure_future(client.get(url, params=params, timeout=_request_timeout(client, timeout)))
+    pending = {primary}
+    try:
+        if delay is not None and delay < timeout:
+            await asyncio.wait(pending, timeout=delay)
+            if not primary.done() and _spend_hedge_token():
+                try:
+                    hedge_timeout = deadline_timeout(timeout - delay, deadline)
+                except DeadlineExceeded:
+                    hedge_timeout = None
+                if hedge_timeout is not None:
+                    counts["hedged"] += 1
+                    pending.add(asyncio.ensure_future(
+                        client.get(url, params=params, timeout=_request_timeout(client, hedge_timeout))
+                    ))
+        error: BaseException | None = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is not primary:
+                        counts["hedge_wins"] += 1
+                    _record_latency(endpoint, time.monotonic() - started)
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _get(
+    client: httpx.AsyncClient,
+    url: str,
+    params: dict,
+    timeout: float,
+    hedge: str | None,
+    deadline: float | None,
+) -> httpx.Response:
+    if hedge is None:
+        return await client.get(url, params=params, timeout=_request_timeout(client, timeout))
+    return await _hedged_get(client, url, params, timeout, hedge, deadline)
+
+
+def _admit(breaker: CircuitBreaker | None) -> None:
+    if breaker is not None and not breaker.allow():
+        raise CircuitOpen(breaker.name)
+
+
+def _record_response(breaker: CircuitBreaker | None, resp: httpx.Response, started: float) -> None:
+    """429 with a Retry-After too long to wait out trips the breaker; 5xx and other 429s count as failures."""
+    if breaker is None:
+        return
+    if resp.status_code == 429:
+        retry_after = _retry_after_seconds(resp)
+        if retry_after is not None and retry_after > MAX_RETRY_AFTER_SECONDS:
+            breaker.trip(retry_after)
+        else:
+            breaker.record_failure()
+    elif resp.status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success(time.monotonic() - started)
+
+
 def get_json_with_policy(
     url: str,
     params: dict,
     timeout: float,
     attempts: int = 3,
+    *,
+    breaker: CircuitBreaker | None = None,
+    client: httpx.Client | None = None,
 ) -> dict:
+    """Blocking GET JSON with retries, over *client*'s pool when given."""
     for attempt in range(attempts):
+        _admit(breaker)
+        started = time.monotonic()
         try:
-            resp = httpx.get(url, params=params, timeout=timeout)
+            try:
+                if client is None:
+                    resp = httpx.get(url, params=params, timeout=timeout)
+                else:
+                    resp = client.get(url, params=params, timeout=_request_timeout(client, timeout))
+            except httpx.TransportError:
+                if breaker is not None:
+                    breaker.record_failure()
+                raise
+            _record_response(breaker, resp, started)
             if resp.status_code in RETRYABLE_STATUSES and attempt < attempts - 1:
                 time_to_wait = _retry_delay(attempt, _retry_after_seconds(resp))
                 time.sleep(time_to_wait)
@@ -55,17 +223,47 @@ async def aget_json_with_policy(
     params: dict,
     timeout: float,
     attempts: int = 3,
+    *,
+    deadline: float | None = None,
+    hedge: str | None = None,
+    breaker: CircuitBreaker | None = None,
 ) -> dict:
+    """GET JSON with retries; each attempt's timeout is clamped to *deadline*.
+
+    Retries whose backoff would end past the deadline are skipped and the last
+    failure is surfaced instead. *hedge* names the endpoint for hedged attempts;
+    pass it only for idempotent reads of providers that tolerate duplicates.
+    With a *breaker*, attempts raise :class:`CircuitOpen` instead of calling
+    out while it is open, and every answer is reported to it.
+    """
     for attempt in range(attempts):
         try:
-            resp = await client.get(url, params=params, timeout=timeout)
+            attempt_timeout = deadline_timeout(timeout, deadline)
+            _admit(breaker)
+            started = time.monotonic()
+            try:
+                resp = await _get(client, url, params, attempt_timeout, hedge, deadline)
+            except httpx.TransportError:
+                if breaker is not None:
+                    breaker.record_failure()
+                raise
+            except BaseException:
+                if breaker is not None:
+                    breaker.release()
+                raise
+            _record_response(breaker, resp, started)
             if resp.status_code in RETRYABLE_STATUSES and attempt < attempts - 1:
-                await asyncio.sleep(_retry_delay(attempt, _retry_after_seconds(resp)))
-                continue
+                delay = _retry_delay(attempt, _retry_after_seconds(resp))
+                if _retry_fits(delay, deadline):
+                    await asyncio.sleep(delay)
+                    continue
             resp.raise_for_status()
             return resp.json()
         except httpx.TransportError:
             if attempt == attempts - 1:
                 raise
-            await asyncio.sleep(_retry_delay(attempt))
+            delay = _retry_delay(attempt)
+            if not _retry_fits(delay, deadline):
+                raise
+            await asyncio.sleep(delay)
     return {}
@@ -0,0 +1,266 @@
+"""Persistent cross-provider track identity registry.
+
+Enrichment keeps rediscovering the same links: Deezer search → ISRC → Spotify
+ID → MusicBrainz relation → Odesli platform links. Every resolved identity is
+recorded here once, indexed by its normalized Last.fm artist/title and by each
+provider ID it carries (ISRC, Spotify, Deezer), so a repeat candidate maps with
+no upstream call. Records carry the mapping source and a confidence; lookups
+ignore records below ``min_confidence`` or older than ``ttl_seconds``.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from backend.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# How much a mapping source is trusted; text search can pick the wrong version.
+MAPPING_SOURCE_CONFIDENCE = {
+    "app_isrc_search": 1.0,
+    "spotify_id_hint": 0.95,
+    "user_token_search": 0.85,
+    "app_text_search": 0.8,
+}
+DEFAULT_CONFIDENCE = 0.7
+# Deezer preview URLs are signed and expire long before an identity does. A stored
+# Deezer payload is reused only while its preview is still valid: until the URL's own
+# expiry minus a margin, or for DEEZER_PREVIEW_TTL_SECONDS when the URL has none.
+DEEZER_PREVIEW_TTL_SECONDS = 3600
+PREVIEW_EXPIRY_MARGIN_SECONDS = 300
+MEMORY_REGISTRY_MAX_KEYS = 50000
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_DEEZER_TRACK_ID = re.compile(r"/track/(\d+)")
+_PREVIEW_EXPIRY = re.compile(r"\bexp=(\d+)")
+
+
+def text_key(artist: str, title: str) -> str:
+    def norm(value: str) -> str:
+        return _NON_ALNUM.sub(" ", (value or "").lower()).strip()
+
+    return f"text:{norm(artist)}::{norm(title)}"
+
+
+def deezer_track_id(link: str | None) -> str | None:
+    match = _DEEZER_TRACK_ID.search(link or "")
+    return match.group(1) if match else None
+
+
+def mapping_confidence(mapping_source: str | None) -> float:
+    return MAPPING_SOURCE_CONFIDENCE.get(mapping_source or "", DEFAULT_CONFIDENCE)
+
+
+@dataclass
+class TrackIdentity:
+    artist: str
+    title: str
+    isrc: str | None = None
+    spotify_id: str | None = None
+    deezer_id: str | None = None
+    mapping_source: str | None = None
+    confidence: float = 0.0
+    # Provider payloads needed to rebuild an enriched row without calling anyone.
+    deezer: dict[str, Any] | None = None
+    # When the Deezer payload (and its preview URL) was fetched; None if unknown.
+    deezer_fetched_at: float | None = None
+    spotify_track: dict[str, Any] | None = None
+    external_links: dict[str, str] = field(default_factory=dict)
+    external_primary_provider: str | None = None
+    updated_at: float = field(default_factory=time.time)
+
+    def index_keys(self) -> list[str]:
+        keys = [text_key(self.artist, self.title)]
+        if self.isrc:
+            keys.append(f"isrc:{self.isrc.upper()}")
+        if self.spotify_id:
+            keys.append(f"spotify:{self.spotify_id}")
+        if self.deezer_id:
+            keys.append(f"deezer:{self.deezer_id}")
+        return keys
+
+    def reusable_deezer(self) -> dict[str, Any] | None:
+        """The stored Deezer payload, or None when its preview URL may have expired."""
+        if not self.deezer or not self.deezer.get("preview"):
+            return self.deezer
+        now = time.time()
+        match = _PREVIEW_EXPIRY.search(self.deezer["preview"])
+        if match:
+            return self.deezer if int(match.group(1)) - PREVIEW_EXPIRY_MARGIN_SECONDS > now else None
+        fetched_at = self.deezer_fetched_at
+        return self.deezer if fetched_at and now - fetched_at < DEEZER_PREVIEW_TTL_SECONDS else None
+
+    def merged_into(self, existing: "TrackIdentity") -> "TrackIdentity":
+        """Fields set on *self* win, except a lower-confidence Spotify mapping never replaces a better one."""
+        merged = TrackIdentity(**{**asdict(existing), **{k: v for k, v in asdict(self).items() if v}})
+        if existing.spotify_id and existing.confidence > self.confidence:
+            merged.spotify_id = existing.spotify_id
+            merged.spotify_track = existing.spotify_track
+            merged.mapping_source = existing.mapping_source
+            merged.confidence = existing.confidence
+        return merged
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, raw: str) -> "TrackIdentity | None":
+        try:
+            return cls(**json.loads(raw))
+        except (TypeError, ValueError):
+            return None
+
+
+class IdentityRegistry:
+    backend_key = "none"
+
+    def __init__(self, ttl_seconds: float, min_confidence: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.min_confidence = min_confidence
+
+    def _load(self, key: str) -> TrackIdentity | None:
+        raise NotImplementedError
+
+    def _store(self, identity: TrackIdentity, keys: Sequence[str]) -> None:
+        raise NotImplementedError
+
+    def lookup(self, keys: Sequence[str]) -> TrackIdentity | None:
+        """First fresh identity found under any of *keys*."""
+        cutoff = time.time() - self.ttl_seconds
+        for key in keys:
+            identity = self._load(key)
+            if identity is not None and identity.updated_at >= cutoff:
+                return identity
+        return None
+
+    def trusted_mapping(self, identity: TrackIdentity | None) -> bool:
+        return bool(
+            identity
+            and identity.spotify_track
+            and identity.confidence >= self.min_confidence
+        )
+
+    def record(self, identity: TrackIdentity) -> None:
+        try:
+            existing = self.lookup(identity.index_keys())
+            if existing is not None:
+                identity = identity.merged_into(existing)
+            identity.updated_at = time.time()
+            keys = identity.index_keys()
+            if existing is not None:
+                keys = list(dict.fromkeys(keys + existing.index_keys()))
+            self._store(identity, keys)
+        except Exception as exc:
+            logger.warning("Identity registry write failed: %s", exc)
+
+    def record_many(self, identities: Sequence[TrackIdentity]) -> None:
+        """:meth:`record` each identity; blocking, so async callers run it in a worker thread."""
+        for identity in identities:
+            self.record(identity)
+
+
+class MemoryIdentityRegistry(IdentityRegistry):
+    backend_key = "memory"
+
+    def __init__(
+        self, ttl_seconds: float, min_confidence: float, max_entries: int = MEMORY_REGISTRY_MAX_KEYS,
+    ) -> None:
+        super().__init__(ttl_seconds, min_confidence)
+        self._items: TTLCache[TrackIdentity] = TTLCache(max_entries, ttl_seconds)
+
+    def _load(self, key: str) -> TrackIdentity | None:
+        return self._items.get(key)
+
+    def _store(self, identity: TrackIdentity, keys: Sequence[str]) -> None:
+        for key in keys:
+            self._items.set(key, identity)
+
+
+class SqliteIdentityRegistry(IdentityRegistry):
+    backend_key = "sqlite"
+
+    def __init__(self, path: str, ttl_seconds: float, min_confidence: float) -> None:
+        super().__init__(ttl_seconds, min_confidence)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS track_identity_keys ("
+                "key TEXT PRIMARY KEY, payload TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _load(self, key: str) -> TrackIdentity | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM track_identity_keys WHERE key = ?", (key,)
+            ).fetchone()
+        return TrackIdentity.from_json(row[0]) if row else None
+
+    def _store(self, identity: TrackIdentity, keys: Sequence[str]) -> None:
+        payload = identity.to_json()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO track_identity_keys (key, payload, updated_at) VALUES (?, ?, ?)",
+                [(key, payload, identity.updated_at) for key in keys],
+            )
+
+
+class RedisIdentityRegistry(IdentityRegistry):
+    backend_key = "redis"
+
+    def __init__(
+        self,
+        redis_url: str,
+        ttl_seconds: float,
+        min_confidence: float,
+        key_prefix: str = "catid:ident:",
+    ) -> None:
+        super().__init__(ttl_seconds, min_confidence)
+        import redis
+
+        self._redis = redis.Redis.from_url(redis_url, decode_responses=True)
+        self._prefix = key_prefix
+
+    def _load(self, key: str) -> TrackIdentity | None:
+        raw = self._redis.get(f"{self._prefix}{key}")
+        return TrackIdentity.from_json(raw) if raw else None
+
+    def _store(self, identity: TrackIdentity, keys: Sequence[str]) -> None:
+        payload = identity.to_json()
+        pipe = self._redis.pipeline()
+        for key in keys:
+            pipe.set(f"{self._prefix}{key}", payload, ex=int(self.ttl_seconds))
+        pipe.execute()
+
+
+def build_identity_registry(
+    backend: str,
+    *,
+    path: str,
+    redis_url: str,
+    ttl_seconds: float,
+    min_confidence: float,
+) -> IdentityRegistry | None:
+    """Registry for *backend* (``sqlite``, ``redis``, ``memory``); None when disabled."""
+    if backend in {"", "none", "off"}:
+        return None
+    try:
+        if backend == "redis":
+            return RedisIdentityRegistry(redis_url, ttl_seconds, min_confidence)
+        if backend == "sqlite":
+            return SqliteIdentityRegistry(path, ttl_seconds, min_confidence)
+    except Exception as exc:
+        logger.warning("Identity registry backend %s unavailable, falling back to memory: %s", backend, exc)
+    return MemoryIdentityRegistry(ttl_seconds, min_confidence)
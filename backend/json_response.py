@@ -0,0 +1,116 @@
+"""Compact JSON responses for the similar-tracks endpoints.
+
+A 250-row ``SimilarTracksResponse`` is mostly per-track detail the caller may
+not render. :func:`json_response` serializes the model once with pydantic's
+Rust serializer. FastAPI's default path validates the returned model against
+``response_model`` and then encodes it again; this one skips that. It can also:
+
+* keep only the requested ``TrackInfo`` fields (``?fields=name,artists,bpm``)
+  wherever the response holds tracks (``seed_track``, ``similar_tracks``, and
+  the same fields nested in batch results); other response fields are untouched;
+* compress with brotli (if the optional ``brotli`` package is installed) or
+  gzip when the client accepts it and the body is large enough;
+* attach a strong ETag of the uncompressed body, suffixed with the content
+  coding (``"<hash>-gzip"``) as RFC 9110 requires of strong validators. The
+  endpoints are all POSTs, so there is no 304 path: the ETag only lets clients
+  tell identical result sets apart without comparing bodies.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import types
+import typing
+from functools import lru_cache
+
+from fastapi import HTTPException, Request, Response
+from pydantic import BaseModel
+
+from backend.config import RESPONSE_COMPRESSION
+from backend.models import TrackInfo
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+TRACK_FIELDS = frozenset(TrackInfo.model_fields)
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+
+def parse_fields(raw: str | None) -> frozenset[str] | None:
+    """``fields=`` query value as a set of TrackInfo field names; None means all fields."""
+    if not raw:
+        return None
+    wanted = frozenset(part.strip() for part in raw.split(",") if part.strip())
+    unknown = sorted(wanted - TRACK_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown track fields: {', '.join(unknown)}. Valid fields: {', '.join(sorted(TRACK_FIELDS))}",
+        )
+    return wanted or None
+
+
+def _annotation_include(annotation: object, fields: frozenset[str]) -> object:
+    """Pydantic ``include`` for a value of *annotation*: True (everything) or a nested spec."""
+    if annotation is TrackInfo:
+        return set(fields)
+    args = typing.get_args(annotation)
+    origin = typing.get_origin(annotation)
+    if origin is list and args:
+        inner = _annotation_include(args[0], fields)
+        return True if inner is True else {"__all__": inner}
+    if origin in (typing.Union, types.UnionType):
+        for arg in args:
+            inner = _annotation_include(arg, fields)
+            if inner is not True:
+                return inner
+        return True
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return _projection(annotation, fields)
+    return True
+
+
+@lru_cache(maxsize=256)
+def _projection(model_cls: type[BaseModel], fields: frozenset[str]) -> dict | bool:
+    spec = {name: _annotation_include(info.annotation, fields) for name, info in model_cls.model_fields.items()}
+    return spec if any(value is not True for value in spec.values()) else True
+
+
+def _accepted_encodings(header: str) -> set[str]:
+    accepted: set[str] = set()
+    for part in header.lower().split(","):
+        token, _, params = part.partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if token.strip() and quality > 0:
+            accepted.add(token.strip())
+    return accepted
+
+
+def json_response(request: Request, model: BaseModel, *, fields: frozenset[str] | None = None) -> Response:
+    include = _projection(type(model), fields) if fields else None
+    if not isinstance(include, dict):
+        include = None
+    body = model.model_dump_json(include=include).encode()
+    digest = hashlib.blake2b(body, digest_size=12).hexdigest()
+    headers = {"Vary": "Accept-Encoding"}
+    if RESPONSE_COMPRESSION and len(body) >= COMPRESS_MIN_BYTES:
+        accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+        if brotli is not None and "br" in accepted:
+            body = brotli.compress(body, quality=BROTLI_QUALITY)
+            headers["Content-Encoding"] = "br"
+        elif "gzip" in accepted:
+            body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+            headers["Content-Encoding"] = "gzip"
+    coding = headers.get("Content-Encoding")
+    headers["ETag"] = f'"{digest}-{coding}"' if coding else f'"{digest}"'
+    return Response(content=body, media_type="application/json", headers=headers)
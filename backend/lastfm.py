@@ -1,15 +1,21 @@
 import asyncio
 import logging
+import threading
 
 import httpx
 
+from backend.circuit_breaker import CircuitOpen, get_breaker
 from backend.config import LASTFM_API_KEY
-from backend.http_policy import aget_json_with_policy, get_json_with_policy
+from backend.http_clients import provider_sync_client
+from backend.http_policy import DeadlineExceeded, aget_json_with_policy, get_json_with_policy
 
 logger = logging.getLogger(__name__)
 
 LASTFM_BASE = "https://ws.audioscrobbler.com/2.0/"
 _sem = asyncio.Semaphore(4)
+# Threaded (sync) calls get their own process-wide slots, so batch runs queue instead of piling on.
+_sync_slots = threading.BoundedSemaphore(4)
+_breaker = get_breaker("lastfm", base_cooldown=10.0, max_cooldown=120.0, slow_call_seconds=5.0)
 
 
 def _check_key():
@@ -24,14 +30,37 @@ def _lastfm_get(params: dict, timeout: int = 15) -> dict:
     params.setdefault("api_key", LASTFM_API_KEY)
     params.setdefault("format", "json")
     params.setdefault("autocorrect", 1)
-    return get_json_with_policy(LASTFM_BASE, params=params, timeout=timeout, attempts=3)
+    with _sync_slots:
+        return get_json_with_policy(
+            LASTFM_BASE,
+            params=params,
+            timeout=timeout,
+            attempts=3,
+            breaker=_breaker,
+            client=provider_sync_client("lastfm"),
+        )
 
 
-async def _lastfm_aget(client: httpx.AsyncClient, params: dict, timeout: int = 10) -> dict:
+async def _lastfm_aget(
+    client: httpx.AsyncClient,
+    params: dict,
+    timeout: int = 10,
+    *,
+    deadline: float | None = None,
+) -> dict:
     params.setdefault("api_key", LASTFM_API_KEY)
     params.setdefault("format", "json")
     params.setdefault("autocorrect", 1)
-    return await aget_json_with_policy(client, LASTFM_BASE, params=params, timeout=timeout, attempts=3)
+    return await aget_json_with_policy(
+        client,
+        LASTFM_BASE,
+        params=params,
+        timeout=timeout,
+        attempts=3,
+        deadline=deadline,
+        hedge=f"lastfm.{params['method']}",
+        breaker=_breaker,
+    )
 
 
 def _parse_tags(data: dict, limit: int = 15) -> list[str]:
@@ -171,23 +200,47 @@ def _get_artist_tags(artist: str, limit: int = 15) -> list[str]:
         return []
 
 
-async def fetch_track_tags(client: httpx.AsyncClient, artist: str, track: str) -> list[str]:
-    """Async tag fetch for bulk enrichment. Falls back to artist tags."""
+async def _fetch_top_tags(
+    client: httpx.AsyncClient,
+    params: dict,
+    *,
+    deadline: float | None = None,
+) -> list[str] | None:
+    """Parsed top tags, or None when the call failed and the answer is unknown."""
     async with _sem:
         try:
-            data = await _lastfm_aget(client, {"method": "track.gettoptags", "artist": artist, "track": track})
-            tags = _parse_tags(data)
-            if tags:
-                await asyncio.sleep(0.05)
-                return tags
+            data = await _lastfm_aget(client, params, deadline=deadline)
+        except (DeadlineExceeded, CircuitOpen):
+            return None
         except Exception:
-            logger.warning("Failed to fetch tags for '%s - %s'", artist, track, exc_info=True)
-
-        try:
-            data = await _lastfm_aget(client, {"method": "artist.gettoptags", "artist": artist})
-            tags = _parse_tags(data)
-            await asyncio.sleep(0.05)
-            return tags
-        except Exception:
-            logger.warning("Failed to fetch artist tags for '%s'", artist, exc_info=True)
-            return []
+            logger.warning("Failed to fetch %s for '%s'", params["method"], params["artist"], exc_info=True)
+            return None
+        await asyncio.sleep(0.05)
+    if "error" in data:
+        logger.warning("Last.fm tag error: %s", data.get("message", "unknown"))
+        return None
+    return _parse_tags(data)
+
+
+async def fetch_track_top_tags(
+    client: httpx.AsyncClient,
+    artist: str,
+    track: str,
+    *,
+    deadline: float | None = None,
+) -> list[str] | None:
+    """track.getTopTags only; see :mod:`backend.tag_service` for the artist fallback."""
+    return await _fetch_top_tags(
+        client, {"method": "track.gettoptags", "artist": artist, "track": track}, deadline=deadline,
+    )
+
+
+async def fetch_artist_top_tags(
+    client: httpx.AsyncClient,
+    artist: str,
+    *,
+    deadline: float | None = None,
+) -> list[str] | None:
+    return await _fetch_top_tags(
+        client, {"method": "artist.gettoptags", "artist": artist}, deadline=deadline,
+    )
@@ -3,18 +3,18 @@
 from __future__ import annotations
 
 import re
-import time
 from functools import lru_cache
 
 import httpx
 
+from backend.circuit_breaker import get_breaker
 from backend.http_policy import aget_json_with_policy
 
 ODESLI_LINKS_BY_SONG = "https://api.song.link/v1-alpha.1/links"
 ODESLI_TIMEOUT = 6
 ODESLI_ATTEMPTS = 2
 ODESLI_COOLDOWN_SECONDS = 120
-_odesli_throttled_until = 0.0
+_breaker = get_breaker("odesli", base_cooldown=ODESLI_COOLDOWN_SECONDS, max_cooldown=600.0)
 
 PROVIDER_WHITELIST = {
     "youtube",
@@ -47,6 +47,10 @@ def build_external_lookup_key(artist: str, title: str, isrc: str | None) -> str:
     return f"{artist_n}|{title_n}|{isrc_n}"
 
 
+def odesli_cooldown_remaining() -> float:
+    return _breaker.remaining()
+
+
 def _normalize_provider(provider: str) -> str | None:
     if provider not in PROVIDER_WHITELIST:
         return None
@@ -91,17 +95,16 @@ async def resolve_external_links(
     isrc: str | None = None,
     spotify_id: str | None = None,
     deezer_url: str | None = None,
+    deadline: float | None = None,
 ) -> tuple[dict[str, str], str | None]:
     """
     Resolve cross-provider links from Odesli.
 
+    The lookup is clamped to *deadline* (monotonic) when given.
     Returns (provider_links, primary_provider). Never raises.
     """
     key = build_external_lookup_key(artist, title, isrc)
-    global _odesli_throttled_until
     try:
-        if time.monotonic() < _odesli_throttled_until:
-            return _cached_empty(key)
         params: dict[str, str] = {}
         if spotify_id and spotify_id.strip():
             params = {
@@ -120,6 +123,8 @@ async def resolve_external_links(
             params=params,
             timeout=ODESLI_TIMEOUT,
             attempts=ODESLI_ATTEMPTS,
+            deadline=deadline,
+            breaker=_breaker,
         )
         if not isinstance(payload, dict):
             return _cached_empty(key)
@@ -128,11 +133,9 @@ async def resolve_external_links(
             return _cached_empty(key)
         return links, _choose_primary_provider(links)
     except httpx.HTTPStatusError as exc:
-        if exc.response is not None and exc.response.status_code == 429:
-            _odesli_throttled_until = max(
-                _odesli_throttled_until,
-                time.monotonic() + ODESLI_COOLDOWN_SECONDS,
-            )
+        # Odesli's quota is small: any final 429 opens the breaker.
+        if exc.response is not None and exc.response.status_code == 429 and not _breaker.blocked():
+            _breaker.trip()
         return _cached_empty(key)
     except Exception:
         return _cached_empty(key)
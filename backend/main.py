@@ -3,7 +3,8 @@ import logging
 import re
 import secrets
 import time
-from collections.abc import Sequence
+from collections import Counter
+from collections.abc import Awaitable, Sequence
 from difflib import SequenceMatcher
 
 import httpx
@@ -17,16 +18,71 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 
+from backend.canonical import canonical_key, dedupe_lastfm_rows
+from backend.cache_snapshot import cache_stats, export_snapshot, load_snapshot
+from backend.candidate import Candidate
+from backend.candidate_pool import CandidatePool, CandidatePoolStore, decode_cursor, encode_cursor
 from backend.deezer import fetch_track_info as deezer_fetch
+from backend.deezer import lookup_outcome as deezer_lookup_outcome
+from backend.enrich_budget import EnrichBudget, step_health
+from backend.enrich_graph import StepGraph
+from backend.enrich_queue import PriorityWorkQueue
+from backend.filter_plan import CandidateRejected, FilterPlan
+from backend.http_clients import (
+    client_stats,
+    close_clients,
+    prewarm_clients,
+    provider_client,
+    provider_sync_client,
+)
+from backend.http_policy import hedge_stats
+from backend.json_response import json_response, parse_fields
+from backend.feature_samples import FeatureSample, build_feature_sample_store, features_from_analysis
+from backend.identity_registry import (
+    TrackIdentity,
+    build_identity_registry,
+    deezer_track_id,
+    mapping_confidence,
+    text_key,
+)
+from backend.mapping_misses import build_mapping_miss_set
+from backend.mb_index import open_index as open_musicbrainz_index
 from backend.metadata_fallback import (
+    MusicBrainzUnavailable,
+    configure_local_index as configure_musicbrainz_index,
     fetch_musicbrainz_hints,
     fetch_musicbrainz_spotify_relation_id,
+    local_hints as musicbrainz_local_hints,
+    local_spotify_relation_id as musicbrainz_local_relation_id,
+)
+from backend.circuit_breaker import (
+    CircuitOpen,
+    breaker_remaining,
+    breaker_snapshot,
+    build_breaker_store,
+    configure_breaker_store,
 )
 from backend.config import (
     ALLOWED_ORIGINS,
+    CACHE_SNAPSHOT_INTERVAL_SECONDS,
+    CACHE_SNAPSHOT_PATH,
     APP_BASE_URL,
     APP_ENV,
+    CANDIDATE_POOL_MAX_ENTRIES,
+    CIRCUIT_BREAKER_BACKEND,
+    CANDIDATE_POOL_TTL_SECONDS,
     ENABLE_DEBUG_ENDPOINT,
+    FEATURE_SAMPLES_BACKEND,
+    FEATURE_SAMPLES_PATH,
+    HTTP_PREWARM_ON_STARTUP,
+    IDENTITY_MIN_CONFIDENCE,
+    IDENTITY_REGISTRY_BACKEND,
+    IDENTITY_REGISTRY_PATH,
+    IDENTITY_TTL_SECONDS,
+    MAPPING_MISS_BACKEND,
+    MAPPING_MISS_MAX_ENTRIES,
+    MAPPING_MISS_TTL_SECONDS,
+    MUSICBRAINZ_INDEX_PATH,
     REDIS_URL,
     SESSION_COOKIE_SECURE,
     SESSION_STORE_BACKEND,
@@ -34,12 +90,20 @@ from backend.config import (
     SPOTIFY_CLIENT_ID,
     SPOTIFY_REDIRECT_DERIVED_FROM_APP_BASE,
     SPOTIFY_REDIRECT_URI,
+    TAG_FEATURE_MODEL_PATH,
+    WARMUP_TIMEOUT_SECONDS,
 )
-from backend.lastfm import fetch_track_tags, get_similar_tracks, get_track_tags
+from backend.lastfm import get_similar_tracks, get_track_tags
 from backend.models import (
     AudioSimilarRequest,
     AudioWeights,
+    BatchSeedResult,
+    BatchSimilarRequest,
+    BatchSimilarResponse,
     PlaylistLookupItem,
+    RerankRequest,
+    SeedSpec,
+    SimilarPageRequest,
     SimilarTracksResponse,
     SimilarityFilters,
     TextPlaylistCreateRequest,
@@ -49,16 +113,19 @@ from backend.models import (
     TrackRequest,
     UnifiedSimilarRequest,
 )
-from backend.link_aggregator import resolve_external_links
-from backend.audio_analysis import fetch_analysis_metrics
+from backend.link_aggregator import odesli_cooldown_remaining, resolve_external_links
+from backend.audio_analysis import cached_analysis_metrics, fetch_analysis_metrics
 from backend.spotify import (
     build_recommendation_targets,
     compute_similarity,
+    feature_cache_stats,
     get_audio_features,
     get_recommendations,
     get_track_info,
     resolve_spotify_track_with_source,
     spotify_mapping_allowed,
+    spotify_mapping_cooldown_remaining,
+    warm_app_token,
 )
 from backend.spotify_auth import (
     build_pkce_pair,
@@ -72,11 +139,14 @@ from backend.session_store import build_session_store
 from backend.tag_categories import (
     INSTRUMENTAL_TAGS,
     VOCAL_TAGS,
-    build_tag_categories,
-    estimate_features_from_tags,
+    build_pool_tag_categories,
+    estimate_features_batch,
+    load_feature_model,
     normalize_tag,
     tag_alignment_score,
+    tag_alignment_scores,
 )
+from backend.tag_service import TagService
 
 app = FastAPI(
     title="Follow Your Cat ID",
@@ -95,10 +165,11 @@ app.add_middleware(
 BASE_OVERFETCH_FACTOR = 2
 MAX_OVERFETCH_LIMIT = 120
 MAX_ENRICH_CONCURRENCY = 8
-MIN_FETCH_MULTIPLIER = 2
-MAX_FETCH_MULTIPLIER = 3
+# Last.fm rows fetched per seed; the tail past the first page is enriched on demand via cursors.
+LASTFM_POOL_FETCH_LIMIT = 250
 FULL_TAG_ENRICH_LIMIT = 18
 ENRICH_TIME_BUDGET_SECONDS = 8.0
+ENRICH_CANCEL_GRACE_SECONDS = 0.25
 SPOTIFY_RESOLVE_BUDGET = 48
 MB_FALLBACK_CAP = 18
 STRICT_MAPPED_FETCH_MULT = 5
@@ -107,6 +178,10 @@ SPOTIFY_ENRICH_SEED_WEIGHT = 0.7
 TAG_ALIGNMENT_WEIGHT = 0.25
 DEEZER_SIGNAL_WEIGHT = 0.05
 SEED_PROFILE_SCORE_WEIGHT = 0.35
+# A batch of N seeds gets N times the call ceilings but at most this many times the time budget.
+BATCH_TIME_BUDGET_SCALE_CAP = 3
+# Seeds of one batch resolved and fetched from Last.fm at a time; the rest wait their turn.
+BATCH_SEED_START_CONCURRENCY = 4
 
 logger = logging.getLogger(__name__)
 
@@ -165,10 +240,40 @@ def _single_spotify_search(
         return None, False, None
 
 
-_shared_http_client: httpx.AsyncClient | None = None
+# Holds references to fire-and-forget startup tasks so they are not garbage-collected.
+_background_tasks: set[asyncio.Task] = set()
+_warmup_state: dict[str, object] = {"ready": False, "steps": {}, "seconds": None}
 session_store = build_session_store(SESSION_STORE_BACKEND, REDIS_URL)
 _EFFECTIVE_SESSION_BACKEND = getattr(session_store, "backend_key", SESSION_STORE_BACKEND)
+candidate_pools = CandidatePoolStore(CANDIDATE_POOL_TTL_SECONDS, CANDIDATE_POOL_MAX_ENTRIES)
+identity_registry = build_identity_registry(
+    IDENTITY_REGISTRY_BACKEND,
+    path=IDENTITY_REGISTRY_PATH,
+    redis_url=REDIS_URL,
+    ttl_seconds=IDENTITY_TTL_SECONDS,
+    min_confidence=IDENTITY_MIN_CONFIDENCE,
+)
+feature_samples = build_feature_sample_store(FEATURE_SAMPLES_BACKEND, path=FEATURE_SAMPLES_PATH)
+configure_musicbrainz_index(open_musicbrainz_index(MUSICBRAINZ_INDEX_PATH))
+configure_breaker_store(build_breaker_store(CIRCUIT_BREAKER_BACKEND, REDIS_URL))
+mapping_misses = build_mapping_miss_set(
+    MAPPING_MISS_BACKEND,
+    redis_url=REDIS_URL,
+    ttl_seconds=MAPPING_MISS_TTL_SECONDS,
+    max_entries=MAPPING_MISS_MAX_ENTRIES,
+)
+# Catalog fields of a mapped Spotify track worth persisting (the rest is per-request scoring).
+_SPOTIFY_CATALOG_FIELDS = {
+    "name", "artists", "album", "album_art", "preview_url", "spotify_url", "spotify_id",
+    "popularity", "release_year",
+}
 _NON_ALNUM = re.compile(r"[^a-z0-9]+", re.I)
+# Enrichment graph steps that can produce a Spotify mapping, in fallback order.
+_MAPPING_STEPS = ("mapping", "mb_relation", "mb_hints")
+# Queue depth / worker utilization of the most recent enrichment run (diagnostics).
+_last_enrich_queue_stats: dict[str, float | int] = {}
+# Running sums of the per-run counters above, since process start.
+_enrich_totals: Counter[str] = Counter()
 
 
 def _listener_fetch_limit(limit: int, strict_mapped_only: bool) -> int:
@@ -181,10 +286,25 @@ def _listener_fetch_limit(limit: int, strict_mapped_only: bool) -> int:
     return min(MAX_OVERFETCH_LIMIT, max(limit, limit * BASE_OVERFETCH_FACTOR))
 
 
+def _seeded_ranking(seed: Candidate, tracks: list[Candidate]) -> list[Candidate]:
+    """*tracks* by match score plus closeness to the seed's own tags/BPM/title."""
+    tag_scores = tag_alignment_scores(seed.tags or [], [track.tags or [] for track in tracks])
+    keyed = [
+        (
+            (track.match_score or 0.0) + (_seed_profile_score(seed, track, tag_score) * SEED_PROFILE_SCORE_WEIGHT),
+            _instrumental_bias_score(track),
+            1.0 if track.preview_url else 0.0,
+        )
+        for track, tag_score in zip(tracks, tag_scores)
+    ]
+    order = sorted(range(len(tracks)), key=keyed.__getitem__, reverse=True)
+    return [tracks[i] for i in order]
+
+
 def _build_similar_response(
     *,
-    seed: TrackInfo,
-    similar_ranked: list[TrackInfo],
+    seed: Candidate,
+    similar_ranked: list[Candidate],
     limit: int,
     strict_mapped_only: bool,
     seed_tags: list[str],
@@ -193,16 +313,11 @@ def _build_similar_response(
     external_links_degraded_reason: str | None = None,
     approximated: bool = False,
 ) -> SimilarTracksResponse:
-    """Slice ranked results; when strict_mapped_only, drop tracks without Spotify IDs."""
-    seeded_ranked = sorted(
-        similar_ranked,
-        key=lambda track: (
-            (track.match_score or 0.0) + (_seed_profile_score(seed, track) * SEED_PROFILE_SCORE_WEIGHT),
-            _instrumental_bias_score(track),
-            1.0 if track.preview_url else 0.0,
-        ),
-        reverse=True,
-    )
+    """Slice ranked results; when strict_mapped_only, drop tracks without Spotify IDs.
+
+    The only place pipeline candidates become ``TrackInfo`` models.
+    """
+    seeded_ranked = _seeded_ranking(seed, similar_ranked)
     total_candidates = len(seeded_ranked)
     if strict_mapped_only:
         filtered = [t for t in seeded_ranked if t.spotify_id][:limit]
@@ -218,9 +333,9 @@ def _build_similar_response(
         mapping_source_counts[src] = mapping_source_counts.get(src, 0) + 1
         if src.startswith("user_"):
             mapping_used_user_token = True
-    return SimilarTracksResponse(
-        seed_track=seed,
-        similar_tracks=filtered,
+    return SimilarTracksResponse.model_construct(
+        seed_track=seed.to_info(),
+        similar_tracks=[track.to_info() for track in filtered],
         strict_mapped_only=strict_mapped_only,
         total_candidates=total_candidates,
         mapped_count=mapped_count,
@@ -241,8 +356,7 @@ def _normalized_text(value: str) -> str:
     return re.sub(r"\s+", " ", lowered).strip()
 
 
-def _seed_profile_score(seed: TrackInfo, track: TrackInfo) -> float:
-    tag_score = tag_alignment_score(seed.tags or [], track.tags or [])
+def _seed_profile_score(seed: Candidate, track: Candidate, tag_score: float) -> float:
     bpm_score = 0.0
     if seed.bpm and track.bpm and seed.bpm > 0:
         bpm_diff_ratio = min(1.0, abs(seed.bpm - track.bpm) / seed.bpm)
@@ -257,16 +371,9 @@ def _seed_profile_score(seed: TrackInfo, track: TrackInfo) -> float:
     return (tag_score * 0.5) + (bpm_score * 0.35) + (title_score * 0.15)
 
 
-def _get_http_client() -> httpx.AsyncClient:
-    global _shared_http_client
-    if _shared_http_client is None:
-        _shared_http_client = httpx.AsyncClient(timeout=10)
-    return _shared_http_client
-
-
 @app.on_event("startup")
 async def startup_checks() -> None:
-    """Log OAuth callback config and highlight insecure setups."""
+    """Log OAuth callback config, highlight insecure setups and start the warm-up."""
     logger.info("App environment: %s", APP_ENV)
     logger.info("App base URL: %s", APP_BASE_URL)
     logger.info("Allowed origins: %s", ALLOWED_ORIGINS)
@@ -288,58 +395,105 @@ async def startup_checks() -> None:
             "Use SESSION_STORE_BACKEND=redis and REDIS_URL when running multiple workers or replicas, "
             "or /api/spotify/status may not see the session after callback."
         )
+    _background_tasks.add(asyncio.create_task(_warm_up()))
+    if CACHE_SNAPSHOT_PATH and CACHE_SNAPSHOT_INTERVAL_SECONDS > 0:
+        _background_tasks.add(asyncio.create_task(_export_cache_snapshots()))
+
+
+async def _export_cache_snapshots() -> None:
+    """Rewrite the cache snapshot every CACHE_SNAPSHOT_INTERVAL_SECONDS for replicas started later."""
+    while True:
+        await asyncio.sleep(CACHE_SNAPSHOT_INTERVAL_SECONDS)
+        try:
+            written = await asyncio.to_thread(export_snapshot, CACHE_SNAPSHOT_PATH)
+            logger.info("Cache snapshot written: %s", written)
+        except (OSError, RuntimeError) as exc:
+            logger.warning("Cache snapshot export failed: %s", exc)
+
+
+async def _warm_up() -> None:
+    """Load the cache snapshot and tag model, fetch the Spotify app token and open provider connections, then flip /api/ready.
+
+    Runs in the background so /api/health (liveness) answers at once. Failed or
+    slow steps are recorded but never hold readiness past WARMUP_TIMEOUT_SECONDS:
+    a provider outage must not keep a replica out of rotation.
+    """
+    started = time.monotonic()
+    steps: dict[str, Awaitable] = {}
+    if CACHE_SNAPSHOT_PATH:
+        steps["cache_snapshot"] = asyncio.to_thread(load_snapshot, CACHE_SNAPSHOT_PATH)
+    if SPOTIFY_CLIENT_ID:
+        steps["spotify_app_token"] = asyncio.to_thread(warm_app_token)
+    if HTTP_PREWARM_ON_STARTUP:
+        steps["http_connections"] = prewarm_clients()
+    if TAG_FEATURE_MODEL_PATH:
+        steps["tag_feature_model"] = asyncio.to_thread(load_feature_model, TAG_FEATURE_MODEL_PATH)
+    results: dict[str, object] = {}
+
+    async def run(name: str, step: Awaitable) -> None:
+        try:
+            results[name] = await step
+        except Exception as exc:
+            logger.warning("Warm-up step %s failed: %s", name, exc)
+            results[name] = False
+
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(*(run(name, step) for name, step in steps.items())),
+            timeout=WARMUP_TIMEOUT_SECONDS,
+        )
+    except asyncio.TimeoutError:
+        logger.warning("Warm-up timed out after %ss; marking ready anyway", WARMUP_TIMEOUT_SECONDS)
+    finally:
+        _warmup_state.update(
+            ready=True,
+            steps={name: results.get(name, "timeout") for name in steps},
+            seconds=round(time.monotonic() - started, 3),
+        )
+        logger.info("Warm-up finished: %s", _warmup_state)
 
 
 @app.on_event("shutdown")
 async def shutdown_clients() -> None:
-    global _shared_http_client
-    if _shared_http_client is not None:
-        await _shared_http_client.aclose()
-        _shared_http_client = None
+    for task in _background_tasks:
+        task.cancel()
+    await close_clients()
+    # Only a warmed-up instance writes: a replica that was still loading would overwrite a fuller snapshot.
+    if CACHE_SNAPSHOT_PATH and CACHE_SNAPSHOT_INTERVAL_SECONDS > 0 and _warmup_state["ready"]:
+        try:
+            export_snapshot(CACHE_SNAPSHOT_PATH)
+        except (OSError, RuntimeError) as exc:
+            logger.warning("Cache snapshot export failed: %s", exc)
 
 
-async def _enrich_lastfm(
-    seed: TrackInfo,
-    limit: int,
-    exclude: set[str] | None = None,
-    *,
-    use_metadata_fallback: bool = True,
-    user_sp=None,
-) -> tuple[list[TrackInfo], list[str], str | None, str | None]:
-    """Shared Last.fm pipeline: fetch similar tracks, enrich with Spotify/Deezer/tags.
+async def _fetch_lastfm_rows(
+    seed: TrackInfo, exclude: set[str] | None = None,
+) -> tuple[list[dict], list[str]]:
+    """Last.fm similar rows for *seed*, best match first, one row per canonical song.
 
-    Mutates *seed* in-place (adds bpm, tags, preview_url).
-    Returns (enriched_tracks, seed_tags).
+    Fetches the full LASTFM_POOL_FETCH_LIMIT list in one call; rows past the
+    first page stay un-enriched in the candidate pool until a cursor asks for them.
+    Variants of the seed and of *exclude* keys are dropped along with the keys themselves.
     """
     primary_artist = seed.artists[0]
-    fetch_limit = limit
-    if exclude:
-        fetch_limit = min(limit * MIN_FETCH_MULTIPLIER, 250)
-
     lastfm_results, seed_tags = await asyncio.gather(
-        asyncio.to_thread(get_similar_tracks, primary_artist, seed.name, fetch_limit),
+        asyncio.to_thread(get_similar_tracks, primary_artist, seed.name, LASTFM_POOL_FETCH_LIMIT),
         asyncio.to_thread(get_track_tags, primary_artist, seed.name),
     )
-
+    drop_keys = {canonical_key(primary_artist, seed.name)}
     if exclude:
-        filtered_results = [
+        lastfm_results = [
             r for r in lastfm_results
             if f"{r['artist']}::{r['name']}".lower() not in exclude
         ]
-        if len(filtered_results) < limit and fetch_limit < 250:
-            expanded = min(limit * MAX_FETCH_MULTIPLIER, 250)
-            expanded_results = await asyncio.to_thread(
-                get_similar_tracks, primary_artist, seed.name, expanded,
-            )
-            filtered_results = [
-                r for r in expanded_results
-                if f"{r['artist']}::{r['name']}".lower() not in exclude
-            ]
-        lastfm_results = filtered_results
-    lastfm_results = lastfm_results[:limit]
-
-    client = _get_http_client()
-    seed_deezer = await deezer_fetch(client, primary_artist, seed.name)
+        drop_keys.update(canonical_key(*key.split("::", 1)) for key in exclude if "::" in key)
+    ranked = sorted(lastfm_results, key=lambda r: r["match"], reverse=True)
+    return dedupe_lastfm_rows(ranked, drop_keys=drop_keys), seed_tags
+
+
+async def _enrich_seed(seed: TrackInfo, seed_tags: list[str]) -> None:
+    """Mutates *seed* in-place (adds bpm, tags, preview_url, album_art)."""
+    seed_deezer = await deezer_fetch(provider_client("deezer"), seed.artists[0], seed.name)
     seed.bpm = seed_deezer.get("bpm")
     seed.tags = seed_tags
     if not seed.preview_url:
@@ -347,171 +501,387 @@ async def _enrich_lastfm(
     if not seed.album_art:
         seed.album_art = seed_deezer.get("album_art")
 
-    seed_tag_list = [normalize_tag(tag) for tag in seed_tags]
-
-    def fused_similarity_score(lastfm_match: float, tags: list[str], deezer_info: dict) -> float:
-        seed_component = max(0.0, min(lastfm_match, 1.0)) * SPOTIFY_ENRICH_SEED_WEIGHT
-        tag_component = tag_alignment_score(seed_tag_list, tags) * TAG_ALIGNMENT_WEIGHT
-        deezer_component = (
-            (0.5 if deezer_info.get("bpm") is not None else 0.0)
-            + (0.5 if deezer_info.get("preview") else 0.0)
-        ) * DEEZER_SIGNAL_WEIGHT
-        return min(1.0, seed_component + tag_component + deezer_component)
-
-    semaphore = asyncio.Semaphore(MAX_ENRICH_CONCURRENCY)
-    enrich_deadline = time.monotonic() + ENRICH_TIME_BUDGET_SECONDS
-    mapping_degraded_reason: str | None = None
-    external_links_degraded_reason: str | None = None
-    mapping_calls = 0
-    mb_fallback_used = 0
-    external_link_calls = 0
-
-    async def enrich(item: dict, include_tags: bool) -> TrackInfo | None:
-        nonlocal mapping_degraded_reason
-        nonlocal mapping_calls
-        nonlocal mb_fallback_used
-        nonlocal external_link_calls
-        nonlocal external_links_degraded_reason
+
+def _fused_similarity_score(
+    seed_tag_list: list[str], lastfm_match: float, tags: list[str], deezer_info: dict,
+) -> float:
+    """First-pass score of an enriched Last.fm row against a seed's normalized tags."""
+    seed_component = max(0.0, min(lastfm_match, 1.0)) * SPOTIFY_ENRICH_SEED_WEIGHT
+    tag_component = tag_alignment_score(seed_tag_list, tags) * TAG_ALIGNMENT_WEIGHT
+    deezer_component = (
+        (0.5 if deezer_info.get("bpm") is not None else 0.0)
+        + (0.5 if deezer_info.get("preview") else 0.0)
+    ) * DEEZER_SIGNAL_WEIGHT
+    return min(1.0, seed_component + tag_component + deezer_component)
+
+
+async def _enrich_lastfm(
+    seed: Candidate,
+    ranked: list[dict],
+    *,
+    use_metadata_fallback: bool = True,
+    user_sp=None,
+    filters: SimilarityFilters | None = None,
+    reserve: Sequence[dict] = (),
+    scale: int = 1,
+    deezer_info_out: list[dict] | None = None,
+) -> tuple[list[Candidate | None], str | None, str | None]:
+    """Shared Last.fm pipeline: enrich ranked Last.fm rows with Deezer/Spotify/MusicBrainz/tags.
+
+    *ranked* must be best match first; *seed* must already carry its tags.
+    *filters* are pushed down into the step graph: a candidate rejected on a
+    known value skips all later provider calls, keeps the partial row it has so
+    far (so a later rerank with looser filters can still see it), and pulls the
+    next *reserve* row into the queue in its place.
+
+    Returns (rows aligned with *ranked* plus the consumed prefix of *reserve*,
+    None where enrichment failed, mapping_degraded_reason,
+    external_links_degraded_reason).
+
+    *scale* > 1 enriches the merged first pages of that many seeds in one run
+    (see :func:`api_similar_batch`): call ceilings and priority slots grow with
+    it, the time budget up to BATCH_TIME_BUDGET_SCALE_CAP times. When given,
+    *deezer_info_out* receives each returned row's Deezer payload so callers
+    can rescore rows against other seeds with :func:`_fused_similarity_score`.
+    """
+    seed_tag_list = [normalize_tag(tag) for tag in seed.tags or []]
+    plan = FilterPlan(filters)
+
+    mapping_token_source = "user" if user_sp is not None else "app"
+    budget = EnrichBudget(
+        ceilings={
+            "spotify": SPOTIFY_RESOLVE_BUDGET * scale,
+            "musicbrainz": MB_FALLBACK_CAP * scale,
+            # Tag predicates need every candidate's tags, not just the priority head.
+            "tags": len(ranked) + len(reserve) if plan.needs_tags else FULL_TAG_ENRICH_LIMIT * scale,
+            "odesli": EXTERNAL_LINKS_ENRICH_CAP * scale,
+        },
+        time_budget=ENRICH_TIME_BUDGET_SECONDS * min(scale, BATCH_TIME_BUDGET_SCALE_CAP),
+        concurrency=MAX_ENRICH_CONCURRENCY,
+        priority_slots=FULL_TAG_ENRICH_LIMIT * scale,
+        # An open breaker zeroes the provider's allowance, so outages degrade instead of waiting.
+        cooldowns={
+            "spotify": spotify_mapping_cooldown_remaining(mapping_token_source),
+            "musicbrainz": breaker_remaining("musicbrainz"),
+            "tags": breaker_remaining("lastfm"),
+            "odesli": odesli_cooldown_remaining(),
+        },
+    )
+
+    tag_service = TagService(provider_client("lastfm"), deadline=budget.deadline)
+    new_identities: list[TrackIdentity] = []
+    # Miss-set reads and writes are batched per run so Redis round trips stay off the event loop.
+    known_misses: set[str] = set()
+    new_misses: list[str] = []
+
+    async def resolve_mapping(
+        rank: int, *args, cascade: dict, **kwargs,
+    ) -> tuple[TrackInfo | None, str | None]:
+        """Spotify lookup; *cascade* notes whether a miss is a real, unthrottled answer."""
+        if not budget.acquire("spotify", rank, reason_key="mapping"):
+            cascade["complete"] = False
+            return None, None
+        started = time.monotonic()
+        try:
+            # spotipy is blocking; stop waiting at the deadline even if the thread keeps going.
+            result = await asyncio.wait_for(
+                asyncio.to_thread(
+                    resolve_spotify_track_with_source,
+                    *args,
+                    user_sp=user_sp,
+                    allow_app_fallback=user_sp is None,
+                    **kwargs,
+                ),
+                timeout=max(0.0, budget.remaining_seconds()),
+            )
+        except asyncio.TimeoutError:
+            budget.observe("spotify", started, ok=False)
+            budget.mark_degraded("mapping", "enrich_time_budget_exceeded")
+            cascade["complete"] = False
+            return None, None
+        except Exception:
+            budget.observe("spotify", started, ok=False)
+            raise
+        budget.observe("spotify", started)
+        if result[0] is None and not spotify_mapping_allowed(mapping_token_source):
+            # Throttled mid-search: the miss says nothing about the track.
+            cascade["complete"] = False
+        else:
+            cascade["searched"] = True
+        return result
+
+    async def enrich(rank: int, item: dict, progress: dict) -> None:
+        """Run the candidate's step graph; *progress* keeps each step's result as it lands."""
         artist_name = item["artist"]
         track_name = item["name"]
-        match_score = item["match"]
-
-        async with semaphore:
-            try:
-                dz_info = await deezer_fetch(client, artist_name, track_name)
-                candidate_isrc = dz_info.get("isrc") if isinstance(dz_info, dict) else None
-                mapping_source_allowed = (
-                    spotify_mapping_allowed("user")
-                    if user_sp is not None
-                    else spotify_mapping_allowed("app")
-                )
-                mapping_allowed = (
-                    mapping_calls < SPOTIFY_RESOLVE_BUDGET
-                    and time.monotonic() < enrich_deadline
-                    and mapping_source_allowed
-                )
-                sp_track = None
-                mapping_source: str | None = None
-                if mapping_allowed:
-                    mapping_calls += 1
-                    sp_track, mapping_source = await asyncio.to_thread(
-                        resolve_spotify_track_with_source,
-                        artist_name,
-                        track_name,
-                        candidate_isrc,
-                        user_sp=user_sp,
-                        allow_app_fallback=user_sp is None,
-                    )
-                else:
-                    if mapping_calls >= SPOTIFY_RESOLVE_BUDGET:
-                        mapping_degraded_reason = "mapping_limit_reached"
-                    elif not mapping_source_allowed:
-                        mapping_degraded_reason = "spotify_mapping_rate_limited"
-                    elif time.monotonic() >= enrich_deadline:
-                        mapping_degraded_reason = "enrich_time_budget_exceeded"
-
-                if (
-                    sp_track is None
-                    and use_metadata_fallback
-                    and mb_fallback_used < MB_FALLBACK_CAP
-                    and time.monotonic() < enrich_deadline
-                ):
+        deadline = budget.deadline
+
+        if not budget.admits(rank):
+            # Low-value tail work is dropped near the deadline; keep the Last.fm row.
+            budget.mark_degraded("mapping", "enrich_time_budget_exceeded")
+            return
+        # Identities resolved by earlier requests replace the matching provider calls.
+        known = None
+        if identity_registry:
+            known = await asyncio.to_thread(identity_registry.lookup, [text_key(artist_name, track_name)])
+        known_mapping = identity_registry.trusted_mapping(known) if identity_registry else False
+        known_deezer = known.reusable_deezer() if known else None
+        # Whether the Spotify/MusicBrainz cascade ran to a genuine miss (see mapping_misses).
+        cascade = {"searched": False, "complete": True, "known_miss": False}
+
+        def isrc_from(inputs: dict) -> str | None:
+            dz_info = inputs["deezer"]
+            return dz_info.get("isrc") if isinstance(dz_info, dict) else None
+
+        def mapped_from(inputs: dict) -> bool:
+            return any(inputs.get(step) for step in _MAPPING_STEPS)
+
+        def miss_keys(dz_info: dict | None) -> list[str]:
+            isrc = dz_info.get("isrc") if isinstance(dz_info, dict) else None
+            keys = [text_key(artist_name, track_name)]
+            return keys + [f"isrc:{isrc.upper()}"] if isrc else keys
+
+        async def known_miss(dz_info: dict | None) -> bool:
+            keys = miss_keys(dz_info)
+            if keys[0] in known_misses:
+                return True
+            # The ISRC key needs this run's Deezer answer, so it cannot be read up front.
+            return len(keys) > 1 and await asyncio.to_thread(mapping_misses.contains_any, keys[1:])
+
+        def checked(sp_track: TrackInfo | None, source: str | None) -> tuple[TrackInfo, str | None] | None:
+            if not sp_track:
+                return None
+            if plan.rejects_metadata(sp_track.popularity, sp_track.release_year):
+                progress["mapping"] = (sp_track, source)
+                raise CandidateRejected("metadata")
+            return sp_track, source
+
+        async def deezer_step(_inputs: dict) -> dict:
+            if known_deezer:
+                dz_info = known_deezer
+            else:
+                started = time.monotonic()
+                dz_info = await deezer_fetch(provider_client("deezer"), artist_name, track_name, deadline=deadline)
+                outcome = deezer_lookup_outcome(dz_info)
+                if outcome != "skipped":
+                    budget.observe("deezer", started, ok=outcome == "ok")
+                if outcome != "ok":
+                    # No ISRC to search with: a later Spotify miss is not a genuine one.
+                    cascade["complete"] = False
+            if plan.rejects_bpm(dz_info.get("bpm")):
+                progress["deezer"] = dz_info
+                raise CandidateRejected("bpm")
+            return dz_info
+
+        async def tags_step(_inputs: dict) -> list[str]:
+            if not (plan.needs_tags or budget.is_priority(rank)) or not budget.acquire("tags", rank):
+                return []
+            started = time.monotonic()
+            tags = await tag_service.track_tags(artist_name, track_name)
+            if not budget.expired():
+                budget.observe("tags", started, ok=tags is not None)
+            if tags is None:
+                # Unknown, not tagless: keep the row and let the final filter decide, without spending a reserve.
+                return []
+            if plan.rejects_tags([normalize_tag(tag) for tag in tags]):
+                progress["tags"] = tags
+                raise CandidateRejected("tags")
+            return tags
+
+        async def mapping_step(inputs: dict) -> tuple[TrackInfo, str | None] | None:
+            if known_mapping:
+                return checked(TrackInfo(**known.spotify_track), known.mapping_source)
+            if mapping_misses and await known_miss(inputs["deezer"]):
+                cascade["known_miss"] = True
+                return None
+            if not spotify_mapping_allowed(mapping_token_source):
+                budget.mark_degraded("mapping", "spotify_mapping_rate_limited")
+                cascade["complete"] = False
+                return None
+            return checked(*await resolve_mapping(
+                rank, artist_name, track_name, isrc_from(inputs), cascade=cascade,
+            ))
+
+        async def mb_relation_step(inputs: dict) -> tuple[TrackInfo, str | None] | None:
+            if mapped_from(inputs) or cascade["known_miss"]:
+                return None
+            if not use_metadata_fallback:
+                # Spotify alone missing is not a miss for requests that do use MusicBrainz.
+                cascade["complete"] = False
+                return None
+            candidate_isrc = isrc_from(inputs)
+            # The local dump index is free, so only web lookups count against the MB budget.
+            answered, mb_spotify_id = musicbrainz_local_relation_id(artist_name, track_name, candidate_isrc)
+            if not answered:
+                if not budget.available("musicbrainz", rank):
+                    cascade["complete"] = False
+                    return None
+                started = time.monotonic()
+                try:
                     mb_spotify_id = await fetch_musicbrainz_spotify_relation_id(
-                        client,
-                        artist_name,
-                        track_name,
-                        candidate_isrc,
+                        provider_client("musicbrainz"), artist_name, track_name, candidate_isrc, deadline=deadline,
                     )
-                    if mb_spotify_id and mapping_calls < SPOTIFY_RESOLVE_BUDGET:
-                        mapping_calls += 1
-                        sp_track, mapping_source = await asyncio.to_thread(
-                            resolve_spotify_track_with_source,
-                            artist_name,
-                            track_name,
-                            candidate_isrc,
-                            user_sp=user_sp,
-                            spotify_id_hint=mb_spotify_id,
-                            allow_app_fallback=user_sp is None,
-                        )
-
-                if (
-                    sp_track is None
-                    and use_metadata_fallback
-                    and mb_fallback_used < MB_FALLBACK_CAP
-                    and time.monotonic() < enrich_deadline
-                    and mapping_source_allowed
-                ):
+                except CircuitOpen:
+                    budget.mark_degraded("mapping", "musicbrainz_circuit_open")
+                    cascade["complete"] = False
+                    return None
+                except MusicBrainzUnavailable:
+                    budget.observe("musicbrainz", started, ok=False)
+                    cascade["complete"] = False
+                    return None
+                budget.observe("musicbrainz", started)
+            if not mb_spotify_id:
+                return None
+            return checked(*await resolve_mapping(
+                rank, artist_name, track_name, candidate_isrc, spotify_id_hint=mb_spotify_id, cascade=cascade,
+            ))
+
+        async def mb_hints_step(inputs: dict) -> tuple[TrackInfo, str | None] | None:
+            if mapped_from(inputs) or cascade["known_miss"]:
+                return None
+            if not use_metadata_fallback:
+                cascade["complete"] = False
+                return None
+            if not spotify_mapping_allowed(mapping_token_source):
+                cascade["complete"] = False
+                return None
+            candidate_isrc = isrc_from(inputs)
+            answered, hints = musicbrainz_local_hints(artist_name, track_name, candidate_isrc)
+            if not answered:
+                if not budget.acquire("musicbrainz", rank):
+                    cascade["complete"] = False
+                    return None
+                started = time.monotonic()
+                try:
                     hints = await fetch_musicbrainz_hints(
-                        client, artist_name, track_name, candidate_isrc,
+                        provider_client("musicbrainz"), artist_name, track_name, candidate_isrc, deadline=deadline,
                     )
-                    mb_fallback_used += 1
-                    hint_isrc, hint_artist, hint_title = hints
-                    if (
-                        any(h is not None for h in hints)
-                        and mapping_calls < SPOTIFY_RESOLVE_BUDGET
-                        and _should_retry_spotify_resolve(
-                            artist_name,
-                            track_name,
-                            candidate_isrc,
-                            hint_isrc,
-                            hint_artist,
-                            hint_title,
-                        )
-                    ):
-                        mapping_calls += 1
-                        sp_track, mapping_source = await asyncio.to_thread(
-                            resolve_spotify_track_with_source,
-                            hint_artist or artist_name,
-                            hint_title or track_name,
-                            hint_isrc or candidate_isrc,
-                            user_sp=user_sp,
-                            allow_app_fallback=user_sp is None,
-                        )
-
-                tags: list[str] = []
-                if include_tags and time.monotonic() < enrich_deadline:
-                    tags = await fetch_track_tags(client, artist_name, track_name)
-            except Exception:
-                logger.warning("Failed to enrich '%s - %s'", artist_name, track_name)
+                except CircuitOpen:
+                    budget.mark_degraded("mapping", "musicbrainz_circuit_open")
+                    cascade["complete"] = False
+                    return None
+                except MusicBrainzUnavailable:
+                    budget.observe("musicbrainz", started, ok=False)
+                    cascade["complete"] = False
+                    return None
+                budget.observe("musicbrainz", started)
+            hint_isrc, hint_artist, hint_title = hints
+            if not any(h is not None for h in hints) or not _should_retry_spotify_resolve(
+                artist_name,
+                track_name,
+                candidate_isrc,
+                hint_isrc,
+                hint_artist,
+                hint_title,
+            ):
                 return None
-
-        normalized_tags = [normalize_tag(tag) for tag in tags]
-        fused_score = fused_similarity_score(match_score, normalized_tags, dz_info)
-        if sp_track:
-            sp_track.match_score = fused_score
-            sp_track.bpm = dz_info.get("bpm")
-            sp_track.tags = normalized_tags
-            sp_track.spotify_mapping_status = "mapped"
-            sp_track.mapping_source = mapping_source
-            if not sp_track.preview_url:
-                sp_track.preview_url = dz_info.get("preview")
-            if not sp_track.album_art:
-                sp_track.album_art = dz_info.get("album_art")
-            return sp_track
-
-        external_links: dict[str, str] = {}
-        external_primary_provider: str | None = None
-        if (
-            external_link_calls < EXTERNAL_LINKS_ENRICH_CAP
-            and time.monotonic() < enrich_deadline
-        ):
-            external_link_calls += 1
-            external_links, external_primary_provider = await resolve_external_links(
-                client,
+            return checked(*await resolve_mapping(
+                rank,
+                hint_artist or artist_name,
+                hint_title or track_name,
+                hint_isrc or candidate_isrc,
+                cascade=cascade,
+            ))
+
+        async def external_links_step(inputs: dict) -> tuple[dict[str, str], str | None] | None:
+            if mapped_from(inputs):
+                return None
+            if known and known.external_links:
+                return known.external_links, known.external_primary_provider
+            if not budget.acquire("odesli", rank, reason_key="external_link"):
+                return None
+            dz_info = inputs["deezer"]
+            started = time.monotonic()
+            links = await resolve_external_links(
+                provider_client("odesli"),
                 artist=artist_name,
                 title=track_name,
-                isrc=candidate_isrc,
+                isrc=isrc_from(inputs),
                 deezer_url=dz_info.get("link") if isinstance(dz_info, dict) else None,
+                deadline=deadline,
             )
-        else:
-            if external_link_calls >= EXTERNAL_LINKS_ENRICH_CAP:
-                external_links_degraded_reason = "external_link_limit_reached"
-            elif time.monotonic() >= enrich_deadline:
-                external_links_degraded_reason = "enrich_time_budget_exceeded"
-
-        return TrackInfo(
-            name=track_name,
-            artists=[artist_name],
+            budget.observe("odesli", started)
+            return links
+
+        # Tags need nothing; the mapping chain hangs off Deezer's ISRC (and waits
+        # for tags when a tag predicate may still reject the candidate); Odesli
+        # only runs for candidates the whole chain failed to map.
+        graph = StepGraph()
+        graph.add("deezer", deezer_step)
+        graph.add("tags", tags_step)
+        graph.add("mapping", mapping_step, needs=("deezer", "tags") if plan.needs_tags else ("deezer",))
+        graph.add("mb_relation", mb_relation_step, needs=("deezer", "mapping"))
+        graph.add("mb_hints", mb_hints_step, needs=("deezer", "mapping", "mb_relation"))
+        graph.add("external_links", external_links_step, needs=("deezer", *_MAPPING_STEPS))
+        try:
+            await graph.run(progress)
+        except CandidateRejected:
+            progress["rejected"] = True
+            if reserve_rows:
+                submit(len(ranked_all), reserve_rows.pop(0))
+            return
+        except Exception:
+            logger.warning("Failed to enrich '%s - %s'", artist_name, track_name)
+            progress["failed"] = True
+            return
+        if identity_registry and not (known_mapping and known_deezer):
+            remember_identity(item, progress, deezer_fetched=not known_deezer)
+        if (
+            mapping_misses
+            and cascade["searched"]
+            and cascade["complete"]
+            and not any(progress.get(step) for step in _MAPPING_STEPS)
+        ):
+            new_misses.extend(miss_keys(progress.get("deezer")))
+
+    def remember_identity(item: dict, progress: dict, *, deezer_fetched: bool) -> None:
+        """Queue what this run resolved for the registry; written in one batch after the run."""
+        dz_info = progress.get("deezer") or {}
+        identity = TrackIdentity(
+            artist=item["artist"],
+            title=item["name"],
+            isrc=dz_info.get("isrc"),
+            deezer_id=deezer_track_id(dz_info.get("link")),
+            deezer=dz_info if any(dz_info.values()) else None,
+            deezer_fetched_at=time.time() if deezer_fetched and "deezer" in progress else None,
+        )
+        mapped = next((progress[step] for step in _MAPPING_STEPS if progress.get(step)), None)
+        if mapped:
+            sp_track, mapping_source = mapped
+            identity.spotify_id = sp_track.spotify_id
+            identity.spotify_track = sp_track.model_dump(include=_SPOTIFY_CATALOG_FIELDS)
+            identity.mapping_source = mapping_source
+            identity.confidence = mapping_confidence(mapping_source)
+        links, primary = progress.get("external_links") or ({}, None)
+        if links:
+            identity.external_links = links
+            identity.external_primary_provider = primary
+        if identity.deezer or identity.spotify_track or identity.external_links:
+            new_identities.append(identity)
+
+    def build_row(item: dict, progress: dict) -> Candidate:
+        dz_info = progress.get("deezer") or {}
+        normalized_tags = [normalize_tag(tag) for tag in progress.get("tags") or []]
+        fused_score = _fused_similarity_score(seed_tag_list, item["match"], normalized_tags, dz_info)
+        mapped = next((progress[step] for step in _MAPPING_STEPS if progress.get(step)), None)
+        if mapped:
+            sp_track, mapping_source = mapped
+            row = Candidate.from_info(sp_track)
+            row.match_score = fused_score
+            row.bpm = dz_info.get("bpm")
+            row.tags = normalized_tags
+            row.spotify_mapping_status = "mapped"
+            row.mapping_source = mapping_source
+            if not row.preview_url:
+                row.preview_url = dz_info.get("preview")
+            if not row.album_art:
+                row.album_art = dz_info.get("album_art")
+            return row
+
+        external_links, external_primary_provider = progress.get("external_links") or ({}, None)
+        return Candidate(
+            name=item["name"],
+            artists=[item["artist"]],
             album="",
             album_art=dz_info.get("album_art") or item.get("image"),
             preview_url=dz_info.get("preview"),
@@ -524,25 +894,64 @@ async def _enrich_lastfm(
             spotify_mapping_status="unmapped",
         )
 
-    top_batch = lastfm_results[:FULL_TAG_ENRICH_LIMIT]
-    tail_batch = lastfm_results[FULL_TAG_ENRICH_LIMIT:]
-    top_results = await asyncio.gather(*(enrich(item, include_tags=True) for item in top_batch))
-    tail_results = await asyncio.gather(*(enrich(item, include_tags=False) for item in tail_batch))
-    results = [*top_results, *tail_results]
+    # Workers always take the best-ranked pending candidate, so the head is
+    # fully enriched (with tags) first and the tail fills idle slots.
+    ranked_all: list[dict] = []
+    progress_by_rank: list[dict] = []
+    reserve_rows = list(reserve)
+    queue = PriorityWorkQueue(MAX_ENRICH_CONCURRENCY)
+
+    def submit(rank: int, item: dict) -> None:
+        ranked_all.append(item)
+        progress_by_rank.append({})
+        queue.submit(rank, lambda: enrich(rank, item, progress_by_rank[rank]))
+
+    if mapping_misses:
+        known_misses.update(await asyncio.to_thread(
+            mapping_misses.known, [text_key(item["artist"], item["name"]) for item in (*ranked, *reserve)],
+        ))
+    for item in ranked:
+        submit(len(ranked_all), item)
+    stats = await queue.drain(
+        timeout=max(0.0, budget.remaining_seconds()) + ENRICH_CANCEL_GRACE_SECONDS,
+    )
+    if stats.cancelled or stats.dropped:
+        # Past the deadline: keep whatever each straggler has enriched so far.
+        budget.mark_degraded("mapping", "enrich_time_budget_exceeded")
+    if new_identities:
+        await asyncio.to_thread(identity_registry.record_many, new_identities)
+    if new_misses:
+        await asyncio.to_thread(mapping_misses.add, new_misses)
+    _last_enrich_queue_stats.clear()
+    _last_enrich_queue_stats.update(stats.as_dict())
+    _last_enrich_queue_stats.update({f"tags_{k}": v for k, v in tag_service.stats.items()})
+    _enrich_totals.update(
+        runs=1, submitted=stats.submitted, completed=stats.completed,
+        cancelled=stats.cancelled, dropped=stats.dropped,
+    )
+    _enrich_totals.update({f"tags_{k}": v for k, v in tag_service.stats.items()})
+    logger.info("Enrichment queue: %s", _last_enrich_queue_stats)
+    if plan.rejected:
+        logger.info("Filter pushdown rejected %s; %d reserve rows used", plan.rejected, len(ranked_all) - len(ranked))
+    results = [
+        None if state.get("failed") else build_row(item, state)
+        for item, state in zip(ranked_all, progress_by_rank)
+    ]
+    if deezer_info_out is not None:
+        deezer_info_out.extend(state.get("deezer") or {} for state in progress_by_rank)
 
     return (
-        [r for r in results if r is not None],
-        [normalize_tag(tag) for tag in seed_tags],
-        mapping_degraded_reason,
-        external_links_degraded_reason,
+        results,
+        budget.degraded_reason("mapping"),
+        budget.degraded_reason("external_link"),
     )
 
 
-def _track_tag_set(track: TrackInfo) -> set[str]:
+def _track_tag_set(track: Candidate) -> set[str]:
     return {normalize_tag(tag) for tag in (track.tags or [])}
 
 
-def _instrumental_bias_score(track: TrackInfo) -> float:
+def _instrumental_bias_score(track: Candidate) -> float:
     tags = _track_tag_set(track)
     if not tags:
         return 0.0
@@ -557,7 +966,7 @@ def _instrumental_bias_score(track: TrackInfo) -> float:
     return 0.25
 
 
-def _fused_rank_value(track: TrackInfo) -> tuple[float, float, float]:
+def _fused_rank_value(track: Candidate) -> tuple[float, float, float]:
     mapping_boost = 0.05 if track.spotify_id else 0.0
     return (
         (track.match_score or 0.0) + mapping_boost,
@@ -566,34 +975,34 @@ def _fused_rank_value(track: TrackInfo) -> tuple[float, float, float]:
     )
 
 
-def _mapping_summary(tracks: Sequence[TrackInfo]) -> tuple[int, int]:
+def _mapping_summary(tracks: Sequence[Candidate]) -> tuple[int, int]:
     mapped = sum(1 for track in tracks if track.spotify_id)
     return mapped, max(0, len(tracks) - mapped)
 
 
+def _blend_key(track: Candidate) -> str:
+    return canonical_key(track.artists[0] if track.artists else "", track.name)
+
+
 def _blend_track_lists(
-    listener_tracks: list[TrackInfo],
-    audio_tracks: list[TrackInfo],
+    listener_tracks: list[Candidate],
+    audio_tracks: list[Candidate],
     *,
     listener_weight: float = 0.55,
-) -> list[TrackInfo]:
-    by_key: dict[str, TrackInfo] = {}
+) -> list[Candidate]:
+    by_key: dict[str, Candidate] = {}
     listener_scores: dict[str, float] = {}
     audio_scores: dict[str, float] = {}
     sources: dict[str, set[str]] = {}
 
-    def track_key(track: TrackInfo) -> str:
-        artist = track.artists[0] if track.artists else ""
-        return f"{artist.strip().lower()}::{track.name.strip().lower()}"
-
     for track in listener_tracks:
-        key = track_key(track)
+        key = _blend_key(track)
         by_key[key] = track
         listener_scores[key] = float(track.match_score or 0.0)
         sources.setdefault(key, set()).add("listener")
 
     for track in audio_tracks:
-        key = track_key(track)
+        key = _blend_key(track)
         if key not in by_key:
             by_key[key] = track
         elif not by_key[key].spotify_id and track.spotify_id:
@@ -601,7 +1010,7 @@ def _blend_track_lists(
         audio_scores[key] = float(track.match_score or 0.0)
         sources.setdefault(key, set()).add("audio")
 
-    blended: list[TrackInfo] = []
+    blended: list[Candidate] = []
     for key, track in by_key.items():
         ls = listener_scores.get(key, 0.0)
         aps = audio_scores.get(key, 0.0)
@@ -622,53 +1031,19 @@ def _blend_track_lists(
 
 
 def _apply_backend_filters(
-    tracks: list[TrackInfo],
+    tracks: list[Candidate],
     filters: SimilarityFilters,
-) -> list[TrackInfo]:
-    filtered: list[TrackInfo] = []
-    wanted_tags = {normalize_tag(tag) for tag in filters.tags_any}
-    for track in tracks:
-        if filters.bpm_min is not None and (track.bpm is None or track.bpm < filters.bpm_min):
-            continue
-        if filters.bpm_max is not None and (track.bpm is None or track.bpm > filters.bpm_max):
-            continue
-        # Metadata fields are often missing on fallback-enriched tracks.
-        # Do not exclude unknown values here; let client-side post-filters
-        # handle strict filtering when metadata is available.
-        if (
-            filters.popularity_min is not None
-            and track.popularity is not None
-            and track.popularity < filters.popularity_min
-        ):
-            continue
-        if (
-            filters.popularity_max is not None
-            and track.popularity is not None
-            and track.popularity > filters.popularity_max
-        ):
-            continue
-        if (
-            filters.release_year_min is not None
-            and track.release_year is not None
-            and track.release_year < filters.release_year_min
-        ):
-            continue
-        if (
-            filters.release_year_max is not None
-            and track.release_year is not None
-            and track.release_year > filters.release_year_max
-        ):
-            continue
-        if filters.require_instrumental is True:
-            tags = {normalize_tag(tag) for tag in (track.tags or [])}
-            if not bool(tags & INSTRUMENTAL_TAGS):
-                continue
-        if wanted_tags:
-            tags = {normalize_tag(tag) for tag in (track.tags or [])}
-            if not (tags & wanted_tags):
-                continue
-        filtered.append(track)
-    return filtered
+    *,
+    strict: bool = True,
+) -> list[Candidate]:
+    """Drop tracks failing *filters*; ``strict=False`` also keeps rows whose BPM is still unknown."""
+    # Metadata fields are often missing on fallback-enriched tracks. Unknown
+    # popularity/year values pass here; client-side post-filters handle strict
+    # filtering when metadata is available.
+    plan = FilterPlan(filters)
+    check = plan.accepts if strict else plan.admits
+    return [track for track in tracks if check(track)]
+
 
 def _should_retry_spotify_resolve(
     artist_name: str,
@@ -720,111 +1095,520 @@ def _effective_weights_unified(
     )
 
 
-async def _enrich_analysis_metrics(tracks: list[TrackInfo], client: httpx.AsyncClient) -> None:
-    async def enrich_single(track: TrackInfo) -> None:
-        artist = track.artists[0] if track.artists else ""
-        metrics = await fetch_analysis_metrics(
-            artist=artist,
-            title=track.name,
-            spotify_id=track.spotify_id,
-            client=client,
-        )
-        if metrics:
-            track.analysis_metrics = {**(track.analysis_metrics or {}), **metrics}
-            if track.bpm is None and isinstance(metrics.get("tempo"), (int, float)):
-                track.bpm = float(metrics["tempo"])
-
-    await asyncio.gather(*(enrich_single(track) for track in tracks))
+async def _enrich_analysis_metrics(tracks: list[Candidate], client: httpx.AsyncClient | None) -> set[str]:
+    """Attach SoundNet metrics; tracks sharing a blend key share one lookup.
 
+    Without a *client* only already-cached metrics are attached (no upstream call).
+    Returns the blend keys whose lookup completed (metrics or a remembered miss are
+    cached); keys skipped by the breaker or a missing API key are left out.
+    """
+    by_key: dict[str, list[Candidate]] = {}
+    for track in tracks:
+        by_key.setdefault(_blend_key(track), []).append(track)
+    samples: list[FeatureSample] = []
+    completed: set[str] = set()
 
-@app.post("/api/similar/unified", response_model=SimilarTracksResponse)
-async def api_similar_unified(req: UnifiedSimilarRequest, request: Request):
-    mapping_user_sp = _get_mapping_user_sp(request)
+    async def enrich_group(key: str, group: list[Candidate]) -> None:
+        track = next((t for t in group if t.spotify_id), group[0])
+        artist = track.artists[0] if track.artists else ""
+        if client is None:
+            metrics = cached_analysis_metrics(artist, track.name)
+        else:
+            metrics = await fetch_analysis_metrics(
+                artist=artist,
+                title=track.name,
+                spotify_id=track.spotify_id,
+                client=client,
+            )
+        if metrics or cached_analysis_metrics(artist, track.name) is not None:
+            completed.add(key)
+        if not metrics:
+            return
+        # BPM as known before analysis (Deezer), the same input the model sees at inference.
+        known_bpm = track.bpm
+        for member in group:
+            member.analysis_metrics = {**(member.analysis_metrics or {}), **metrics}
+            if member.bpm is None and isinstance(metrics.get("tempo"), (int, float)):
+                member.bpm = float(metrics["tempo"])
+        features = features_from_analysis(metrics)
+        if client is not None and track.tags and features:
+            samples.append(FeatureSample(
+                artist=artist,
+                title=track.name,
+                tags=list(track.tags),
+                bpm=known_bpm,
+                features=features,
+                source="soundnet",
+            ))
+
+    await asyncio.gather(*(enrich_group(key, group) for key, group in by_key.items()))
+    if feature_samples is not None and samples:
+        await asyncio.to_thread(feature_samples.record_many, samples)
+    return completed
+
+
+async def _resolve_unified_seed(req: SeedSpec, mapping_user_sp) -> TrackInfo:
     url_clean = req.resolved_spotify_url()
     if url_clean:
         try:
-            seed = await asyncio.to_thread(get_track_info, url_clean, mapping_user_sp)
+            return await asyncio.to_thread(get_track_info, url_clean, mapping_user_sp)
         except ValueError as exc:
             raise HTTPException(status_code=400, detail=str(exc))
         except Exception as exc:
             raise HTTPException(status_code=502, detail=f"Spotify API error: {exc}")
-    else:
-        artist = (req.seed_artist or "").strip()
-        title = (req.seed_track or "").strip()
-        if not artist or not title:
-            raise HTTPException(
-                status_code=400,
-                detail="seed_artist and seed_track are required when url is empty",
-            )
-        seed = TrackInfo(
-            name=title,
-            artists=[artist],
-            album="",
-            spotify_mapping_status="unmapped",
+    artist = (req.seed_artist or "").strip()
+    title = (req.seed_track or "").strip()
+    if not artist or not title:
+        raise HTTPException(
+            status_code=400,
+            detail="seed_artist and seed_track are required when url is empty",
         )
+    return TrackInfo(
+        name=title,
+        artists=[artist],
+        album="",
+        spotify_mapping_status="unmapped",
+    )
+
+
+def _audio_limit(limit: int) -> int:
+    """How many audio-scored rows feed the blend for a result *limit*."""
+    return max(limit, min(limit * 2, 100))
+
+
+def _page_row_counts(limit: int, strict_mapped_only: bool) -> tuple[int, int]:
+    """(listener rows, total rows) of Last.fm to enrich for one page of *limit* results.
+
+    Listener ranking uses the head of the slice; audio scoring uses all of it.
+    """
+    listener_rows = _listener_fetch_limit(limit, strict_mapped_only)
+    return listener_rows, max(listener_rows, _listener_fetch_limit(_audio_limit(limit), False))
+
+
+async def _enrich_pool_page(
+    pool: CandidatePool, limit: int, user_sp, filters: SimilarityFilters,
+) -> tuple[list[Candidate], list[Candidate]]:
+    """Enrich the next Last.fm slice of *pool* and add it to the pool as one cursor page.
+
+    *filters* are pushed down into enrichment; rows they reject are replaced
+    from the Last.fm tail. Scoring later only touches copies of the page's rows.
+    SoundNet analysis is not run here: see :func:`_rank_with_analysis`.
+    """
+    offset = pool.next_offset
+    listener_rows, total_rows = _page_row_counts(limit, pool.strict_mapped_only)
+    items = pool.lastfm_rows[offset:offset + total_rows]
+    enriched, mapping_degraded_reason, external_links_degraded_reason = await _enrich_lastfm(
+        pool.seed,
+        items,
+        use_metadata_fallback=pool.use_metadata_fallback,
+        user_sp=user_sp,
+        filters=filters,
+        reserve=pool.lastfm_rows[offset + total_rows:offset + 2 * total_rows],
+    )
+    return _add_pool_page(
+        pool, offset, enriched, listener_rows, filters,
+        mapping_degraded_reason, external_links_degraded_reason,
+    )
+
 
+def _add_pool_page(
+    pool: CandidatePool,
+    offset: int,
+    enriched: list[Candidate | None],
+    listener_rows: int,
+    filters: SimilarityFilters,
+    mapping_degraded_reason: str | None,
+    external_links_degraded_reason: str | None,
+) -> tuple[list[Candidate], list[Candidate]]:
+    """Record *enriched* (the Last.fm rows from *offset* on) as one cursor page of *pool*."""
+    plan = FilterPlan(filters)
+    audio = [track for track in enriched if track]
+    # The listener head is the first *listener_rows* candidates that survived pushdown;
+    # rejected partial rows ride along so a looser rerank can still reach them.
+    listener: list[Candidate] = []
+    admitted = 0
+    for track in audio:
+        if admitted >= listener_rows:
+            break
+        listener.append(track)
+        admitted += plan.admits(track)
+
+    pool.next_offset = offset + len(enriched)
+    pool.pages[offset] = (listener, audio, pool.next_offset)
+    pool.listener_tracks.extend(listener)
+    pool.audio_tracks.extend(audio)
+    pool.mapping_degraded_reason = mapping_degraded_reason
+    pool.external_links_degraded_reason = external_links_degraded_reason
+    return listener, audio
+
+
+async def _build_candidate_pool(
+    seed: TrackInfo, req: UnifiedSimilarRequest, mapping_user_sp,
+) -> CandidatePool:
+    """All upstream I/O of a unified search: one Last.fm fetch, seed lookup, first page."""
+    pool = await _start_candidate_pool(seed, req)
+    await _enrich_pool_page(pool, req.limit, mapping_user_sp, req.filters)
+    return pool
+
+
+async def _start_candidate_pool(
+    seed: TrackInfo, req: UnifiedSimilarRequest | BatchSimilarRequest,
+) -> CandidatePool:
+    """Pool for *seed* with its Last.fm rows and enriched seed, before any page is enriched."""
     exclude = set(req.exclude) if req.exclude else None
-    fetch_limit = _listener_fetch_limit(req.limit, req.strict_mapped_only)
     try:
-        listener_similar, seed_tags, mapping_degraded_reason, external_links_degraded_reason = await _enrich_lastfm(
-            seed,
-            fetch_limit,
-            exclude,
-            use_metadata_fallback=req.use_metadata_fallback,
-            user_sp=mapping_user_sp,
-        )
+        lastfm_rows, seed_tags = await _fetch_lastfm_rows(seed, exclude)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
     except Exception as exc:
         raise HTTPException(status_code=502, detail=f"Last.fm API error: {exc}")
+    await _enrich_seed(seed, seed_tags)
 
-    effective_weights = _effective_weights_unified(
-        req.weights, req.instrumental_similarity_only
-    )
-    audio_req = AudioSimilarRequest(
-        url=url_clean or "",
-        limit=max(req.limit, min(req.limit * 2, 100)),
-        weights=effective_weights,
-        exclude=req.exclude,
-        strict_mapped_only=False,
+    pool = CandidatePool(
+        seed=Candidate.from_info(seed),
+        seed_tags=[normalize_tag(tag) for tag in seed_tags],
+        limit=req.limit,
+        strict_mapped_only=req.strict_mapped_only,
         use_metadata_fallback=req.use_metadata_fallback,
+        lastfm_rows=lastfm_rows,
     )
-    audio_response = await _audio_fallback_path(seed, audio_req, request)
-    blend_listener = 0.35 if req.instrumental_similarity_only else 0.55
+    return pool
+
+
+def _rank_candidate_pool(
+    pool: CandidatePool,
+    *,
+    weights: AudioWeights,
+    instrumental_similarity_only: bool,
+    filters: SimilarityFilters,
+    limit: int | None = None,
+    pool_id: str | None = None,
+    page: tuple[list[Candidate], list[Candidate]] | None = None,
+    strict: bool = True,
+) -> SimilarTracksResponse:
+    """Score, blend and filter a stored pool (or one *page* of it).
+
+    Pure CPU work; the pool itself is never mutated.
+    """
+    limit = limit or pool.limit
+    listener_tracks, audio_tracks = page or (pool.listener_tracks, pool.audio_tracks)
+    seed = pool.seed.copy()
+    listener_similar = [track.copy() for track in listener_tracks]
+    audio_similar = _score_audio_fallback(
+        seed,
+        [track.copy() for track in audio_tracks],
+        weights=_effective_weights_unified(weights, instrumental_similarity_only),
+        limit=_audio_limit(limit),
+    )
+    blend_listener = 0.35 if instrumental_similarity_only else 0.55
     blended = _blend_track_lists(
         listener_similar,
-        audio_response.similar_tracks,
+        audio_similar,
         listener_weight=blend_listener,
     )
 
-    all_tags: set[str] = set(seed_tags)
-    for t in blended:
-        all_tags.update(t.tags or [])
-    for t in audio_response.seed_tags:
-        all_tags.add(t)
-    tag_categories = build_tag_categories(list(all_tags))
-
-    client = _get_http_client()
-    await _enrich_analysis_metrics(blended, client)
-    filtered = _apply_backend_filters(blended, req.filters)
+    tag_categories = build_pool_tag_categories([pool.seed_tags, *(t.tags or [] for t in blended)])
 
-    return _build_similar_response(
+    filtered = _apply_backend_filters(blended, filters, strict=strict)
+    response = _build_similar_response(
         seed=seed,
         similar_ranked=filtered,
-        limit=req.limit,
-        strict_mapped_only=req.strict_mapped_only,
-        seed_tags=seed_tags,
+        limit=limit,
+        strict_mapped_only=pool.strict_mapped_only,
+        seed_tags=pool.seed_tags,
         tag_categories=tag_categories,
-        mapping_degraded_reason=mapping_degraded_reason,
-        external_links_degraded_reason=external_links_degraded_reason,
+        mapping_degraded_reason=pool.mapping_degraded_reason,
+        external_links_degraded_reason=pool.external_links_degraded_reason,
         approximated=True,
     )
+    response.pool_id = pool_id
+    if pool_id and not pool.exhausted:
+        response.next_cursor = encode_cursor(pool_id, pool.next_offset)
+    return response
+
+
+async def _rank_with_analysis(
+    pool: CandidatePool, client: httpx.AsyncClient | None, **rank_kwargs,
+) -> SimilarTracksResponse:
+    """Rank *pool*, running SoundNet only for rows that can appear in the response.
+
+    A lenient first pass (unknown BPM kept, since SoundNet tempo may fill it)
+    picks the response-sized slice. That slice is analysed once per pool and the
+    metrics are written back to the pool rows. The strict pass then builds the
+    response. With ``client=None`` only cached metrics are attached.
+    """
+    pool_id = rank_kwargs.pop("pool_id", None)
+    return (await _rank_pools_with_analysis([(pool, pool_id)], client, **rank_kwargs))[0]
+
+
+async def _rank_pools_with_analysis(
+    pools: Sequence[tuple[CandidatePool, str | None]], client: httpx.AsyncClient | None, **rank_kwargs,
+) -> list[SimilarTracksResponse]:
+    """:func:`_rank_with_analysis` for several (pool, pool_id) pairs with one SoundNet pass.
+
+    Rows of different pools that share a blend key share one analysis lookup.
+    """
+    targets: dict[int, Candidate] = {}
+    analyzed: list[tuple[CandidatePool, set[str]]] = []
+    for pool, pool_id in pools:
+        candidates = _rank_candidate_pool(pool, **rank_kwargs, pool_id=pool_id, strict=False)
+        keys = {_blend_key(track) for track in candidates.similar_tracks} - pool.analyzed_keys
+        if not keys:
+            continue
+        targets.update(
+            (id(track), track)
+            for track in (*pool.listener_tracks, *pool.audio_tracks)
+            if _blend_key(track) in keys
+        )
+        analyzed.append((pool, keys))
+    if targets:
+        completed = await _enrich_analysis_metrics(list(targets.values()), client)
+        if client is not None:
+            # Breaker-refused lookups are not cached; leave them for the next page or rerank.
+            for pool, keys in analyzed:
+                pool.analyzed_keys.update(keys & completed)
+    return [_rank_candidate_pool(pool, **rank_kwargs, pool_id=pool_id) for pool, pool_id in pools]
+
+
+@app.post("/api/similar/unified", response_model=SimilarTracksResponse)
+async def api_similar_unified(req: UnifiedSimilarRequest, request: Request, fields: str | None = None):
+    """*fields* (comma-separated TrackInfo fields) trims every track in the response; see json_response."""
+    track_fields = parse_fields(fields)
+    mapping_user_sp = _get_mapping_user_sp(request)
+    seed = await _resolve_unified_seed(req, mapping_user_sp)
+    pool = await _build_candidate_pool(seed, req, mapping_user_sp)
+    response = await _rank_with_analysis(
+        pool,
+        provider_client("soundnet"),
+        weights=req.weights,
+        instrumental_similarity_only=req.instrumental_similarity_only,
+        filters=req.filters,
+        pool_id=candidate_pools.put(pool),
+    )
+    return json_response(request, response, fields=track_fields)
+
+
+def _pool_or_404(pool_id: str) -> CandidatePool:
+    pool = candidate_pools.get(pool_id)
+    if pool is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Candidate pool expired or unknown; run the search again.",
+        )
+    return pool
+
+
+@app.post("/api/similar/rerank", response_model=SimilarTracksResponse)
+async def api_similar_rerank(req: RerankRequest, request: Request, fields: str | None = None):
+    """Re-score a pool from an earlier unified search with new weights/filters; no upstream calls."""
+    track_fields = parse_fields(fields)
+    response = await _rank_with_analysis(
+        _pool_or_404(req.pool_id),
+        None,
+        weights=req.weights,
+        instrumental_similarity_only=req.instrumental_similarity_only,
+        filters=req.filters,
+        limit=req.limit,
+        pool_id=req.pool_id,
+    )
+    return json_response(request, response, fields=track_fields)
+
+
+@app.post("/api/similar/more", response_model=SimilarTracksResponse)
+async def api_similar_more(req: SimilarPageRequest, request: Request, fields: str | None = None):
+    """Next page of a unified search: enrich only the Last.fm rows behind *cursor*."""
+    track_fields = parse_fields(fields)
+    decoded = decode_cursor(req.cursor)
+    if decoded is None:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    pool_id, offset = decoded
+    pool = _pool_or_404(pool_id)
+    async with pool.lock:
+        page = pool.pages.get(offset)
+        if page is None:
+            if offset != pool.next_offset or pool.exhausted:
+                raise HTTPException(status_code=400, detail="Cursor does not match this pool")
+            await _enrich_pool_page(
+                pool, req.limit or pool.limit, _get_mapping_user_sp(request), req.filters,
+            )
+            page = pool.pages[offset]
+    listener, audio, _ = page
+    response = await _rank_with_analysis(
+        pool,
+        provider_client("soundnet"),
+        weights=req.weights,
+        instrumental_similarity_only=req.instrumental_similarity_only,
+        filters=req.filters,
+        limit=req.limit,
+        pool_id=pool_id,
+        page=(listener, audio),
+    )
+    return json_response(request, response, fields=track_fields)
+
+
+async def _enrich_pools_shared(
+    pools: list[CandidatePool], limit: int, user_sp, filters: SimilarityFilters,
+) -> tuple[int, int]:
+    """Enrich the first page of every pool in one run, each distinct candidate once.
+
+    The pools' page slices are merged by canonical key, interleaved by rank so
+    every seed's head is enriched first, and enriched together. Each pool then
+    gets its own copies of the rows, rescored against its seed. Rows rejected by
+    pushdown are not replaced from the Last.fm tail here.
+    Returns (candidate rows across pools, distinct candidates enriched).
+    """
+    slices: list[tuple[list[dict], int]] = []
+    for pool in pools:
+        listener_rows, total_rows = _page_row_counts(limit, pool.strict_mapped_only)
+        slices.append((pool.lastfm_rows[:total_rows], listener_rows))
+    positions: dict[str, int] = {}
+    union: list[dict] = []
+    ordered = sorted(
+        ((rank, index, item) for index, (items, _) in enumerate(slices) for rank, item in enumerate(items)),
+        key=lambda entry: (entry[0], entry[1]),
+    )
+    for _, _, item in ordered:
+        key = canonical_key(item["artist"], item["name"])
+        if key not in positions:
+            positions[key] = len(union)
+            union.append(item)
+
+    deezer_infos: list[dict] = []
+    enriched, mapping_degraded_reason, external_links_degraded_reason = await _enrich_lastfm(
+        pools[0].seed,
+        union,
+        use_metadata_fallback=pools[0].use_metadata_fallback,
+        user_sp=user_sp,
+        filters=filters,
+        scale=len(pools),
+        deezer_info_out=deezer_infos,
+    )
+    for pool, (items, listener_rows) in zip(pools, slices):
+        seed_tag_list = [normalize_tag(tag) for tag in pool.seed.tags or []]
+        rows: list[Candidate | None] = []
+        for item in items:
+            position = positions[canonical_key(item["artist"], item["name"])]
+            shared = enriched[position]
+            if shared is None:
+                rows.append(None)
+                continue
+            row = shared.copy()
+            row.match_score = _fused_similarity_score(
+                seed_tag_list, item["match"], row.tags, deezer_infos[position],
+            )
+            rows.append(row)
+        _add_pool_page(
+            pool, 0, rows, listener_rows, filters,
+            mapping_degraded_reason, external_links_degraded_reason,
+        )
+    return sum(len(items) for items, _ in slices), len(union)
+
+
+def _merge_seed_rankings(
+    responses: Sequence[SimilarTracksResponse], seeds: Sequence[Candidate], limit: int,
+) -> list[TrackInfo]:
+    """One ranking across seeds: mean match score over all seeds (0 where a seed did not list the track)."""
+    seed_keys = {_blend_key(seed) for seed in seeds}
+    totals: dict[str, float] = {}
+    counts: dict[str, int] = {}
+    tracks: dict[str, TrackInfo] = {}
+    for response in responses:
+        for track in response.similar_tracks:
+            key = _blend_key(track)
+            if key in seed_keys:
+                continue
+            totals[key] = totals.get(key, 0.0) + (track.match_score or 0.0)
+            counts[key] = counts.get(key, 0) + 1
+            if key not in tracks or (not tracks[key].spotify_id and track.spotify_id):
+                tracks[key] = track
+    ranked = sorted(totals, key=lambda key: (totals[key], counts[key]), reverse=True)[:limit]
+    return [
+        tracks[key].model_copy(update={
+            "match_score": totals[key] / len(responses),
+            "analysis_metrics": {**tracks[key].analysis_metrics, "seedCount": float(counts[key])},
+        })
+        for key in ranked
+    ]
+
+
+async def _similar_batch(
+    req: BatchSimilarRequest, mapping_user_sp, *, store_pools: bool = True,
+) -> BatchSimilarResponse:
+    """Similar tracks for every seed of *req*; shared by /api/similar/batch and scripts/batch_similar.py.
+
+    A lone seed takes the unified path (with reserve refill); several seeds
+    share one enrichment run. With *store_pools* each pool is kept for
+    rerank/more and its response carries a pool_id and cursor.
+    """
+
+    starts = asyncio.Semaphore(BATCH_SEED_START_CONCURRENCY)
+
+    async def start(spec: SeedSpec) -> CandidatePool:
+        async with starts:
+            return await _start_candidate_pool(await _resolve_unified_seed(spec, mapping_user_sp), req)
+
+    started = await asyncio.gather(*(start(spec) for spec in req.seeds), return_exceptions=True)
+    errors: dict[int, tuple[str, int]] = {}
+    for index, outcome in enumerate(started):
+        if isinstance(outcome, HTTPException):
+            errors[index] = (str(outcome.detail), outcome.status_code)
+        elif isinstance(outcome, Exception):
+            logger.warning("Batch seed %d failed: %s", index, outcome)
+            errors[index] = (f"Seed failed: {outcome}", 500)
+    pools = [outcome for outcome in started if isinstance(outcome, CandidatePool)]
+
+    candidate_rows = unique_candidates = 0
+    responses: list[SimilarTracksResponse] = []
+    if len(pools) == 1:
+        await _enrich_pool_page(pools[0], req.limit, mapping_user_sp, req.filters)
+        candidate_rows = unique_candidates = pools[0].next_offset
+    elif pools:
+        candidate_rows, unique_candidates = await _enrich_pools_shared(
+            pools, req.limit, mapping_user_sp, req.filters,
+        )
+    if pools:
+        responses = await _rank_pools_with_analysis(
+            [(pool, candidate_pools.put(pool) if store_pools else None) for pool in pools],
+            provider_client("soundnet"),
+            weights=req.weights,
+            instrumental_similarity_only=req.instrumental_similarity_only,
+            filters=req.filters,
+        )
+    by_index = iter(responses)
+    return BatchSimilarResponse.model_construct(
+        results=[
+            BatchSeedResult.model_construct(
+                seed=spec, result=None, error=errors[index][0], status=errors[index][1],
+            )
+            if index in errors
+            else BatchSeedResult.model_construct(seed=spec, result=next(by_index), error=None, status=None)
+            for index, spec in enumerate(req.seeds)
+        ],
+        merged_tracks=_merge_seed_rankings(responses, [pool.seed for pool in pools], req.limit)
+        if req.merge and responses else [],
+        candidate_rows=candidate_rows,
+        unique_candidates=unique_candidates,
+    )
+
+
+@app.post("/api/similar/batch", response_model=BatchSimilarResponse)
+async def api_similar_batch(req: BatchSimilarRequest, request: Request, fields: str | None = None):
+    """Similar tracks for several seeds, enriching each distinct candidate once.
+
+    Every seed gets its own pool (usable with /api/similar/rerank and
+    /api/similar/more) and its own result; a seed that fails reports an
+    error without failing the batch. ``merge=true`` adds one merged ranking.
+    """
+    track_fields = parse_fields(fields)
+    response = await _similar_batch(req, _get_mapping_user_sp(request))
+    return json_response(request, response, fields=track_fields)
 
 
 @app.post("/api/similar", response_model=SimilarTracksResponse)
-async def api_similar(req: TrackRequest, request: Request):
+async def api_similar(req: TrackRequest, request: Request, fields: str | None = None):
     return await api_similar_unified(
-        UnifiedSimilarRequest(
+        # Fields were validated on the incoming request; skip a second validation pass.
+        UnifiedSimilarRequest.model_construct(
             url=req.url,
             limit=req.limit,
             exclude=req.exclude,
@@ -834,13 +1618,15 @@ async def api_similar(req: TrackRequest, request: Request):
             weights=AudioWeights(),
         ),
         request,
+        fields,
     )
 
 
 @app.post("/api/similar/audio", response_model=SimilarTracksResponse)
-async def api_similar_audio(req: AudioSimilarRequest, request: Request):
+async def api_similar_audio(req: AudioSimilarRequest, request: Request, fields: str | None = None):
     return await api_similar_unified(
-        UnifiedSimilarRequest(
+        # Fields were validated on the incoming request; skip a second validation pass.
+        UnifiedSimilarRequest.model_construct(
             url=req.url,
             limit=req.limit,
             weights=req.weights,
@@ -850,6 +1636,7 @@ async def api_similar_audio(req: AudioSimilarRequest, request: Request):
             filters=SimilarityFilters(),
         ),
         request,
+        fields,
     )
 
 
@@ -859,7 +1646,10 @@ async def _audio_spotify_path(
     req: AudioSimilarRequest,
     user_sp=None,
 ) -> SimilarTracksResponse:
-    """Spotify-native path: recommendations + real audio features."""
+    """Spotify-native path: recommendations + real audio features.
+
+    Dormant: /api/similar/audio delegates to the unified flow, so nothing calls this.
+    """
     seed.audio_features = seed_features
     seed.bpm = seed_features.tempo
 
@@ -913,8 +1703,8 @@ async def _audio_spotify_path(
 
     candidates.sort(key=lambda t: t.match_score or 0, reverse=True)
     return _build_similar_response(
-        seed=seed,
-        similar_ranked=candidates,
+        seed=Candidate.from_info(seed),
+        similar_ranked=[Candidate.from_info(track) for track in candidates],
         limit=req.limit,
         strict_mapped_only=req.strict_mapped_only,
         seed_tags=[],
@@ -922,51 +1712,27 @@ async def _audio_spotify_path(
     )
 
 
-async def _audio_fallback_path(
-    seed: TrackInfo, req: AudioSimilarRequest, request: Request,
-) -> SimilarTracksResponse:
-    """Fallback: Last.fm candidates + tag-estimated features + weighted scoring."""
-    exclude = set(req.exclude) if req.exclude else None
-    fetch_limit = _listener_fetch_limit(req.limit, req.strict_mapped_only)
-    mapping_user_sp = _get_mapping_user_sp(request)
-    try:
-        similar, seed_tags, mapping_degraded_reason, external_links_degraded_reason = await _enrich_lastfm(
-            seed,
-            fetch_limit,
-            exclude,
-            use_metadata_fallback=req.use_metadata_fallback,
-            user_sp=mapping_user_sp,
-        )
-    except ValueError as exc:
-        raise HTTPException(status_code=400, detail=str(exc))
-    except Exception as exc:
-        raise HTTPException(status_code=502, detail=f"Last.fm API error: {exc}")
-
-    seed.audio_features = estimate_features_from_tags(seed.tags or [], seed.bpm)
-    seed_features = seed.audio_features
+def _score_audio_fallback(
+    seed: Candidate,
+    similar: list[Candidate],
+    *,
+    weights: AudioWeights,
+    limit: int,
+) -> list[Candidate]:
+    """Tag-estimated features + weighted scoring over fallback candidates (mutates them); top *limit*."""
+    seed_features, *features = estimate_features_batch(
+        [seed.tags or [], *(track.tags or [] for track in similar)],
+        [seed.bpm, *(track.bpm for track in similar)],
+    )
+    seed.audio_features = seed_features
 
-    for track in similar:
-        track.audio_features = estimate_features_from_tags(track.tags or [], track.bpm)
+    for track, track_features in zip(similar, features):
+        track.audio_features = track_features
         if track.audio_features and seed_features:
-            track.match_score = compute_similarity(seed_features, track.audio_features, req.weights)
+            track.match_score = compute_similarity(seed_features, track.audio_features, weights)
 
     similar.sort(key=_fused_rank_value, reverse=True)
-
-    all_tags: set[str] = set(seed_tags)
-    for t in similar:
-        all_tags.update(t.tags or [])
-
-    return _build_similar_response(
-        seed=seed,
-        similar_ranked=similar,
-        limit=req.limit,
-        strict_mapped_only=req.strict_mapped_only,
-        seed_tags=seed_tags,
-        tag_categories=build_tag_categories(list(all_tags)),
-        mapping_degraded_reason=mapping_degraded_reason,
-        external_links_degraded_reason=external_links_degraded_reason,
-        approximated=True,
-    )
+    return _seeded_ranking(seed, similar)[:limit]
 
 
 @app.get("/api/health")
@@ -974,11 +1740,18 @@ def health():
     return {"status": "ok"}
 
 
+@app.get("/api/ready")
+def ready():
+    """Readiness: 503 until startup warm-up has finished (see ``_warm_up``)."""
+    if not _warmup_state["ready"]:
+        return JSONResponse(status_code=503, content={"status": "warming_up"})
+    return {"status": "ready", **_warmup_state}
+
+
 if ENABLE_DEBUG_ENDPOINT:
     @app.get("/api/debug/tags")
     def debug_tags(artist: str, track: str):
         """Diagnostic endpoint: test Last.fm tag fetching for a single track."""
-        import httpx as _httpx
         from backend.config import LASTFM_API_KEY as _key
 
         params = {
@@ -989,11 +1762,28 @@ if ENABLE_DEBUG_ENDPOINT:
             "format": "json",
             "autocorrect": 1,
         }
-        resp = _httpx.get("https://ws.audioscrobbler.com/2.0/", params=params, timeout=10)
+        resp = provider_sync_client("lastfm").get("https://ws.audioscrobbler.com/2.0/", params=params)
         raw = resp.json()
         parsed = get_track_tags(artist, track)
         return {"raw_response": raw, "parsed_tags": parsed}
 
+    @app.get("/api/debug/enrich-stats")
+    def debug_enrich_stats():
+        """Diagnostic endpoint: last enrichment queue stats, provider step health and hedging."""
+        return {
+            "queue": dict(_last_enrich_queue_stats),
+            "queue_totals": dict(_enrich_totals),
+            "step_health": {
+                provider: vars(step_health(provider))
+                for provider in ("deezer", "spotify", "musicbrainz", "tags", "odesli")
+            },
+            "hedging": hedge_stats(),
+            "http_clients": client_stats(),
+            "circuit_breakers": breaker_snapshot(),
+            "spotify_feature_cache": feature_cache_stats(),
+            "caches": cache_stats(),
+        }
+
 
 # ---------------------------------------------------------------------------
 # Spotify OAuth + user-scoped actions (playlist, queue)
@@ -1269,10 +2059,12 @@ async def spotify_resolve_uris(req: ResolveUrisRequest, request: Request):
     stopped_rate_limited = False
     chunk_size = 25
     mb_resolved = 0
+    mb_local = 0
     mb_miss = 0
     spotify_search_resolved = 0
     mb_errors = 0
-    http_client: httpx.AsyncClient | None = _get_http_client() if req.use_musicbrainz_first else None
+    http_client: httpx.AsyncClient | None = provider_client("musicbrainz") if req.use_musicbrainz_first else None
+    mb_circuit_open = False
 
     for i, item in enumerate(req.items):
         if stopped_rate_limited:
@@ -1283,21 +2075,29 @@ async def spotify_resolve_uris(req: ResolveUrisRequest, request: Request):
         rate_limited = False
 
         if req.use_musicbrainz_first and http_client is not None:
-            mb_id: str | None = None
-            mb_lookup_ok = False
-            try:
-                mb_id = await fetch_musicbrainz_spotify_relation_id(
-                    http_client,
-                    item.artist,
-                    item.title,
-                    None,
-                )
-                mb_lookup_ok = True
-            except Exception:
-                mb_errors += 1
-                mb_id = None
-            # MusicBrainz etiquette: ~1 request per second per application.
-            await asyncio.sleep(1.05)
+            mb_lookup_ok, mb_id = musicbrainz_local_relation_id(item.artist, item.title, None)
+            if mb_lookup_ok:
+                mb_local += 1
+            elif not mb_circuit_open:
+                try:
+                    mb_id = await fetch_musicbrainz_spotify_relation_id(
+                        http_client,
+                        item.artist,
+                        item.title,
+                        None,
+                    )
+                    mb_lookup_ok = True
+                except CircuitOpen:
+                    # Refused without a request: no pacing needed, and later items would be refused too.
+                    mb_circuit_open = True
+                    mb_errors += 1
+                    mb_id = None
+                except Exception:
+                    mb_errors += 1
+                    mb_id = None
+                if not mb_circuit_open:
+                    # MusicBrainz etiquette: ~1 request per second per application.
+                    await asyncio.sleep(1.05)
             if _valid_spotify_track_id(mb_id):
                 uri = f"spotify:track:{mb_id}"
                 mb_resolved += 1
@@ -1331,6 +2131,7 @@ async def spotify_resolve_uris(req: ResolveUrisRequest, request: Request):
     }
     if req.use_musicbrainz_first:
         meta["resolved_via_mb"] = mb_resolved
+        meta["mb_local_lookups"] = mb_local
         meta["mb_no_spotify_link"] = mb_miss
         meta["resolved_via_spotify_search"] = spotify_search_resolved
         meta["mb_errors"] = mb_errors
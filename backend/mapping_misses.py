@@ -0,0 +1,100 @@
+"""Shared set of Spotify mappings known to fail.
+
+An unmappable Last.fm candidate costs up to three Spotify searches plus the
+MusicBrainz fallbacks, and it costs that again on every request that surfaces
+it. Misses are remembered here, keyed by normalized artist/title and by ISRC,
+for ``ttl_seconds``. Entries expire on their own, so catalog additions are
+picked up on a later retry. Only complete, non-throttled mapping cascades may be
+recorded; a rate-limited miss says nothing about the track.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Sequence
+
+from backend.cache_snapshot import register_cache
+from backend.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class MappingMissSet:
+    backend_key = "none"
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+
+    def contains_any(self, keys: Sequence[str]) -> bool:
+        return bool(self.known(keys))
+
+    def known(self, keys: Sequence[str]) -> set[str]:
+        """The subset of *keys* recorded as misses, in one round trip."""
+        raise NotImplementedError
+
+    def add(self, keys: Sequence[str]) -> None:
+        raise NotImplementedError
+
+
+class MemoryMappingMissSet(MappingMissSet):
+    backend_key = "memory"
+
+    def __init__(self, ttl_seconds: float, max_entries: int) -> None:
+        super().__init__(ttl_seconds)
+        self._items: TTLCache[bool] = TTLCache(max_entries, ttl_seconds)
+        register_cache("mapping_misses", self._items)
+
+    def known(self, keys: Sequence[str]) -> set[str]:
+        return {key for key in keys if key in self._items}
+
+    def add(self, keys: Sequence[str]) -> None:
+        for key in keys:
+            self._items.set(key, True)
+
+
+class RedisMappingMissSet(MappingMissSet):
+    backend_key = "redis"
+
+    def __init__(self, redis_url: str, ttl_seconds: float, key_prefix: str = "catid:miss:") -> None:
+        super().__init__(ttl_seconds)
+        import redis
+
+        self._redis = redis.Redis.from_url(redis_url, decode_responses=True)
+        self._prefix = key_prefix
+
+    def known(self, keys: Sequence[str]) -> set[str]:
+        if not keys:
+            return set()
+        try:
+            values = self._redis.mget([f"{self._prefix}{key}" for key in keys])
+        except Exception as exc:
+            logger.warning("Mapping miss lookup failed: %s", exc)
+            return set()
+        return {key for key, value in zip(keys, values) if value}
+
+    def add(self, keys: Sequence[str]) -> None:
+        try:
+            pipe = self._redis.pipeline()
+            for key in keys:
+                pipe.set(f"{self._prefix}{key}", "1", ex=int(self.ttl_seconds))
+            pipe.execute()
+        except Exception as exc:
+            logger.warning("Mapping miss write failed: %s", exc)
+
+
+def build_mapping_miss_set(
+    backend: str,
+    *,
+    redis_url: str,
+    ttl_seconds: float,
+    max_entries: int,
+) -> MappingMissSet | None:
+    """Miss set for *backend* (``memory``, ``redis``); None when disabled."""
+    if backend in {"", "none", "off"}:
+        return None
+    if backend == "redis":
+        try:
+            return RedisMappingMissSet(redis_url, ttl_seconds)
+        except Exception as exc:
+            logger.warning("Mapping miss backend redis unavailable, falling back to memory: %s", exc)
+    return MemoryMappingMissSet(ttl_seconds, max_entries)
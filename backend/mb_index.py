@@ -0,0 +1,268 @@
+"""Local MusicBrainz index built from the JSON data dumps.
+
+musicbrainz.org allows about one request per second, which is why MusicBrainz
+fallback is capped per search and paced in bulk URI resolution. This module
+builds a compact SQLite index from the ``recording`` JSON dump (one JSON
+object per line, as in ``recording.tar.xz`` from data.metabrainz.org) so the
+hint and Spotify-relation lookups in ``metadata_fallback`` are answered
+locally:
+
+- ISRC → recordings → (artist, title, Spotify track relation)
+- normalized artist + title → recordings
+
+Only recordings with an ISRC or a Spotify URL relation are stored in full;
+every other recording contributes a 64-bit hash of its artist/title key, so a
+local miss is still a definitive answer and never needs the web API.
+
+Build with::
+
+    python -m backend.mb_index /path/to/recording.tar.xz --out data/musicbrainz.sqlite3
+"""
+
+from __future__ import annotations
+
+import argparse
+import bz2
+import gzip
+import hashlib
+import json
+import logging
+import lzma
+import os
+import sqlite3
+import tarfile
+import threading
+import time
+from collections.abc import Iterator
+from typing import IO, Any
+
+from backend.metadata_fallback import (
+    _first_isrc_from_recording,
+    _primary_artist_name,
+    _sanitize_mb_query_part,
+    _spotify_track_id_from_relations,
+)
+
+logger = logging.getLogger(__name__)
+
+INDEX_SCHEMA_VERSION = "1"
+IMPORT_BATCH_SIZE = 5000
+
+
+def text_key(artist: str, title: str) -> str:
+    return f"{_sanitize_mb_query_part(artist)}::{_sanitize_mb_query_part(title)}"
+
+
+def _text_hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
+
+
+class MusicBrainzIndex:
+    """Read-only lookups; each returns ``(answered, value)``.
+
+    ``answered`` is False only when the dump does not know the recording at
+    all, in which case the caller should fall back to the web API.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+        meta = dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+        if meta.get("schema_version") != INDEX_SCHEMA_VERSION:
+            raise ValueError(f"Unsupported MusicBrainz index schema: {meta.get('schema_version')}")
+        self.meta = meta
+
+    def _rows(self, sql: str, params: tuple) -> list[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _by_isrc(self, isrc: str) -> list[tuple]:
+        return self._rows(
+            "SELECT r.isrc, r.artist, r.title, r.spotify_id FROM recording_isrc i "
+            "JOIN recording r ON r.id = i.recording_id WHERE i.isrc = ? ORDER BY r.spotify_id IS NULL",
+            (isrc.strip().upper(),),
+        )
+
+    def _by_text(self, artist: str, title: str) -> tuple[bool, list[tuple]]:
+        key = text_key(artist, title)
+        text_hash = _text_hash(key)
+        rows = [
+            row
+            for row in self._rows(
+                "SELECT r.isrc, r.artist, r.title, r.spotify_id FROM recording_text t "
+                "JOIN recording r ON r.id = t.recording_id WHERE t.text_hash = ? "
+                "ORDER BY r.spotify_id IS NULL, r.isrc IS NULL",
+                (text_hash,),
+            )
+            if text_key(row[1] or "", row[2] or "") == key
+        ]
+        if rows:
+            return True, rows
+        seen = self._rows("SELECT 1 FROM text_seen WHERE text_hash = ?", (text_hash,))
+        return bool(seen), []
+
+    def spotify_relation_id(self, artist: str, title: str, isrc: str | None) -> tuple[bool, str | None]:
+        if isrc and isrc.strip():
+            rows = self._by_isrc(isrc)
+            return True, next((row[3] for row in rows[:3] if row[3]), None)
+        answered, rows = self._by_text(artist, title)
+        return answered, next((row[3] for row in rows if row[3]), None)
+
+    def hints(
+        self, artist: str, title: str, isrc: str | None,
+    ) -> tuple[bool, tuple[str | None, str | None, str | None]]:
+        if isrc and isrc.strip():
+            rows = self._by_isrc(isrc)
+            if not rows:
+                return True, (isrc.strip().upper(), None, None)
+            hint_isrc, hint_artist, hint_title, _ = rows[0]
+            return True, (hint_isrc or isrc.strip().upper(), hint_artist, hint_title)
+        answered, rows = self._by_text(artist, title)
+        if not rows:
+            return answered, (None, None, None)
+        hint_isrc, hint_artist, hint_title, _ = rows[0]
+        return True, (hint_isrc, hint_artist, hint_title)
+
+
+def open_index(path: str) -> MusicBrainzIndex | None:
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        index = MusicBrainzIndex(path)
+    except Exception as exc:
+        logger.warning("MusicBrainz index at %s unusable, using the web API: %s", path, exc)
+        return None
+    logger.info("MusicBrainz local index loaded: %s", index.meta)
+    return index
+
+
+# ---------------------------------------------------------------------------
+# Importer
+# ---------------------------------------------------------------------------
+
+def _open_dump(path: str) -> Iterator[IO[bytes]]:
+    """Yield a byte stream of JSON lines from a plain/compressed file or a dump tarball."""
+    if ".tar" in os.path.basename(path):
+        with tarfile.open(path, "r|*") as tar:
+            for member in tar:
+                if member.isfile() and member.name.endswith("mbdump/recording"):
+                    stream = tar.extractfile(member)
+                    if stream is not None:
+                        yield stream
+                        return
+        raise ValueError(f"No mbdump/recording member in {path}")
+    openers = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+    opener = openers.get(os.path.splitext(path)[1], open)
+    with opener(path, "rb") as stream:
+        yield stream
+
+
+def _index_rows(recording: dict[str, Any]) -> tuple[tuple, list[str], str] | None:
+    rec_id = recording.get("id")
+    title = str(recording.get("title") or "").strip()
+    if not rec_id or not title:
+        return None
+    artist = _primary_artist_name(recording) or ""
+    isrcs = [str(v).strip().upper() for v in recording.get("isrcs") or [] if str(v).strip()]
+    spotify_id = _spotify_track_id_from_relations(recording.get("relations"))
+    row = (rec_id, title, artist, _first_isrc_from_recording(recording), spotify_id)
+    return row, isrcs, text_key(artist, title)
+
+
+def build_index(dump_path: str, out_path: str) -> dict[str, int]:
+    """Import *dump_path* into a fresh SQLite index, atomically replacing *out_path*."""
+    tmp_path = f"{out_path}.building"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(tmp_path)
+    conn.executescript(
+        """
+        PRAGMA journal_mode=OFF;
+        PRAGMA synchronous=OFF;
+        CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        CREATE TABLE recording (
+            id TEXT PRIMARY KEY, title TEXT NOT NULL, artist TEXT, isrc TEXT, spotify_id TEXT
+        ) WITHOUT ROWID;
+        CREATE TABLE recording_isrc (isrc TEXT NOT NULL, recording_id TEXT NOT NULL);
+        CREATE TABLE recording_text (text_hash INTEGER NOT NULL, recording_id TEXT NOT NULL);
+        CREATE TABLE text_seen (text_hash INTEGER PRIMARY KEY) WITHOUT ROWID;
+        """
+    )
+    counts = {"recordings": 0, "indexed": 0, "isrcs": 0, "spotify_relations": 0, "skipped": 0}
+    recordings: list[tuple] = []
+    isrc_rows: list[tuple] = []
+    text_rows: list[tuple] = []
+    seen_rows: list[tuple] = []
+
+    def flush() -> None:
+        conn.executemany("INSERT OR REPLACE INTO recording VALUES (?, ?, ?, ?, ?)", recordings)
+        conn.executemany("INSERT INTO recording_isrc VALUES (?, ?)", isrc_rows)
+        conn.executemany("INSERT INTO recording_text VALUES (?, ?)", text_rows)
+        conn.executemany("INSERT OR IGNORE INTO text_seen VALUES (?)", seen_rows)
+        conn.commit()
+        for rows in (recordings, isrc_rows, text_rows, seen_rows):
+            rows.clear()
+
+    started = time.monotonic()
+    for stream in _open_dump(dump_path):
+        for line in stream:
+            try:
+                parsed = _index_rows(json.loads(line))
+            except ValueError:
+                parsed = None
+            if parsed is None:
+                counts["skipped"] += 1
+                continue
+            row, isrcs, key = parsed
+            counts["recordings"] += 1
+            text_hash = _text_hash(key)
+            seen_rows.append((text_hash,))
+            if isrcs or row[4]:
+                counts["indexed"] += 1
+                counts["isrcs"] += len(isrcs)
+                counts["spotify_relations"] += 1 if row[4] else 0
+                recordings.append(row)
+                isrc_rows.extend((isrc, row[0]) for isrc in isrcs)
+                text_rows.append((text_hash, row[0]))
+            if len(seen_rows) >= IMPORT_BATCH_SIZE:
+                flush()
+            if counts["recordings"] % 500_000 == 0:
+                logger.info("Imported %d recordings (%.0fs)", counts["recordings"], time.monotonic() - started)
+    flush()
+    conn.executescript(
+        """
+        CREATE INDEX recording_isrc_idx ON recording_isrc (isrc);
+        CREATE INDEX recording_text_idx ON recording_text (text_hash);
+        """
+    )
+    conn.executemany(
+        "INSERT INTO meta VALUES (?, ?)",
+        [
+            ("schema_version", INDEX_SCHEMA_VERSION),
+            ("source", os.path.basename(dump_path)),
+            ("built_at", str(int(time.time()))),
+            *((name, str(value)) for name, value in counts.items()),
+        ],
+    )
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+    os.replace(tmp_path, out_path)
+    return counts
+
+
+def main() -> None:
+    from backend.config import MUSICBRAINZ_INDEX_PATH
+
+    parser = argparse.ArgumentParser(description="Build the local MusicBrainz index from a recording JSON dump.")
+    parser.add_argument("dump", help="recording.tar.xz, or an mbdump/recording JSON-lines file (optionally .gz/.bz2/.xz)")
+    parser.add_argument("--out", default=MUSICBRAINZ_INDEX_PATH, help="SQLite index path (default: %(default)s)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    counts = build_index(args.dump, args.out)
+    print(json.dumps({"out": args.out, **counts}))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,18 @@ from __future__ import annotations
 
 import logging
 import re
-from typing import Any
+import sqlite3
+import time
+from typing import TYPE_CHECKING, Any
 
 import httpx
 
+from backend.circuit_breaker import CircuitOpen, get_breaker
+from backend.http_policy import DeadlineExceeded, deadline_timeout
+
+if TYPE_CHECKING:
+    from backend.mb_index import MusicBrainzIndex
+
 logger = logging.getLogger(__name__)
 
 MUSICBRAINZ_RECORDING_SEARCH = "https://musicbrainz.org/ws/2/recording"
@@ -15,10 +23,17 @@ MUSICBRAINZ_ISRC = "https://musicbrainz.org/ws/2/isrc"
 MUSICBRAINZ_RECORDING_LOOKUP = "https://musicbrainz.org/ws/2/recording"
 # MusicBrainz requires a descriptive User-Agent with contact URL.
 MB_USER_AGENT = "cat-id/2.1 (+https://github.com/FelineWeise/cat-id)"
+MB_TIMEOUT_SECONDS = 6.0
+_MB_HEADERS = {"User-Agent": MB_USER_AGENT, "Accept": "application/json"}
+# musicbrainz.org answers 503 when the rate limit is exceeded, so those count as failures too.
+_breaker = get_breaker("musicbrainz", base_cooldown=30.0, max_cooldown=300.0, slow_call_seconds=5.0)
 
 _NON_ALNUM = re.compile(r"[^a-z0-9\s]", re.I)
 _SPOTIFY_TRACK_RE = re.compile(r"open\.spotify\.com/track/([a-zA-Z0-9]{22})")
 
+# Local dump index (see backend.mb_index); None means web API only.
+_local_index: MusicBrainzIndex | None = None
+
 
 def _sanitize_mb_query_part(value: str) -> str:
     cleaned = _NON_ALNUM.sub(" ", value).strip().lower()
@@ -74,37 +89,109 @@ def _spotify_track_id_from_relations(relations: list[dict[str, Any]] | None) ->
     return None
 
 
+class MusicBrainzUnavailable(Exception):
+    """A web lookup failed (transport error, 5xx/429, bad payload) rather than finding nothing."""
+
+
+def _found(resp: httpx.Response) -> bool:
+    """True for a 200; raises :class:`MusicBrainzUnavailable` when the server failed or throttled."""
+    if resp.status_code >= 500 or resp.status_code == 429:
+        raise MusicBrainzUnavailable(f"HTTP {resp.status_code}")
+    return resp.status_code == 200
+
+
+async def _mb_get(
+    client: httpx.AsyncClient,
+    url: str,
+    params: dict,
+    deadline: float | None,
+) -> httpx.Response:
+    timeout = deadline_timeout(MB_TIMEOUT_SECONDS, deadline)
+    if not _breaker.allow():
+        raise CircuitOpen(_breaker.name)
+    started = time.monotonic()
+    try:
+        resp = await client.get(url, params=params, headers=_MB_HEADERS, timeout=timeout)
+    except httpx.TransportError:
+        _breaker.record_failure()
+        raise
+    except BaseException:
+        _breaker.release()
+        raise
+    if resp.status_code >= 500 or resp.status_code == 429:
+        _breaker.record_failure()
+    else:
+        _breaker.record_success(time.monotonic() - started)
+    return resp
+
+
+def configure_local_index(index: MusicBrainzIndex | None) -> None:
+    global _local_index
+    _local_index = index
+
+
+def local_spotify_relation_id(
+    artist: str, track_name: str, known_isrc: str | None,
+) -> tuple[bool, str | None]:
+    """Answer from the local index: ``(answered, spotify_id)``; not answered means ask the web API."""
+    if _local_index is None:
+        return False, None
+    try:
+        return _local_index.spotify_relation_id(artist, track_name, known_isrc)
+    except sqlite3.Error as exc:
+        logger.warning("MusicBrainz local index lookup failed: %s", exc)
+        return False, None
+
+
+def local_hints(
+    artist: str, track_name: str, known_isrc: str | None,
+) -> tuple[bool, tuple[str | None, str | None, str | None]]:
+    """Answer from the local index: ``(answered, (isrc, artist, title))``."""
+    if _local_index is None:
+        return False, (None, None, None)
+    try:
+        return _local_index.hints(artist, track_name, known_isrc)
+    except sqlite3.Error as exc:
+        logger.warning("MusicBrainz local index lookup failed: %s", exc)
+        return False, (None, None, None)
+
+
 async def fetch_musicbrainz_spotify_relation_id(
     client: httpx.AsyncClient,
     artist: str,
     track_name: str,
     known_isrc: str | None,
+    *,
+    deadline: float | None = None,
 ) -> str | None:
-    """Resolve a Spotify track id from MusicBrainz URL relations when available."""
-    headers = {"User-Agent": MB_USER_AGENT, "Accept": "application/json"}
+    """Resolve a Spotify track id from MusicBrainz URL relations when available.
+
+    The local dump index answers first; each web request is clamped to *deadline*
+    (monotonic), past which the lookup returns None. Raises :class:`CircuitOpen`
+    while musicbrainz.org is tripped and :class:`MusicBrainzUnavailable` when the
+    lookup fails, so callers can tell a skip or an error from a miss.
+    """
+    answered, spotify_id = local_spotify_relation_id(artist, track_name, known_isrc)
+    if answered:
+        return spotify_id
     try:
         if known_isrc and known_isrc.strip():
             isrc_clean = known_isrc.strip().upper()
-            isrc_resp = await client.get(
-                f"{MUSICBRAINZ_ISRC}/{isrc_clean}",
-                params={"fmt": "json"},
-                headers=headers,
-                timeout=6.0,
-            )
-            if isrc_resp.status_code != 200:
+            isrc_resp = await _mb_get(client, f"{MUSICBRAINZ_ISRC}/{isrc_clean}", {"fmt": "json"}, deadline)
+            if not _found(isrc_resp):
                 return None
             recordings = (isrc_resp.json() or {}).get("recordings") or []
             for recording in recordings[:3]:
                 rec_id = recording.get("id")
                 if not rec_id:
                     continue
-                rec_resp = await client.get(
+                rec_resp = await _mb_get(
+                    client,
                     f"{MUSICBRAINZ_RECORDING_LOOKUP}/{rec_id}",
-                    params={"fmt": "json", "inc": "url-rels"},
-                    headers=headers,
-                    timeout=6.0,
+                    {"fmt": "json", "inc": "url-rels"},
+                    deadline,
                 )
-                if rec_resp.status_code != 200:
+                if not _found(rec_resp):
                     continue
                 spotify_id = _spotify_track_id_from_relations((rec_resp.json() or {}).get("relations"))
                 if spotify_id:
@@ -116,13 +203,13 @@ async def fetch_musicbrainz_spotify_relation_id(
         if len(a) < 2 or len(t) < 2:
             return None
         query = f'artist:"{a}" AND recording:"{t}"'
-        search_resp = await client.get(
+        search_resp = await _mb_get(
+            client,
             MUSICBRAINZ_RECORDING_SEARCH,
-            params={"query": query, "fmt": "json", "limit": 5, "inc": "url-rels"},
-            headers=headers,
-            timeout=6.0,
+            {"query": query, "fmt": "json", "limit": 5, "inc": "url-rels"},
+            deadline,
         )
-        if search_resp.status_code != 200:
+        if not _found(search_resp):
             return None
         recordings = (search_resp.json() or {}).get("recordings") or []
         for rec in recordings:
@@ -130,14 +217,18 @@ async def fetch_musicbrainz_spotify_relation_id(
             if spotify_id:
                 return spotify_id
         return None
-    except Exception:
+    except (CircuitOpen, MusicBrainzUnavailable):
+        raise
+    except DeadlineExceeded:
+        return None
+    except Exception as exc:
         logger.debug(
             "MusicBrainz relation lookup failed for '%s - %s'",
             artist,
             track_name,
             exc_info=True,
         )
-        return None
+        raise MusicBrainzUnavailable(str(exc)) from exc
 
 
 async def fetch_musicbrainz_hints(
@@ -145,16 +236,25 @@ async def fetch_musicbrainz_hints(
     artist: str,
     track_name: str,
     known_isrc: str | None,
+    *,
+    deadline: float | None = None,
 ) -> tuple[str | None, str | None, str | None]:
-    """Return (isrc, artist, title) hints to retry Spotify resolution, or Nones if unavailable."""
-    headers = {"User-Agent": MB_USER_AGENT, "Accept": "application/json"}
+    """Return (isrc, artist, title) hints to retry Spotify resolution, or Nones if unavailable.
+
+    The local dump index answers first; each web request is clamped to *deadline*
+    (monotonic), past which Nones are returned. Raises :class:`CircuitOpen` while
+    musicbrainz.org is tripped and :class:`MusicBrainzUnavailable` when the lookup fails.
+    """
+    answered, hints = local_hints(artist, track_name, known_isrc)
+    if answered:
+        return hints
     try:
         if known_isrc and known_isrc.strip():
             isrc_clean = known_isrc.strip().upper()
             url = f"{MUSICBRAINZ_ISRC}/{isrc_clean}"
             params: dict[str, str] = {"fmt": "json", "inc": "artist-credits"}
-            resp = await client.get(url, params=params, headers=headers, timeout=6.0)
-            if resp.status_code != 200:
+            resp = await _mb_get(client, url, params, deadline)
+            if not _found(resp):
                 return None, None, None
             data = resp.json()
             recordings = data.get("recordings") or []
@@ -168,12 +268,16 @@ async def fetch_musicbrainz_hints(
         query = f'artist:"{a}" AND recording:"{t}"'
         # Search requests may not support all inc= values; title/artist are enough to retry Spotify.
         params = {"query": query, "fmt": "json", "limit": 5}
-        resp = await client.get(MUSICBRAINZ_RECORDING_SEARCH, params=params, headers=headers, timeout=6.0)
-        if resp.status_code != 200:
+        resp = await _mb_get(client, MUSICBRAINZ_RECORDING_SEARCH, params, deadline)
+        if not _found(resp):
             return None, None, None
         data = resp.json()
         recordings = data.get("recordings") or []
         return _parse_hints_from_recordings(recordings)
-    except Exception:
-        logger.debug("MusicBrainz hint lookup failed for '%s - %s'", artist, track_name, exc_info=True)
+    except (CircuitOpen, MusicBrainzUnavailable):
+        raise
+    except DeadlineExceeded:
         return None, None, None
+    except Exception as exc:
+        logger.debug("MusicBrainz hint lookup failed for '%s - %s'", artist, track_name, exc_info=True)
+        raise MusicBrainzUnavailable(str(exc)) from exc
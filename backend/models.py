@@ -71,7 +71,7 @@ class SimilarityFilters(BaseModel):
     require_instrumental: bool | None = None
 
 
-class UnifiedSimilarRequest(BaseModel):
+class SeedSpec(BaseModel):
     url: str = Field(
         default="",
         description="Spotify track URL or URI (optional if seed_artist and seed_track are set)",
@@ -86,6 +86,30 @@ class UnifiedSimilarRequest(BaseModel):
         max_length=320,
         description="Track title for metadata-only seed (with seed_artist) when url is empty",
     )
+
+    @model_validator(mode="after")
+    def url_or_metadata_seed(self) -> "SeedSpec":
+        u = (self.url or "").strip()
+        a = (self.seed_artist or "").strip() if self.seed_artist else ""
+        t = (self.seed_track or "").strip() if self.seed_track else ""
+        if u:
+            self.url = u
+            self.seed_artist = None
+            self.seed_track = None
+            return self
+        if a and t:
+            self.url = ""
+            self.seed_artist = a
+            self.seed_track = t
+            return self
+        raise ValueError("Provide a Spotify url or both seed_artist and seed_track")
+
+    def resolved_spotify_url(self) -> str:
+        """Non-empty Spotify URL for audio sub-requests, or empty when using metadata-only seed."""
+        return (self.url or "").strip()
+
+
+class UnifiedSimilarRequest(SeedSpec):
     limit: int = Field(default=20, ge=1, le=250, description="Number of similar tracks to return")
     weights: AudioWeights = Field(default_factory=AudioWeights)
     exclude: list[str] = Field(
@@ -106,26 +130,32 @@ class UnifiedSimilarRequest(BaseModel):
     )
     filters: SimilarityFilters = Field(default_factory=SimilarityFilters)
 
-    @model_validator(mode="after")
-    def url_or_metadata_seed(self) -> "UnifiedSimilarRequest":
-        u = (self.url or "").strip()
-        a = (self.seed_artist or "").strip() if self.seed_artist else ""
-        t = (self.seed_track or "").strip() if self.seed_track else ""
-        if u:
-            self.url = u
-            self.seed_artist = None
-            self.seed_track = None
-            return self
-        if a and t:
-            self.url = ""
-            self.seed_artist = a
-            self.seed_track = t
-            return self
-        raise ValueError("Provide a Spotify url or both seed_artist and seed_track")
 
-    def resolved_spotify_url(self) -> str:
-        """Non-empty Spotify URL for audio sub-requests, or empty when using metadata-only seed."""
-        return (self.url or "").strip()
+class BatchSimilarRequest(BaseModel):
+    seeds: list[SeedSpec] = Field(min_length=1, max_length=25, description="Seeds sharing one enrichment pass")
+    limit: int = Field(default=20, ge=1, le=250, description="Number of similar tracks to return per seed")
+    weights: AudioWeights = Field(default_factory=AudioWeights)
+    exclude: list[str] = Field(
+        default_factory=list,
+        description="Lowercased 'artist::trackname' keys to exclude from every seed's results",
+    )
+    strict_mapped_only: bool = Field(
+        default=False,
+        description="If true, only Spotify-mapped tracks are returned (queue/playlist-safe).",
+    )
+    use_metadata_fallback: bool = Field(
+        default=True,
+        description="If true, retry Spotify resolution using free MusicBrainz hints when direct mapping fails.",
+    )
+    instrumental_similarity_only: bool = Field(
+        default=False,
+        description="If true, rank audio similarity with valence/danceability zeroed and blend toward audio scores.",
+    )
+    filters: SimilarityFilters = Field(default_factory=SimilarityFilters)
+    merge: bool = Field(
+        default=False,
+        description="If true, also return one ranking merged across all seeds (tracks similar to several seeds first).",
+    )
 
 
 class TrackInfo(BaseModel):
@@ -187,6 +217,66 @@ class SimilarTracksResponse(BaseModel):
         default=False,
         description="True when audio features were estimated from tags instead of Spotify's API",
     )
+    pool_id: str | None = Field(
+        default=None,
+        description="Short-lived ID of the enriched candidate pool; pass to /api/similar/rerank.",
+    )
+    next_cursor: str | None = Field(
+        default=None,
+        description="Pass to /api/similar/more for the next page; null once Last.fm candidates are exhausted.",
+    )
+
+
+class BatchSeedResult(BaseModel):
+    seed: SeedSpec
+    result: SimilarTracksResponse | None = None
+    error: str | None = Field(default=None, description="Why this seed produced no result; other seeds are unaffected.")
+    status: int | None = Field(
+        default=None,
+        description="With error: the HTTP status /api/similar/unified would have answered (4xx bad seed, 5xx upstream).",
+    )
+
+
+class BatchSimilarResponse(BaseModel):
+    results: list[BatchSeedResult]
+    merged_tracks: list[TrackInfo] = Field(
+        default_factory=list,
+        description="With merge=true: candidates ranked by mean match score across seeds.",
+    )
+    candidate_rows: int = Field(default=0, description="Last.fm candidate rows across all seeds' first pages.")
+    unique_candidates: int = Field(default=0, description="Distinct candidates actually enriched for those rows.")
+
+
+class RerankRequest(BaseModel):
+    pool_id: str = Field(min_length=1, max_length=64, description="pool_id from a unified similarity response")
+    limit: int | None = Field(
+        default=None,
+        ge=1,
+        le=250,
+        description="Number of tracks to return; defaults to the limit of the original search",
+    )
+    weights: AudioWeights = Field(default_factory=AudioWeights)
+    instrumental_similarity_only: bool = Field(
+        default=False,
+        description="If true, rank audio similarity with valence/danceability zeroed and blend toward audio scores.",
+    )
+    filters: SimilarityFilters = Field(default_factory=SimilarityFilters)
+
+
+class SimilarPageRequest(BaseModel):
+    cursor: str = Field(min_length=1, max_length=80, description="next_cursor from a previous similarity response")
+    limit: int | None = Field(
+        default=None,
+        ge=1,
+        le=250,
+        description="Number of tracks to return for this page; defaults to the limit of the original search",
+    )
+    weights: AudioWeights = Field(default_factory=AudioWeights)
+    instrumental_similarity_only: bool = Field(
+        default=False,
+        description="If true, rank audio similarity with valence/danceability zeroed and blend toward audio scores.",
+    )
+    filters: SimilarityFilters = Field(default_factory=SimilarityFilters)
 
 
 class TextPlaylistCreateRequest(BaseModel):
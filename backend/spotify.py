@@ -1,9 +1,12 @@
 import logging
 import math
 import re
+import threading
 import time
 from functools import lru_cache
 from difflib import SequenceMatcher
+from collections.abc import Callable
+from contextlib import nullcontext
 from typing import Literal
 
 import requests
@@ -12,6 +15,9 @@ from requests.adapters import HTTPAdapter
 from spotipy.oauth2 import SpotifyClientCredentials
 from urllib3.util import Retry
 
+from backend.cache_snapshot import register_cache
+from backend.canonical import normalize_track_title
+from backend.circuit_breaker import CircuitBreaker, get_breaker
 from backend.config import SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET
 from backend.models import (
     AUDIO_DIMENSION_KEYS,
@@ -19,6 +25,7 @@ from backend.models import (
     AudioWeights,
     TrackInfo,
 )
+from backend.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
@@ -29,41 +36,102 @@ TRACK_URI_PATTERN = re.compile(r"spotify:track:([a-zA-Z0-9]+)")
 
 TARGET_THRESHOLD = 0.3
 SPOTIFY_RATE_LIMIT_COOLDOWN_SECONDS = 180
-_spotify_mapping_throttled_until = {"app": 0.0, "user": 0.0}
-_spotify_feature_throttled_until = {"app": 0.0, "user": 0.0}
+SPOTIFY_RATE_LIMIT_MAX_COOLDOWN_SECONDS = 3600
 MAPPING_RESULT_LIMIT = 5
 MAPPING_MIN_SCORE = 0.65
 MappingSource = Literal["app", "user"]
+# App-token lookups are shared across requests and exported in cache snapshots.
+# Misses expire sooner; a miss observed while throttled is not cached at all.
+APP_LOOKUP_TTL_SECONDS = 7 * 24 * 3600
+APP_LOOKUP_MISS_TTL_SECONDS = 3600
+# App-token searches in flight per process (one enrichment run's worth); more queue.
+SPOTIFY_APP_SEARCH_CONCURRENCY = 8
+_app_search_slots = threading.BoundedSemaphore(SPOTIFY_APP_SEARCH_CONCURRENCY)
 
+_isrc_search_cache: TTLCache[TrackInfo | None] = TTLCache(1024, APP_LOOKUP_TTL_SECONDS)
+_text_search_cache: TTLCache[TrackInfo | None] = TTLCache(1024, APP_LOOKUP_TTL_SECONDS)
+_track_by_id_cache: TTLCache[TrackInfo | None] = TTLCache(2048, APP_LOOKUP_TTL_SECONDS)
+# Audio features of a track ID never change; an ID Spotify has no features for is retried daily.
+# Recommendations are keyed on seed, limit and quantized targets (see _recommendation_key).
+AUDIO_FEATURES_TTL_SECONDS = 30 * 24 * 3600
+AUDIO_FEATURES_MISS_TTL_SECONDS = 24 * 3600
+RECOMMENDATIONS_TTL_SECONDS = 24 * 3600
+RECOMMENDATIONS_MISS_TTL_SECONDS = 3600
+# Target grid: BPM for tempo, 0-1 units for the rest. Finer than the weights UI can express.
+RECOMMENDATION_TARGET_STEPS = {"target_tempo": 2.0}
+RECOMMENDATION_TARGET_STEP = 0.02
 
-def _set_mapping_throttled(
-    retry_after_seconds: int | None = None,
-    source: MappingSource = "app",
-) -> None:
-    cooldown = retry_after_seconds or SPOTIFY_RATE_LIMIT_COOLDOWN_SECONDS
-    _spotify_mapping_throttled_until[source] = max(
-        _spotify_mapping_throttled_until[source],
-        time.monotonic() + max(1, cooldown),
-    )
+_audio_features_cache: TTLCache[AudioFeatures | None] = TTLCache(20000, AUDIO_FEATURES_TTL_SECONDS)
+_recommendations_cache: TTLCache[list[TrackInfo]] = TTLCache(512, RECOMMENDATIONS_TTL_SECONDS)
+_UNCACHED = object()
 
 
-def _set_feature_throttled(
-    retry_after_seconds: int | None = None,
-    source: MappingSource = "app",
-) -> None:
-    cooldown = retry_after_seconds or SPOTIFY_RATE_LIMIT_COOLDOWN_SECONDS
-    _spotify_feature_throttled_until[source] = max(
-        _spotify_feature_throttled_until[source],
-        time.monotonic() + max(1, cooldown),
+def _encode_track(track: TrackInfo | None) -> dict | None:
+    return track.model_dump(mode="json") if track is not None else None
+
+
+def _decode_track(raw: dict | None) -> TrackInfo | None:
+    return TrackInfo.model_validate(raw) if raw is not None else None
+
+
+register_cache("spotify.isrc_search", _isrc_search_cache, encode=_encode_track, decode=_decode_track)
+register_cache("spotify.text_search", _text_search_cache, encode=_encode_track, decode=_decode_track)
+register_cache("spotify.track_by_id", _track_by_id_cache, encode=_encode_track, decode=_decode_track)
+
+
+def _encode_features(features: AudioFeatures | None) -> dict | None:
+    return features.model_dump() if features is not None else None
+
+
+def _decode_features(raw: dict | None) -> AudioFeatures | None:
+    return AudioFeatures.model_validate(raw) if raw is not None else None
+
+
+def _encode_tracks(tracks: list[TrackInfo]) -> list[dict | None]:
+    return [_encode_track(track) for track in tracks]
+
+
+def _decode_tracks(raw: list[dict]) -> list[TrackInfo]:
+    return [TrackInfo.model_validate(track) for track in raw]
+
+
+register_cache(
+    "spotify.audio_features", _audio_features_cache, encode=_encode_features, decode=_decode_features,
+)
+register_cache(
+    "spotify.recommendations", _recommendations_cache, encode=_encode_tracks, decode=_decode_tracks,
+)
+
+
+def feature_cache_stats() -> dict[str, dict[str, int]]:
+    return {
+        name: {"entries": len(cache), "hits": cache.hits, "misses": cache.misses}
+        for name, cache in (
+            ("audio_features", _audio_features_cache),
+            ("recommendations", _recommendations_cache),
+        )
+    }
+
+
+def _breaker(target: str, source: MappingSource) -> CircuitBreaker:
+    """One breaker per call family and token source, tripped by 429s."""
+    return get_breaker(
+        f"spotify.{target}.{source}",
+        base_cooldown=SPOTIFY_RATE_LIMIT_COOLDOWN_SECONDS,
+        max_cooldown=SPOTIFY_RATE_LIMIT_MAX_COOLDOWN_SECONDS,
     )
 
 
 def spotify_mapping_allowed(source: MappingSource = "app") -> bool:
-    return time.monotonic() >= _spotify_mapping_throttled_until[source]
+    return not _breaker("mapping", source).blocked()
+
+
+def spotify_mapping_cooldown_remaining(source: MappingSource = "app") -> float:
+    return _breaker("mapping", source).remaining()
 
 
 def spotify_feature_calls_allowed(source: MappingSource = "app") -> bool:
-    return time.monotonic() >= _spotify_feature_throttled_until[source]
+    return not _breaker("feature", source).blocked()
 
 
 def _handle_spotify_rate_limit(
@@ -78,10 +146,7 @@ def _handle_spotify_rate_limit(
         retry_after = int(exc.headers.get("Retry-After", "0")) if exc.headers else None
     except Exception:
         retry_after = None
-    if target == "mapping":
-        _set_mapping_throttled(retry_after, source=source)
-    else:
-        _set_feature_throttled(retry_after, source=source)
+    _breaker(target, source).trip(retry_after or None)
     logger.warning(
         "Spotify API throttled for %s calls (source=%s); entering cooldown.",
         target,
@@ -125,6 +190,16 @@ def get_spotify_client() -> spotipy.Spotify:
     )
 
 
+def warm_app_token() -> bool:
+    """Fetch the client-credentials token now so the first search does not pay for it."""
+    try:
+        get_spotify_client().auth_manager.get_access_token(as_dict=False)
+        return True
+    except Exception as exc:
+        logger.warning("Spotify app token warm-up failed: %s", exc)
+        return False
+
+
 def extract_track_id(url_or_uri: str) -> str:
     """Extract the Spotify track ID from a URL or URI."""
     url_or_uri = url_or_uri.strip()
@@ -227,29 +302,42 @@ def search_track(artist: str, track_name: str, isrc: str | None = None) -> Track
     return resolve_spotify_track(artist, track_name, isrc)
 
 
-@lru_cache(maxsize=1024)
-def _search_track_by_isrc_cached(isrc: str) -> TrackInfo | None:
-    if not isrc or not spotify_mapping_allowed("app"):
+def _app_lookup(
+    cache: TTLCache[TrackInfo | None], key: str, fetch: Callable[[], TrackInfo | None],
+) -> TrackInfo | None:
+    if key in cache:
+        return cache.get(key)
+    if not spotify_mapping_allowed("app"):
         return None
+    result = fetch()
+    if result is not None:
+        cache.set(key, result)
+    elif spotify_mapping_allowed("app"):
+        cache.set(key, None, APP_LOOKUP_MISS_TTL_SECONDS)
+    return result
 
-    sp = get_spotify_client()
-    items = _run_search_with_retry(sp, query=f"isrc:{isrc}", limit=1, source="app")
-    if not items:
+
+def _search_track_by_isrc_cached(isrc: str) -> TrackInfo | None:
+    if not isrc:
         return None
-    return _track_to_info(items[0])
 
+    def fetch() -> TrackInfo | None:
+        items = _run_search_with_retry(get_spotify_client(), query=f"isrc:{isrc}", limit=1, source="app")
+        return _track_to_info(items[0]) if items else None
 
-@lru_cache(maxsize=1024)
-def _search_track_cached(artist: str, track_name: str) -> TrackInfo | None:
-    if not spotify_mapping_allowed("app"):
-        return None
+    return _app_lookup(_isrc_search_cache, isrc, fetch)
 
-    sp = get_spotify_client()
-    return _search_track_uncached(
-        sp,
-        source="app",
-        artist=artist,
-        track_name=track_name,
+
+def _search_track_cached(artist: str, track_name: str) -> TrackInfo | None:
+    return _app_lookup(
+        _text_search_cache,
+        f"{artist}::{track_name}",
+        lambda: _search_track_uncached(
+            get_spotify_client(),
+            source="app",
+            artist=artist,
+            track_name=track_name,
+        ),
     )
 
 
@@ -325,7 +413,7 @@ def _search_track_uncached(
     if not spotify_mapping_allowed(source):
         return None
 
-    normalized_title = _normalize_track_title(track_name)
+    normalized_title = normalize_track_title(track_name)
 
     passes: list[tuple[str, int]] = [
         (f"artist:{artist} track:{track_name}", 1),
@@ -371,10 +459,12 @@ def _run_search_with_retry(
     attempts = 2
     for attempt in range(attempts):
         try:
-            if market:
-                results = sp.search(q=query, type="track", limit=limit, market=market)
-            else:
-                results = sp.search(q=query, type="track", limit=limit)
+            with _app_search_slots if source == "app" else nullcontext():
+                if market:
+                    results = sp.search(q=query, type="track", limit=limit, market=market)
+                else:
+                    results = sp.search(q=query, type="track", limit=limit)
+            _breaker("mapping", source).record_success()
             return results.get("tracks", {}).get("items", [])
         except spotipy.SpotifyException as exc:
             if _handle_spotify_rate_limit(exc, target="mapping", source=source):
@@ -386,12 +476,12 @@ def _run_search_with_retry(
     return []
 
 
-@lru_cache(maxsize=2048)
 def _fetch_track_by_id_cached(track_id: str) -> TrackInfo | None:
-    if not track_id or not spotify_mapping_allowed("app"):
+    if not track_id:
         return None
-    sp = get_spotify_client()
-    return _fetch_track_by_id(sp, track_id, source="app")
+    return _app_lookup(
+        _track_by_id_cache, track_id, lambda: _fetch_track_by_id(get_spotify_client(), track_id, source="app"),
+    )
 
 
 def _fetch_track_by_id(
@@ -403,25 +493,17 @@ def _fetch_track_by_id(
     if not track_id or not spotify_mapping_allowed(source):
         return None
     try:
-        return _track_to_info(sp.track(track_id))
+        track = sp.track(track_id)
+        _breaker("mapping", source).record_success()
+        return _track_to_info(track)
     except spotipy.SpotifyException as exc:
         if _handle_spotify_rate_limit(exc, target="mapping", source=source):
             return None
         return None
 
 
-def _normalize_track_title(value: str) -> str:
-    normalized = value.lower()
-    normalized = re.sub(r"\([^)]*\)", " ", normalized)
-    normalized = re.sub(r"\[[^\]]*\]", " ", normalized)
-    normalized = re.sub(r"\b(feat|ft|remix|edit|version)\b.*$", " ", normalized)
-    normalized = re.sub(r"[^a-z0-9\s]", " ", normalized)
-    normalized = re.sub(r"\s+", " ", normalized).strip()
-    return normalized or value.lower().strip()
-
-
 def _text_similarity(a: str, b: str) -> float:
-    return SequenceMatcher(None, _normalize_track_title(a), _normalize_track_title(b)).ratio()
+    return SequenceMatcher(None, normalize_track_title(a), normalize_track_title(b)).ratio()
 
 
 def _pick_best_mapping_candidate(
@@ -470,17 +552,30 @@ def get_audio_features(
 ) -> dict[str, AudioFeatures | None]:
     """Batch-fetch audio features. Returns {track_id: AudioFeatures | None}.
 
-    Raises ValueError with a clear message if the endpoint returns 403,
-    which typically means the Spotify app lacks extended quota access.
+    IDs are answered from the shared feature cache first; only misses go into
+    the 100-ID calls. Raises ValueError with a clear message if the endpoint
+    returns 403, which typically means the Spotify app lacks extended quota access.
     """
-    sp = sp or get_spotify_client()
-    if not spotify_feature_calls_allowed(source):
-        return {track_id: None for track_id in track_ids}
     result: dict[str, AudioFeatures | None] = {}
-    for i in range(0, len(track_ids), 100):
-        batch = track_ids[i : i + 100]
+    missing: list[str] = []
+    for track_id in dict.fromkeys(track_ids):
+        # Known misses are cached as None, so absence is told apart with a sentinel.
+        cached = _audio_features_cache.get(track_id, _UNCACHED)
+        if cached is _UNCACHED:
+            missing.append(track_id)
+        else:
+            result[track_id] = cached
+    if not missing:
+        return result
+    if not spotify_feature_calls_allowed(source):
+        result.update({track_id: None for track_id in missing})
+        return result
+    sp = sp or get_spotify_client()
+    for i in range(0, len(missing), 100):
+        batch = missing[i : i + 100]
         try:
             features_list = sp.audio_features(batch)
+            _breaker("feature", source).record_success()
         except spotipy.SpotifyException as exc:
             if _handle_spotify_rate_limit(exc, target="feature", source=source):
                 for tid in batch:
@@ -497,10 +592,11 @@ def get_audio_features(
             for tid in batch:
                 result[tid] = None
             continue
-        for raw in features_list:
-            if raw is None:
-                continue
-            result[raw["id"]] = _parse_audio_features(raw)
+        parsed = {raw["id"]: _parse_audio_features(raw) for raw in features_list if raw is not None}
+        for tid in batch:
+            features = parsed.get(tid)
+            _audio_features_cache.set(tid, features, None if features is not None else AUDIO_FEATURES_MISS_TTL_SECONDS)
+            result[tid] = features
     return result
 
 
@@ -540,16 +636,26 @@ def get_recommendations(
     *,
     source: MappingSource = "app",
 ) -> list[TrackInfo]:
-    """Fetch Spotify recommendations seeded by a track with audio feature targets."""
-    sp = sp or get_spotify_client()
+    """Fetch Spotify recommendations seeded by a track with audio feature targets.
+
+    Targets are snapped to a grid so near-identical requests share one cached
+    result. Callers get their own copies of the cached tracks.
+    """
+    targets = {key: _quantize_target(key, value) for key, value in targets.items()}
+    cache_key = _recommendation_key(seed_track_id, targets, limit)
+    cached = _recommendations_cache.get(cache_key)
+    if cached is not None:
+        return [track.model_copy(deep=True) for track in cached]
     if not spotify_feature_calls_allowed(source):
         return []
+    sp = sp or get_spotify_client()
     try:
         resp = sp.recommendations(
             seed_tracks=[seed_track_id],
             limit=limit,
             **targets,
         )
+        _breaker("feature", source).record_success()
     except spotipy.SpotifyException as exc:
         if _handle_spotify_rate_limit(exc, target="feature", source=source):
             return []
@@ -559,7 +665,23 @@ def get_recommendations(
                 "Check your app settings at https://developer.spotify.com/dashboard"
             ) from exc
         raise
-    return [_track_to_info(t) for t in resp.get("tracks", [])]
+    tracks = [_track_to_info(t) for t in resp.get("tracks", [])]
+    _recommendations_cache.set(
+        cache_key,
+        [track.model_copy(deep=True) for track in tracks],
+        None if tracks else RECOMMENDATIONS_MISS_TTL_SECONDS,
+    )
+    return tracks
+
+
+def _quantize_target(key: str, value: float) -> float:
+    step = RECOMMENDATION_TARGET_STEPS.get(key, RECOMMENDATION_TARGET_STEP)
+    return round(round(value / step) * step, 4)
+
+
+def _recommendation_key(seed_track_id: str, targets: dict[str, float], limit: int) -> str:
+    parts = ",".join(f"{key}={value:g}" for key, value in sorted(targets.items()))
+    return f"{seed_track_id}|{limit}|{parts}"
 
 
 def compute_similarity(
@@ -7,7 +7,6 @@ import secrets
 import time
 from urllib.parse import urlencode
 
-import httpx
 import requests
 import spotipy
 from requests.adapters import HTTPAdapter
@@ -19,6 +18,7 @@ from backend.config import (
     SPOTIFY_CLIENT_SECRET,
     SPOTIFY_REDIRECT_URI,
 )
+from backend.http_clients import provider_sync_client
 
 logger = logging.getLogger(__name__)
 
@@ -91,10 +91,11 @@ def exchange_code(code: str, code_verifier: str | None = None) -> dict:
             "client_id": SPOTIFY_CLIENT_ID,
             "code_verifier": code_verifier,
         }
-        with httpx.Client(timeout=10) as client:
-            response = client.post("https://accounts.spotify.com/api/token", data=payload)
-            response.raise_for_status()
-            token_info = response.json()
+        response = provider_sync_client("spotify_accounts").post(
+            "https://accounts.spotify.com/api/token", data=payload,
+        )
+        response.raise_for_status()
+        token_info = response.json()
         return normalize_token_expiry(token_info)
     oauth = build_oauth_manager()
     raw = oauth.get_access_token(code, as_dict=True, check_cache=False)
@@ -148,14 +149,13 @@ def refresh_pkce_access_token(refresh_token: str) -> dict:
         "refresh_token": refresh_token,
         "client_id": SPOTIFY_CLIENT_ID,
     }
-    with httpx.Client(timeout=10) as client:
-        response = client.post(
-            "https://accounts.spotify.com/api/token",
-            data=payload,
-            headers={"Content-Type": "application/x-www-form-urlencoded"},
-        )
-        response.raise_for_status()
-        return normalize_token_expiry(response.json())
+    response = provider_sync_client("spotify_accounts").post(
+        "https://accounts.spotify.com/api/token",
+        data=payload,
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+    response.raise_for_status()
+    return normalize_token_expiry(response.json())
 
 
 def refresh_if_needed(token_info: dict) -> dict:
@@ -8,13 +8,27 @@ Categories (for UI filter sections):
 Audio-feature estimation maps Last.fm tags to approximate 0–1 values for
 energy, valence, danceability, acousticness, and instrumentalness. Used as a
 fallback when Spotify's audio-features endpoint is unavailable.
+
+The tables are compiled into a :class:`TagVocabulary`: each distinct tag is
+normalized once, interned to an integer ID and stored with its category and
+its (dimension, value) signals, compound-word expansion included. The batch
+functions score a whole candidate pool against it with no per-tag regex or
+dict walking. They return the same values as the per-track functions.
+
+When a learned :mod:`backend.tag_model` is loaded (``load_feature_model``),
+feature estimation uses its weights in place of ``TAG_FEATURE_SIGNALS``.
+Categories and alignment scores stay table-driven.
 """
 
 from __future__ import annotations
 
 import re
+from collections.abc import Sequence
+from functools import lru_cache
 from typing import TYPE_CHECKING, Literal
 
+from backend.tag_model import TagFeatureModel, TagWeights, load_model
+
 if TYPE_CHECKING:
     from backend.models import AudioFeatures
 
@@ -147,43 +161,112 @@ TAG_FEATURE_SIGNALS: dict[str, dict[str, float]] = {
 }
 
 _ESTIMABLE_DIMS = ("energy", "valence", "danceability", "acousticness", "instrumentalness")
+_DIM_INDEX = {dim: i for i, dim in enumerate(_ESTIMABLE_DIMS)}
+# Raw tag spellings kept interned before the vocabulary starts over (between batches).
+MAX_VOCABULARY = 50000
 
 
 def get_category(tag: str) -> TagCategory:
     """Return the category for a tag (lowercase). Unknown tags map to genre."""
-    return TAG_TO_CATEGORY.get(normalize_tag(tag), DEFAULT_CATEGORY)
+    vocab = _vocab()
+    return vocab.categories[vocab.intern(tag)]
 
 
 def build_tag_categories(tags: list[str]) -> dict[str, str]:
     """Build tag -> category for a list of tags. Returns dict suitable for JSON."""
-    return {tag: get_category(tag) for tag in tags}
+    return build_pool_tag_categories([tags])
 
 
+@lru_cache(maxsize=65536)
 def normalize_tag(tag: str) -> str:
     """Normalize tags for stable matching across UI and backend rules."""
     normalized = _WHITESPACE_RE.sub(" ", tag.strip().lower())
     return TAG_ALIASES.get(normalized, normalized)
 
 
-def _collect_signals(tag: str, sums: dict[str, float], counts: dict[str, int]) -> None:
-    """Accumulate feature signals for a tag. For compound tags like 'ambient house',
-    also checks individual words so partial matches contribute."""
-    key = normalize_tag(tag)
+def _compile_signals(key: str) -> tuple[tuple[int, float], ...]:
+    """(dimension index, value) pairs a normalized tag contributes. For compound tags
+    like 'ambient house', also checks individual words so partial matches contribute."""
     signals = TAG_FEATURE_SIGNALS.get(key)
-    if signals:
-        for dim, val in signals.items():
-            if dim in sums:
+    sources = [signals] if signals else [TAG_FEATURE_SIGNALS.get(word) for word in key.split()]
+    return tuple(
+        (_DIM_INDEX[dim], val)
+        for source in sources if source
+        for dim, val in source.items() if dim in _DIM_INDEX
+    )
+
+
+class TagVocabulary:
+    """Interned tags: raw spelling -> ID, and per ID its normalized name, category and signals
+    (plus its learned weight row when a *model* is in use)."""
+
+    def __init__(self, model: TagFeatureModel | None = None) -> None:
+        self.model = model
+        self._ids: dict[str, int] = {}
+        self._by_name: dict[str, int] = {}
+        self.names: list[str] = []
+        self.categories: list[TagCategory] = []
+        self.signals: list[tuple[tuple[int, float], ...]] = []
+        self.model_rows: list[TagWeights | None] = []
+
+    def intern(self, tag: str) -> int:
+        tag_id = self._ids.get(tag)
+        if tag_id is None:
+            name = normalize_tag(tag)
+            tag_id = self._by_name.get(name)
+            if tag_id is None:
+                tag_id = self._by_name[name] = len(self.names)
+                self.names.append(name)
+                self.categories.append(TAG_TO_CATEGORY.get(name, DEFAULT_CATEGORY))
+                self.signals.append(_compile_signals(name))
+                self.model_rows.append(self.model.tag_weights.get(name) if self.model else None)
+            self._ids[tag] = tag_id
+        return tag_id
+
+    def encode(self, tags: Sequence[str]) -> list[int]:
+        return [self.intern(tag) for tag in tags]
+
+    def encode_set(self, tags: Sequence[str]) -> frozenset[int]:
+        """IDs of the non-empty tags, as used for overlap scoring."""
+        return frozenset(tag_id for tag_id in self.encode(tags) if self.names[tag_id])
+
+    def features(self, tag_ids: Sequence[int], bpm: float | None) -> AudioFeatures:
+        from backend.models import AudioFeatures as AF
+
+        if self.model is not None:
+            distinct = [tag_id for tag_id in dict.fromkeys(tag_ids) if self.names[tag_id]]
+            rows = [self.model_rows[tag_id] for tag_id in distinct]
+            return AF.model_construct(**self.model.predict(rows, len(distinct), bpm))
+
+        sums = [0.0] * len(_ESTIMABLE_DIMS)
+        counts = [0] * len(_ESTIMABLE_DIMS)
+        for tag_id in tag_ids:
+            for dim, val in self.signals[tag_id]:
                 sums[dim] += val
                 counts[dim] += 1
-        return
+        values = {dim: sums[i] / counts[i] if counts[i] else 0.5 for i, dim in enumerate(_ESTIMABLE_DIMS)}
+        return AF.model_construct(tempo=float(bpm) if bpm is not None else None, **values)
 
-    for word in key.split():
-        signals = TAG_FEATURE_SIGNALS.get(word)
-        if signals:
-            for dim, val in signals.items():
-                if dim in sums:
-                    sums[dim] += val
-                    counts[dim] += 1
+
+_vocabulary = TagVocabulary()
+
+
+def _vocab() -> TagVocabulary:
+    """The shared vocabulary; started over once it holds MAX_VOCABULARY spellings."""
+    global _vocabulary
+    if len(_vocabulary._ids) >= MAX_VOCABULARY:
+        _vocabulary = TagVocabulary(_vocabulary.model)
+    return _vocabulary
+
+
+def load_feature_model(path: str) -> bool:
+    """Estimate features with the learned model at *path* from now on; False (table kept) if unusable."""
+    global _vocabulary
+    model = load_model(path)
+    if model is None:
+        return False
+    _vocabulary = TagVocabulary(model)
+    return True
 
 
 def estimate_features_from_tags(tags: list[str], bpm: float | None = None) -> AudioFeatures:
@@ -191,28 +274,47 @@ def estimate_features_from_tags(tags: list[str], bpm: float | None = None) -> Au
 
     For each dimension, averages the signals from all matching tags.
     Compound tags (e.g. 'ambient house') are split so individual words
-    can match. Dimensions with no signal default to 0.5 (neutral).
+    can match. Dimensions with no signal default to 0.5 (neutral). With a
+    learned model loaded, its prediction is returned instead (tempo is
+    predicted too when *bpm* is unknown).
     """
-    from backend.models import AudioFeatures as AF
+    vocab = _vocab()
+    return vocab.features(vocab.encode(tags), bpm)
 
-    sums: dict[str, float] = {d: 0.0 for d in _ESTIMABLE_DIMS}
-    counts: dict[str, int] = {d: 0 for d in _ESTIMABLE_DIMS}
 
-    for tag in tags:
-        _collect_signals(tag, sums, counts)
+def estimate_features_batch(
+    tag_lists: Sequence[Sequence[str]], bpms: Sequence[float | None],
+) -> list[AudioFeatures]:
+    """:func:`estimate_features_from_tags` for every (tags, bpm) pair of a pool."""
+    vocab = _vocab()
+    return [vocab.features(vocab.encode(tags), bpm) for tags, bpm in zip(tag_lists, bpms)]
 
-    values: dict[str, float | None] = {"tempo": bpm}
-    for dim in _ESTIMABLE_DIMS:
-        values[dim] = sums[dim] / counts[dim] if counts[dim] else 0.5
 
-    return AF(**values)
+def _alignment(seed_ids: frozenset[int], cand_ids: frozenset[int]) -> float:
+    if not seed_ids or not cand_ids:
+        return 0.0
+    return len(seed_ids & cand_ids) / max(1, min(len(seed_ids), 8))
 
 
 def tag_alignment_score(seed_tags: list[str], candidate_tags: list[str]) -> float:
     """Return normalized alignment score between seed and candidate tags (0..1)."""
-    seed_norm = {normalize_tag(tag) for tag in seed_tags if tag.strip()}
-    cand_norm = {normalize_tag(tag) for tag in candidate_tags if tag.strip()}
-    if not seed_norm or not cand_norm:
-        return 0.0
-    overlap = len(seed_norm & cand_norm)
-    return overlap / max(1, min(len(seed_norm), 8))
+    vocab = _vocab()
+    return _alignment(vocab.encode_set(seed_tags), vocab.encode_set(candidate_tags))
+
+
+def tag_alignment_scores(seed_tags: Sequence[str], tag_lists: Sequence[Sequence[str]]) -> list[float]:
+    """:func:`tag_alignment_score` of the seed against every tag list of a pool."""
+    vocab = _vocab()
+    seed_ids = vocab.encode_set(seed_tags)
+    return [_alignment(seed_ids, vocab.encode_set(tags)) for tags in tag_lists]
+
+
+def build_pool_tag_categories(tag_lists: Sequence[Sequence[str]]) -> dict[str, str]:
+    """:func:`build_tag_categories` over the union of a pool's tag lists, in first-seen order."""
+    vocab = _vocab()
+    categories: dict[str, str] = {}
+    for tags in tag_lists:
+        for tag in tags:
+            if tag not in categories:
+                categories[tag] = vocab.categories[vocab.intern(tag)]
+    return categories
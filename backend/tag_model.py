@@ -0,0 +1,231 @@
+"""Learned tag + BPM -> audio-feature model.
+
+A ridge regression fitted offline (``scripts/train_tag_model.py``, NumPy only)
+on :mod:`backend.feature_samples`: tracks whose tags we know and whose audio
+features were actually measured. Each track is a row of its distinct
+normalized tags, each weighted ``1/len(tags)``, so tags are averaged as in the
+hand-written table. The row also carries the normalized BPM and a flag for a
+missing BPM.
+
+The fitted weights ship as a small JSON artifact. Inference is a few sums in
+pure Python, so the service does not need NumPy. When
+``TAG_FEATURE_MODEL_PATH`` points at an artifact, :mod:`backend.tag_categories`
+estimates features with it. Otherwise it keeps using ``TAG_FEATURE_SIGNALS``.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import random
+import time
+from collections import Counter
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from backend.models import AUDIO_DIMENSION_KEYS
+
+if TYPE_CHECKING:
+    from backend.feature_samples import FeatureSample
+
+logger = logging.getLogger(__name__)
+
+MODEL_VERSION = 1
+MODEL_DIMS = tuple(AUDIO_DIMENSION_KEYS)
+# Same BPM scale as spotify.compute_similarity: 50-200 BPM -> 0-1.
+TEMPO_MIN_BPM = 50.0
+TEMPO_SPAN_BPM = 150.0
+
+TagWeights = tuple[float, ...]
+
+
+def tempo_unit(bpm: float) -> float:
+    return max(0.0, min(1.0, (bpm - TEMPO_MIN_BPM) / TEMPO_SPAN_BPM))
+
+
+@dataclass(frozen=True)
+class TagFeatureModel:
+    """Per-dimension linear weights in :data:`MODEL_DIMS` order; tempo is predicted on the 0..1 scale."""
+
+    tag_weights: dict[str, TagWeights]
+    bpm_weights: TagWeights
+    no_bpm_weights: TagWeights
+    intercept: TagWeights
+    meta: dict = field(default_factory=dict)
+
+    def predict(self, rows: Sequence[TagWeights | None], n_tags: int, bpm: float | None) -> dict[str, float]:
+        """Feature values for a track whose *n_tags* distinct tags have weight *rows* (None = unknown tag).
+
+        A known *bpm* is returned as the tempo unchanged.
+        """
+        totals = list(self.intercept)
+        if bpm is not None:
+            x = tempo_unit(bpm)
+            for i, w in enumerate(self.bpm_weights):
+                totals[i] += w * x
+        else:
+            for i, w in enumerate(self.no_bpm_weights):
+                totals[i] += w
+        if n_tags:
+            scale = 1.0 / n_tags
+            for row in rows:
+                if row is not None:
+                    for i, w in enumerate(row):
+                        totals[i] += w * scale
+        values = {dim: max(0.0, min(1.0, total)) for dim, total in zip(MODEL_DIMS, totals)}
+        values["tempo"] = float(bpm) if bpm is not None else values["tempo"] * TEMPO_SPAN_BPM + TEMPO_MIN_BPM
+        return values
+
+    def to_json(self) -> dict:
+        def rounded(values: Sequence[float]) -> list[float]:
+            return [round(float(v), 6) for v in values]
+
+        return {
+            "version": MODEL_VERSION,
+            "dims": list(MODEL_DIMS),
+            "intercept": rounded(self.intercept),
+            "bpm": rounded(self.bpm_weights),
+            "no_bpm": rounded(self.no_bpm_weights),
+            "tags": {tag: rounded(row) for tag, row in self.tag_weights.items()},
+            "meta": self.meta,
+        }
+
+    @classmethod
+    def from_json(cls, payload: dict) -> TagFeatureModel:
+        if payload.get("version") != MODEL_VERSION or tuple(payload.get("dims") or ()) != MODEL_DIMS:
+            raise ValueError("unsupported tag feature model version or dimensions")
+
+        def row(values: Sequence[float]) -> TagWeights:
+            if len(values) != len(MODEL_DIMS):
+                raise ValueError("weight row has the wrong length")
+            return tuple(float(v) for v in values)
+
+        return cls(
+            tag_weights={tag: row(values) for tag, values in payload["tags"].items()},
+            bpm_weights=row(payload["bpm"]),
+            no_bpm_weights=row(payload["no_bpm"]),
+            intercept=row(payload["intercept"]),
+            meta=payload.get("meta") or {},
+        )
+
+
+def load_model(path: str) -> TagFeatureModel | None:
+    """Model stored at *path*; None when there is none or it cannot be used."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return TagFeatureModel.from_json(json.load(fh))
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        logger.warning("Tag feature model %s unusable, keeping the tag table: %s", path, exc)
+        return None
+
+
+def save_model(model: TagFeatureModel, path: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump(model.to_json(), fh, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def _distinct_tags(tags: Sequence[str]) -> list[str]:
+    from backend.tag_categories import normalize_tag
+
+    return [tag for tag in dict.fromkeys(normalize_tag(tag) for tag in tags) if tag]
+
+
+def _targets(sample: FeatureSample) -> list[float | None]:
+    values: list[float | None] = []
+    for dim in MODEL_DIMS:
+        value = sample.features.get(dim)
+        if value is not None and dim == "tempo":
+            value = tempo_unit(value)
+        values.append(value)
+    return values
+
+
+def fit(
+    samples: Sequence[FeatureSample],
+    *,
+    alpha: float = 1.0,
+    min_tag_count: int = 3,
+    max_tags: int = 2000,
+) -> TagFeatureModel:
+    """Ridge fit of every dimension on the samples that measured it. Requires NumPy."""
+    import numpy as np
+
+    tag_lists = [_distinct_tags(sample.tags) for sample in samples]
+    counts = Counter(tag for tags in tag_lists for tag in tags)
+    vocab = [tag for tag, count in counts.most_common(max_tags) if count >= min_tag_count]
+    column = {tag: i for i, tag in enumerate(vocab)}
+    n_cols = len(vocab) + 2
+
+    x = np.zeros((len(samples), n_cols))
+    for r, (sample, tags) in enumerate(zip(samples, tag_lists)):
+        for tag in tags:
+            if tag in column:
+                x[r, column[tag]] = 1.0 / len(tags)
+        if sample.bpm is not None:
+            x[r, -2] = tempo_unit(sample.bpm)
+        else:
+            x[r, -1] = 1.0
+    y = np.array([_targets(sample) for sample in samples], dtype=float)
+
+    weights = np.zeros((n_cols, len(MODEL_DIMS)))
+    intercept = np.full(len(MODEL_DIMS), 0.5)
+    for d in range(len(MODEL_DIMS)):
+        mask = ~np.isnan(y[:, d])
+        if not mask.any():
+            continue
+        xd, yd = x[mask], y[mask, d]
+        x_mean, y_mean = xd.mean(axis=0), yd.mean()
+        xc = xd - x_mean
+        # The intercept stays unpenalized: fit on centered data, then recover it.
+        weights[:, d] = np.linalg.solve(xc.T @ xc + alpha * np.eye(n_cols), xc.T @ (yd - y_mean))
+        intercept[d] = y_mean - x_mean @ weights[:, d]
+
+    return TagFeatureModel(
+        tag_weights={tag: tuple(weights[i].tolist()) for tag, i in column.items()},
+        bpm_weights=tuple(weights[-2].tolist()),
+        no_bpm_weights=tuple(weights[-1].tolist()),
+        intercept=tuple(intercept.tolist()),
+        meta={
+            "trained_at": time.time(),
+            "samples": len(samples),
+            "tags": len(vocab),
+            "alpha": alpha,
+        },
+    )
+
+
+def mean_abs_error(
+    samples: Sequence[FeatureSample],
+    estimate: Callable[[list[str], float | None], dict[str, float]],
+) -> dict[str, float]:
+    """Per-dimension MAE of *estimate* over *samples*; tempo only where the BPM was unknown."""
+    errors: dict[str, list[float]] = {dim: [] for dim in MODEL_DIMS}
+    for sample in samples:
+        predicted = estimate(sample.tags, sample.bpm)
+        for dim, actual in sample.features.items():
+            if dim not in errors or predicted.get(dim) is None:
+                continue
+            if dim == "tempo":
+                if sample.bpm is not None:
+                    continue
+                errors[dim].append(abs(tempo_unit(predicted[dim]) - tempo_unit(actual)))
+            else:
+                errors[dim].append(abs(predicted[dim] - actual))
+    return {dim: round(sum(values) / len(values), 4) for dim, values in errors.items() if values}
+
+
+def split_holdout(
+    samples: Sequence[FeatureSample], fraction: float, seed: int = 0,
+) -> tuple[list[FeatureSample], list[FeatureSample]]:
+    """(train, holdout), split at random; the same *seed* gives the same split."""
+    shuffled = list(samples)
+    random.Random(seed).shuffle(shuffled)
+    cut = int(len(shuffled) * fraction)
+    return shuffled[cut:], shuffled[:cut]
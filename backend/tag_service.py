@@ -0,0 +1,80 @@
+"""Last.fm tag lookups with artist-level dedup.
+
+Track tags fall back to ``artist.getTopTags`` when Last.fm has none for the
+track. Candidate pools repeat artists heavily (the artist-similarity fallback
+returns several top tracks per artist), so artist tags are cached across
+requests, and each request's :class:`TagService` shares one in-flight call per
+artist between all of its candidates. Failed or deadline-cut calls are never
+cached.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+
+from backend.cache_snapshot import register_cache
+from backend.lastfm import fetch_artist_top_tags, fetch_track_top_tags
+from backend.ttl_cache import TTLCache
+
+ARTIST_TAG_CACHE_MAX_ENTRIES = 20000
+ARTIST_TAG_TTL_SECONDS = 24 * 3600
+
+_artist_tags: TTLCache[list[str]] = TTLCache(ARTIST_TAG_CACHE_MAX_ENTRIES, ARTIST_TAG_TTL_SECONDS)
+register_cache("lastfm.artist_tags", _artist_tags)
+
+
+def _artist_key(artist: str) -> str:
+    return " ".join((artist or "").lower().split())
+
+
+class TagService:
+    """Tag lookups for one request; create one per enrichment run."""
+
+    def __init__(self, client: httpx.AsyncClient, *, deadline: float | None = None) -> None:
+        self._client = client
+        self._deadline = deadline
+        self._artist_calls: dict[str, asyncio.Future[list[str] | None]] = {}
+        self.stats = {"track_calls": 0, "artist_calls": 0, "artist_cache_hits": 0, "artist_shared": 0}
+
+    async def _fetch_artist(self, artist: str, key: str) -> list[str] | None:
+        self.stats["artist_calls"] += 1
+        tags = await fetch_artist_top_tags(self._client, artist, deadline=self._deadline)
+        if tags is not None:
+            _artist_tags.set(key, tags)
+        return tags
+
+    async def artist_tags(self, artist: str) -> list[str] | None:
+        """Artist top tags, or None when the lookup failed."""
+        key = _artist_key(artist)
+        cached = _artist_tags.get(key)
+        if cached is not None:
+            self.stats["artist_cache_hits"] += 1
+            return list(cached)
+        call = self._artist_calls.get(key)
+        if call is None:
+            call = asyncio.ensure_future(self._fetch_artist(artist, key))
+            self._artist_calls[key] = call
+        else:
+            self.stats["artist_shared"] += 1
+        # Shielded so a cancelled candidate does not cancel the call other candidates await.
+        tags = await asyncio.shield(call)
+        return None if tags is None else list(tags)
+
+    async def _track_only(self, artist: str, track: str) -> list[str] | None:
+        self.stats["track_calls"] += 1
+        return await fetch_track_top_tags(self._client, artist, track, deadline=self._deadline)
+
+    async def track_tags(self, artist: str, track: str) -> list[str] | None:
+        """Track tags, falling back to the (shared) artist tags.
+
+        None when no tags were found and a lookup failed, i.e. the answer is unknown.
+        """
+        track_tags = await self._track_only(artist, track)
+        if track_tags:
+            return track_tags
+        artist_tags = await self.artist_tags(artist)
+        if artist_tags:
+            return artist_tags
+        return None if track_tags is None or artist_tags is None else []
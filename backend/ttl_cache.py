@@ -0,0 +1,85 @@
+"""Size- and TTL-bounded in-process cache.
+
+Replacement for unbounded module-level dicts in long-running workers: entries
+expire after their TTL and the least recently used entry is evicted once the
+cache is full. Live entries can be exported with their remaining TTL and
+loaded into another process (see ``backend.cache_snapshot``).
+
+Safe to share between the event loop and ``asyncio.to_thread`` workers: every
+operation runs under one lock.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Generic, TypeVar
+
+V = TypeVar("V")
+D = TypeVar("D")
+
+
+class TTLCache(Generic[V]):
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._items: OrderedDict[str, tuple[V, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, default: D | None = None) -> V | D | None:
+        """The live value, else *default* (pass a sentinel when ``None`` is a cached value)."""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or item[1] <= time.monotonic():
+                if item is not None:
+                    self._items.pop(key, None)
+                self.misses += 1
+                return default
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def set(self, key: str, value: V, ttl_seconds: float | None = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._items[key] = (value, time.monotonic() + ttl)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def export_entries(self) -> list[tuple[str, V, float]]:
+        """Live entries as (key, value, remaining TTL seconds), least recently used first."""
+        now = time.monotonic()
+        # Copy under the lock: the export may run in a worker thread while requests keep writing.
+        with self._lock:
+            items = list(self._items.items())
+        return [(key, value, expires - now) for key, (value, expires) in items if expires > now]
+
+    def load_entries(self, entries: Iterable[tuple[str, V, float]]) -> int:
+        """Insert exported entries, skipping expired ones and keys already present."""
+        loaded = 0
+        for key, value, remaining in entries:
+            if remaining > 0 and key not in self:
+                self.set(key, value, remaining)
+                loaded += 1
+        return loaded
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            item = self._items.get(key)
+        return item is not None and item[1] > time.monotonic()
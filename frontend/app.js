@@ -26,6 +26,7 @@
     instrumentalOnly: byId("filter-instrumental-only"),
     vocalOnly: byId("filter-vocal-only"),
     instrumentalSimilarityOnly: byId("filter-instrumental-similarity-only"),
+    audioWeights: byId("audio-weights"),
     resolveUriMbFirst: byId("resolve-uri-mb-first"),
     advancedFilters: byId("advanced-filters"),
     resetFiltersBtn: byId("reset-filters-btn"),
@@ -68,6 +69,13 @@
   };
 
   const FETCH_SAME_ORIGIN = { credentials: "same-origin" };
+  /** Slider/filter changes re-rank the server-side candidate pool after this pause. */
+  const RERANK_DEBOUNCE_MS = 150;
+  /** Track fields the UI renders; the API drops the rest from each row (see json_response.py). */
+  const TRACK_FIELDS = [
+    "name", "artists", "album", "album_art", "preview_url", "spotify_url", "spotify_id",
+    "external_links", "bpm", "popularity", "release_year", "tags", "audio_features", "analysis_metrics"
+  ].join(",");
 
   let spotifySdkLoadPromise = null;
   let webPlayerInitPromise = null;
@@ -342,6 +350,10 @@
     tracks: [],
     breadcrumbs: [],
     seenTrackKeys: new Set(),
+    /** Candidate pool of the last full search; weight/filter changes re-rank it server-side. */
+    poolId: null,
+    /** Cursor for the next enriched page of the current pool (Discover More). */
+    nextCursor: null,
     spotifyConnected: false,
     /** Last JSON from GET /api/spotify/status (for OAuth return diagnostics). */
     spotifyLastStatus: null,
@@ -1118,7 +1130,7 @@
       payload.seed_artist = seedArtist;
       payload.seed_track = seedTrack;
     }
-    const response = await fetch("/api/similar/unified", {
+    const response = await fetch(`/api/similar/unified?fields=${TRACK_FIELDS}`, {
       method: "POST",
       headers: { "Content-Type": "application/json" },
       body: JSON.stringify(payload),
@@ -1147,8 +1159,13 @@
         const byKey = new Map(state.tracks.map((track) => [trackKey(track), track]));
         incoming.forEach((track) => byKey.set(trackKey(track), track));
         state.tracks = Array.from(byKey.values());
+        // Exclude-based fallback starts a new pool that lacks the rows already shown.
+        state.poolId = null;
+        state.nextCursor = null;
       } else {
         state.tracks = incoming;
+        state.poolId = data.pool_id || null;
+        state.nextCursor = data.next_cursor || null;
       }
       state.seed = data.seed_track || state.seed;
       state.tagCategories = data.tag_categories || {};
@@ -1196,6 +1213,111 @@
     }
   }
 
+  let rerankTimer = null;
+  let rerankSeq = 0;
+
+  function scheduleRerank() {
+    if (!state.poolId) return;
+    clearTimeout(rerankTimer);
+    rerankTimer = setTimeout(rerankPool, RERANK_DEBOUNCE_MS);
+  }
+
+  async function rerankPool() {
+    const poolId = state.poolId;
+    if (!poolId) return;
+    const seq = ++rerankSeq;
+    try {
+      const response = await fetch(`/api/similar/rerank?fields=${TRACK_FIELDS}`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({
+          pool_id: poolId,
+          limit: Math.min(250, Math.max(state.tracks.length, Number(dom.limit?.value || 20))),
+          weights: getWeights(),
+          instrumental_similarity_only: Boolean(dom.instrumentalSimilarityOnly?.checked),
+          filters: getBackendFiltersPayload()
+        }),
+        ...FETCH_SAME_ORIGIN
+      });
+      const data = await response.json().catch(() => ({}));
+      if (seq !== rerankSeq || state.poolId !== poolId) return;
+      if (response.status === 404) {
+        // Pool expired server-side: fall back to a full search with the current settings.
+        state.poolId = null;
+        reloadSearch();
+        return;
+      }
+      if (!response.ok) {
+        throw new Error(data.detail?.message || data.detail || `Re-rank failed (${response.status})`);
+      }
+      state.tracks = Array.isArray(data.similar_tracks) ? data.similar_tracks : [];
+      state.tagCategories = data.tag_categories || state.tagCategories;
+      state.tracks.forEach((track) => state.seenTrackKeys.add(trackKey(track)));
+      renderTagFilters();
+      renderResults();
+    } catch (error) {
+      if (seq === rerankSeq) setError(error.message || "Re-rank failed");
+    }
+  }
+
+  async function loadMoreFromCursor() {
+    const cursor = state.nextCursor;
+    clearError();
+    dom.loading.classList.remove("hidden");
+    try {
+      const response = await fetch(`/api/similar/more?fields=${TRACK_FIELDS}`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({
+          cursor,
+          limit: Math.min(250, Math.max(1, Number(dom.limit?.value || 20) * 2)),
+          weights: getWeights(),
+          instrumental_similarity_only: Boolean(dom.instrumentalSimilarityOnly?.checked),
+          filters: getBackendFiltersPayload()
+        }),
+        ...FETCH_SAME_ORIGIN
+      });
+      const data = await response.json().catch(() => ({}));
+      if (response.status === 404) {
+        // Pool expired: page with the older exclude-list search instead.
+        state.poolId = null;
+        state.nextCursor = null;
+        discoverMoreByExclude();
+        return;
+      }
+      if (!response.ok) {
+        throw new Error(data.detail?.message || data.detail || `Request failed (${response.status})`);
+      }
+      const byKey = new Map(state.tracks.map((track) => [trackKey(track), track]));
+      const incoming = (Array.isArray(data.similar_tracks) ? data.similar_tracks : [])
+        .filter((track) => !byKey.has(trackKey(track)));
+      incoming.forEach((track) => {
+        byKey.set(trackKey(track), track);
+        state.seenTrackKeys.add(trackKey(track));
+      });
+      state.tracks = Array.from(byKey.values());
+      state.nextCursor = data.next_cursor || null;
+      Object.assign(state.tagCategories, data.tag_categories || {});
+      renderTagFilters();
+      renderResults();
+      if (dom.appStatus) {
+        if (incoming.length === 0) {
+          dom.appStatus.textContent = state.nextCursor
+            ? "This page only matched tracks already shown; try Discover more again."
+            : "No additional tracks were found for this seed.";
+        } else if (filteredTracks().length === 0) {
+          dom.appStatus.textContent = "Loaded more tracks, but current filters hide them all. Relax filters or Reset to reveal new matches.";
+        } else {
+          dom.appStatus.textContent = `Loaded ${incoming.length} more candidate tracks.`;
+        }
+      }
+    } catch (error) {
+      setError(error.message || "Loading more tracks failed");
+    } finally {
+      dom.loading.classList.add("hidden");
+    }
+  }
+
   async function resolveUriItemsBatch(rawItems, options = {}) {
     const { statusTarget = "action", quiet = false } = options;
     const setStatus = (msg) => {
@@ -1525,6 +1647,7 @@
     renderAdvancedFilters();
     renderActiveFilterCount();
     renderResults();
+    scheduleRerank();
   }
 
   function onResultsClick(event) {
@@ -1569,7 +1692,7 @@
     state.seenTrackKeys.clear();
     runSearch(url, { exclude: [] });
   });
-  dom.reloadBtn.addEventListener("click", () => {
+  function reloadSearch() {
     const p = state.lastSearchPayload;
     if (p?.kind === "metadata") {
       runSearch("", { seedArtist: p.artist, seedTrack: p.track, skipBreadcrumbPush: true });
@@ -1577,8 +1700,10 @@
       const url = p?.kind === "url" ? p.url : state.lastQueryUrl || dom.urlInput.value.trim();
       runSearch(url, { skipBreadcrumbPush: true });
     }
-  });
-  dom.discoverMoreBtn.addEventListener("click", () => {
+  }
+
+  dom.reloadBtn.addEventListener("click", reloadSearch);
+  function discoverMoreByExclude() {
     const p = state.lastSearchPayload;
     if (p?.kind === "metadata") {
       runSearch("", {
@@ -1600,6 +1725,18 @@
         exclude: getDiscoverExcludeKeys()
       });
     }
+  }
+
+  dom.discoverMoreBtn.addEventListener("click", () => {
+    if (state.nextCursor) {
+      loadMoreFromCursor();
+      return;
+    }
+    if (state.poolId) {
+      if (dom.appStatus) dom.appStatus.textContent = "No additional tracks were found for this seed.";
+      return;
+    }
+    discoverMoreByExclude();
   });
   dom.results.addEventListener("click", onResultsClick);
   dom.quickFilters.addEventListener("click", (event) => {
@@ -1612,6 +1749,7 @@
     renderTagFilters();
     renderActiveFilterCount();
     renderResults();
+    scheduleRerank();
   });
   dom.tagSections.addEventListener("click", (event) => {
     const chip = event.target.closest("[data-tag]");
@@ -1623,21 +1761,29 @@
     renderTagFilters();
     renderActiveFilterCount();
     renderResults();
+    scheduleRerank();
   });
   [dom.popularityMin, dom.popularityMax, dom.releaseYearMin, dom.releaseYearMax, dom.instrumentalOnly, dom.vocalOnly, dom.bpmMin, dom.bpmMax, dom.instrumentalSimilarityOnly].forEach((element) => {
     element?.addEventListener("input", () => {
       renderActiveFilterCount();
       renderResults();
+      scheduleRerank();
     });
     element?.addEventListener("change", () => {
       renderActiveFilterCount();
       renderResults();
+      scheduleRerank();
     });
   });
   dom.bpmTolerance.addEventListener("input", () => {
     dom.bpmLabel.textContent = dom.bpmTolerance.value === "100" ? "Any" : `±${dom.bpmTolerance.value}%`;
     renderActiveFilterCount();
     renderResults();
+    scheduleRerank();
+  });
+  dom.audioWeights?.addEventListener("input", () => {
+    getWeights();
+    scheduleRerank();
   });
   dom.advancedFilters.addEventListener("input", (event) => {
     const container = event.target.closest("[data-adv-key]");
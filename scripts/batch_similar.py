@@ -0,0 +1,402 @@
+"""Similar tracks for a file of seeds, computed in-process without the web stack.
+
+Seeds come from CSV (header row) or JSONL, with the seed fields of the API
+(``url``, or ``seed_artist`` + ``seed_track``) and an optional ``id``. They
+run through the pipeline behind ``/api/similar/batch``. Each group of
+``--group-size`` seeds shares one enrichment pass, and ``--concurrency``
+groups run at once. Deezer, Last.fm and SoundNet calls and Spotify app-token
+searches go through process-wide limiters, and circuit breakers and the hedge
+budget are process-wide too, so extra concurrency queues at those limits
+instead of exceeding them. MusicBrainz and Odesli are capped by their shared
+connection pools and by each run's call budget.
+
+Results stream to ``--out``:
+
+* ``.jsonl``: one line per seed (``id``, ``seed``, then ``result`` or ``error``);
+* ``.parquet``: a directory of part files, one row per (seed, similar track).
+  Needs ``pyarrow``.
+
+The ids of finished seeds are appended to ``<out>.done`` once their results
+are on disk. A rerun with the same ``--out`` skips them. Seeds that failed
+upstream (5xx) are not recorded, so the rerun retries them; in JSONL output the
+last line per id wins. At the end the run prints throughput and cache hit
+rates. Run from the repo root, like the service (relative ``data/`` paths).
+
+    PYTHONPATH=. python scripts/batch_similar.py seeds.csv --out similar.jsonl --limit 50 --concurrency 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import importlib.util
+import json
+import logging
+import os
+import sys
+import time
+from collections.abc import Iterator
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("SESSION_STORE_BACKEND", "memory")
+
+from pydantic import ValidationError  # noqa: E402
+
+from backend import main as pipeline  # noqa: E402
+from backend.cache_snapshot import cache_stats, export_snapshot  # noqa: E402
+from backend.config import CACHE_SNAPSHOT_PATH  # noqa: E402
+from backend.http_clients import close_clients  # noqa: E402
+from backend.identity_registry import text_key  # noqa: E402
+from backend.json_response import _projection, parse_fields  # noqa: E402
+from backend.models import BatchSeedResult, BatchSimilarRequest, SeedSpec  # noqa: E402
+
+logger = logging.getLogger("batch_similar")
+
+MAX_GROUP_SIZE = 25  # BatchSimilarRequest.seeds
+PARQUET_ROWS_PER_PART = 5000
+PROGRESS_EVERY_SECONDS = 10.0
+SEED_KEYS = ("url", "seed_artist", "seed_track")
+
+Seed = tuple[str, SeedSpec | None, str | None]
+
+
+def read_seeds(path: str) -> Iterator[Seed]:
+    """(id, seed, validation error) per input row; the id is the ``id`` column or the seed itself."""
+    with open(path, encoding="utf-8", newline="") as fh:
+        if path.endswith(".jsonl"):
+            rows = (_json_row(line) for line in fh if line.strip())
+        else:
+            rows = csv.DictReader(fh)
+        for number, row in enumerate(rows, start=1):
+            if isinstance(row, str):
+                yield f"row-{number}", None, row
+                continue
+            raw = {key: str(row.get(key) or "").strip() for key in SEED_KEYS}
+            seed_id = str(row.get("id") or "").strip()
+            try:
+                spec = SeedSpec(**raw)
+            except ValidationError as exc:
+                yield seed_id or f"row-{number}", None, exc.errors()[0]["msg"]
+                continue
+            yield seed_id or spec.url or text_key(spec.seed_artist, spec.seed_track), spec, None
+
+
+def _json_row(line: str) -> dict | str:
+    """Parsed JSONL row, or the reason it cannot be used."""
+    try:
+        row = json.loads(line)
+    except ValueError as exc:
+        return f"Invalid JSON: {exc}"
+    return row if isinstance(row, dict) else "Invalid JSON: expected an object"
+
+
+def _read_done(path: str) -> set[str]:
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as fh:
+        return {line.rstrip("\n") for line in fh if line.strip()}
+
+
+def _is_part_file(name: str) -> bool:
+    """A finished Parquet part or the temporary file of one in progress."""
+    return (name.startswith("part-") and name.endswith(".parquet")) or (
+        name.startswith(".part-") and name.endswith(".parquet.tmp")
+    )
+
+
+class JsonlSink:
+    def __init__(self, path: str, fields: frozenset[str] | None) -> None:
+        self._fh = open(path, "a", encoding="utf-8")
+        self._include = _projection(BatchSeedResult, fields) if fields else None
+        if not isinstance(self._include, dict):
+            self._include = None
+
+    def write(self, seed_id: str, result: BatchSeedResult) -> None:
+        record = result.model_dump(mode="json", include=self._include, exclude_none=True)
+        self._fh.write(json.dumps({"id": seed_id, **record}, separators=(",", ":")) + "\n")
+
+    def flush(self, force: bool = False) -> bool:
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        return True
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+class ParquetSink:
+    """Buffers rows; each flush writes them as one complete part file.
+
+    A part file is written under a temporary name, closed (which writes the
+    Parquet footer) and only then renamed into place, so a crash never leaves
+    an unreadable part behind seeds that are already checkpointed.
+    """
+
+    def __init__(self, path: str) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._schema = pa.schema([
+            ("seed_id", pa.string()),
+            ("seed_name", pa.string()),
+            ("seed_artists", pa.list_(pa.string())),
+            ("error", pa.string()),
+            ("rank", pa.int32()),
+            ("name", pa.string()),
+            ("artists", pa.list_(pa.string())),
+            ("album", pa.string()),
+            ("spotify_id", pa.string()),
+            ("spotify_url", pa.string()),
+            ("spotify_mapping_status", pa.string()),
+            ("match_score", pa.float64()),
+            ("bpm", pa.float64()),
+            ("popularity", pa.int32()),
+            ("release_year", pa.int32()),
+            ("tags", pa.list_(pa.string())),
+            ("external_links", pa.string()),
+            ("audio_features", pa.string()),
+            ("analysis_metrics", pa.string()),
+        ])
+        self._pq = pq
+        self._path = path
+        self._rows: list[dict] = []
+
+    def write(self, seed_id: str, result: BatchSeedResult) -> None:
+        response = result.result
+        seed = response.seed_track if response else None
+        base = {
+            "seed_id": seed_id,
+            "seed_name": seed.name if seed else result.seed.seed_track,
+            "seed_artists": list(seed.artists) if seed else [result.seed.seed_artist or ""],
+            "error": result.error,
+        }
+        if response is None or not response.similar_tracks:
+            self._rows.append(base)
+            return
+        for rank, track in enumerate(response.similar_tracks, start=1):
+            self._rows.append({
+                **base,
+                "rank": rank,
+                "name": track.name,
+                "artists": list(track.artists),
+                "album": track.album,
+                "spotify_id": track.spotify_id,
+                "spotify_url": track.spotify_url,
+                "spotify_mapping_status": track.spotify_mapping_status,
+                "match_score": track.match_score,
+                "bpm": track.bpm,
+                "popularity": track.popularity,
+                "release_year": track.release_year,
+                "tags": list(track.tags),
+                "external_links": json.dumps(track.external_links) if track.external_links else None,
+                "audio_features": track.audio_features.model_dump_json() if track.audio_features else None,
+                "analysis_metrics": json.dumps(track.analysis_metrics) if track.analysis_metrics else None,
+            })
+
+    def flush(self, force: bool = False) -> bool:
+        if not self._rows or (len(self._rows) < PARQUET_ROWS_PER_PART and not force):
+            return not self._rows
+        os.makedirs(self._path, exist_ok=True)
+        name = f"part-{time.time_ns()}.parquet"
+        part = os.path.join(self._path, name)
+        # Dot-prefixed: dataset readers skip a temporary file a crash left behind.
+        tmp_path = os.path.join(self._path, f".{name}.tmp")
+        self._pq.write_table(self._pa.Table.from_pylist(self._rows, schema=self._schema), tmp_path)
+        with open(tmp_path, "rb") as fh:
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, part)
+        self._rows = []
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+class Runner:
+    def __init__(self, sink: JsonlSink | ParquetSink, done_path: str, options: dict) -> None:
+        self.sink = sink
+        self.options = options
+        self._done = open(done_path, "a", encoding="utf-8")
+        # Ids whose rows are written but may still sit in a sink buffer.
+        self._pending: list[str] = []
+        self.seeds = self.failed = self.candidate_rows = self.unique_candidates = 0
+        self.started = time.monotonic()
+
+    def record(self, seed_id: str, result: BatchSeedResult) -> None:
+        self.sink.write(seed_id, result)
+        self.seeds += 1
+        if result.error is not None:
+            self.failed += 1
+            if (result.status or 500) >= 500:
+                return
+        self._pending.append(seed_id)
+
+    def checkpoint(self, force: bool = False) -> None:
+        if self.sink.flush(force) and self._pending:
+            self._done.write("".join(f"{seed_id}\n" for seed_id in self._pending))
+            self._done.flush()
+            os.fsync(self._done.fileno())
+            self._pending = []
+
+    async def run_group(self, group: list[tuple[str, SeedSpec]]) -> None:
+        req = BatchSimilarRequest(seeds=[spec for _, spec in group], **self.options)
+        try:
+            response = await pipeline._similar_batch(req, None, store_pools=False)
+        except Exception as exc:
+            logger.warning("Group of %d seeds failed: %s", len(group), exc)
+            for seed_id, spec in group:
+                self.record(seed_id, BatchSeedResult(seed=spec, error=f"Group failed: {exc}", status=500))
+            return
+        self.candidate_rows += response.candidate_rows
+        self.unique_candidates += response.unique_candidates
+        for (seed_id, _), result in zip(group, response.results):
+            self.record(seed_id, result)
+        self.checkpoint()
+
+    def close(self) -> None:
+        self.checkpoint(force=True)
+        self.sink.close()
+        self._done.close()
+
+    def progress(self) -> str:
+        elapsed = time.monotonic() - self.started
+        return f"{self.seeds} seeds ({self.failed} failed) in {elapsed:.0f}s, {self.seeds / max(elapsed, 1e-9):.2f} seeds/s"
+
+
+def _hit_rate(hits: int, misses: int) -> str:
+    total = hits + misses
+    return f"{hits / total:.1%} of {total}" if total else "unused"
+
+
+def report(runner: Runner) -> None:
+    print(runner.progress())
+    if runner.candidate_rows:
+        print(
+            f"candidate rows {runner.candidate_rows}, enriched {runner.unique_candidates} "
+            f"({1 - runner.unique_candidates / runner.candidate_rows:.1%} shared)"
+        )
+    print("cache hit rates:")
+    for name, stats in sorted(cache_stats().items()):
+        print(f"  {name:<28} {_hit_rate(stats['hits'], stats['misses']):>16}   {stats['entries']} entries")
+    print(f"enrichment totals: {dict(pipeline._enrich_totals)}")
+
+
+async def run(args: argparse.Namespace, options: dict, out_path: str, done_path: str) -> None:
+    done = _read_done(done_path)
+    if args.out.endswith(".parquet"):
+        sink: JsonlSink | ParquetSink = ParquetSink(out_path)
+    else:
+        sink = JsonlSink(out_path, parse_fields(args.fields))
+    runner = Runner(sink, done_path, options)
+
+    await pipeline._warm_up()
+    print(f"warm-up: {pipeline._warmup_state}")
+
+    groups: asyncio.Queue[list[tuple[str, SeedSpec]] | None] = asyncio.Queue(maxsize=args.concurrency * 2)
+
+    async def worker() -> None:
+        while (group := await groups.get()) is not None:
+            await runner.run_group(group)
+
+    async def progress() -> None:
+        while True:
+            await asyncio.sleep(PROGRESS_EVERY_SECONDS)
+            print(runner.progress(), flush=True)
+
+    workers = [asyncio.create_task(worker()) for _ in range(args.concurrency)]
+    ticker = asyncio.create_task(progress())
+    skipped = 0
+    seen: set[str] = set()
+    group: list[tuple[str, SeedSpec]] = []
+    try:
+        for seed_id, spec, error in read_seeds(args.seeds):
+            if seed_id in done or seed_id in seen:
+                skipped += 1
+                continue
+            seen.add(seed_id)
+            if spec is None:
+                runner.record(seed_id, BatchSeedResult.model_construct(
+                    seed=SeedSpec.model_construct(url="", seed_artist=None, seed_track=None),
+                    result=None, error=error, status=422,
+                ))
+                continue
+            group.append((seed_id, spec))
+            if len(group) >= args.group_size:
+                await groups.put(group)
+                group = []
+        if group:
+            await groups.put(group)
+        for _ in workers:
+            await groups.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        ticker.cancel()
+        for task in workers:
+            task.cancel()
+        runner.close()
+        await close_clients()
+        if CACHE_SNAPSHOT_PATH and args.save_snapshot:
+            print(f"cache snapshot: {export_snapshot(CACHE_SNAPSHOT_PATH)}")
+    if skipped:
+        print(f"skipped {skipped} seeds already done or repeated")
+    report(runner)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("seeds", help="CSV or .jsonl file of seeds")
+    parser.add_argument("--out", required=True, help=".jsonl file, or .parquet directory (needs pyarrow)")
+    parser.add_argument("--limit", type=int, default=20, help="similar tracks per seed")
+    parser.add_argument("--group-size", type=int, default=8, help=f"seeds per shared enrichment pass (1-{MAX_GROUP_SIZE})")
+    parser.add_argument("--concurrency", type=int, default=4, help="groups in flight")
+    parser.add_argument(
+        "--options", default="{}",
+        help="JSON of further /api/similar/batch options (weights, filters, exclude, strict_mapped_only, ...)",
+    )
+    parser.add_argument("--fields", help="JSONL only: comma-separated track fields to keep")
+    parser.add_argument("--restart", action="store_true", help="ignore and replace an existing checkpoint")
+    parser.add_argument(
+        "--no-save-snapshot", dest="save_snapshot", action="store_false",
+        help="do not write CACHE_SNAPSHOT_PATH at the end",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+
+    if not 1 <= args.group_size <= MAX_GROUP_SIZE:
+        parser.error(f"--group-size must be between 1 and {MAX_GROUP_SIZE}")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    try:
+        options = {**json.loads(args.options), "limit": args.limit}
+        options.pop("seeds", None)
+        options.pop("merge", None)
+        BatchSimilarRequest(seeds=[SeedSpec(url="spotify:track:0")], **options)
+    except (ValueError, ValidationError) as exc:
+        parser.error(f"--options: {exc}")
+    if args.out.endswith(".parquet"):
+        if importlib.util.find_spec("pyarrow") is None:
+            parser.error("Parquet output needs pyarrow (pip install pyarrow); use a .jsonl --out instead")
+    elif args.fields:
+        try:
+            parse_fields(args.fields)
+        except Exception as exc:
+            parser.error(str(getattr(exc, "detail", exc)))
+
+    out_path = os.path.abspath(args.out)
+    done_path = f"{out_path.rstrip(os.sep)}.done"
+    if args.restart:
+        parts = [
+            os.path.join(out_path, name)
+            for name in os.listdir(out_path)
+            if _is_part_file(name)
+        ] if os.path.isdir(out_path) else [out_path]
+        for path in (done_path, *parts):
+            if os.path.isfile(path):
+                os.remove(path)
+    asyncio.run(run(args, options, out_path, done_path))
+
+
+if __name__ == "__main__":
+    main()
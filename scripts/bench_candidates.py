@@ -0,0 +1,102 @@
+"""CPU and memory benchmark for candidate rows and pool ranking.
+
+Compares pydantic ``TrackInfo`` rows (validated construction + deep copy per
+rerank, as the pipeline used to do) with slotted ``Candidate`` rows (shallow
+copy, ``model_construct`` only for response rows), then times a full
+``_rank_candidate_pool`` rerank over a synthetic pool.
+
+    PYTHONPATH=. python scripts/bench_candidates.py --tracks 250 --repeat 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("HTTP_PREWARM_ON_STARTUP", "false")
+os.environ.setdefault("IDENTITY_REGISTRY_BACKEND", "none")
+
+from backend.candidate import Candidate  # noqa: E402
+from backend.candidate_pool import CandidatePool  # noqa: E402
+from backend.models import AudioWeights, SimilarityFilters, TrackInfo  # noqa: E402
+
+TAGS = ["rock", "indie", "ambient", "instrumental", "vocal", "jazz", "electronic", "post-rock", "female vocalists"]
+
+
+def _fields(i: int) -> dict:
+    rng = random.Random(i)
+    return {
+        "name": f"Track {i}",
+        "artists": [f"Artist {i % 40}"],
+        "album": f"Album {i % 60}",
+        "album_art": f"https://img.example/{i}.jpg",
+        "preview_url": f"https://cdn.example/{i}.mp3" if i % 3 else None,
+        "spotify_id": f"id{i:020d}" if i % 5 else None,
+        "mapping_source": "app_isrc_search" if i % 5 else None,
+        "spotify_mapping_status": "mapped" if i % 5 else "unmapped",
+        "match_score": rng.random(),
+        "bpm": 70.0 + rng.random() * 90 if i % 4 else None,
+        "tags": rng.sample(TAGS, 4),
+        "external_links": {"deezer": f"https://deezer.example/{i}"},
+    }
+
+
+def _measure(label: str, fn, repeat: int) -> None:
+    fn()
+    tracemalloc.start()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = (time.perf_counter() - started) / repeat
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<44} {elapsed * 1000:8.2f} ms/run   peak {peak / 1024:8.1f} KiB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tracks", type=int, default=250)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    rows = [_fields(i) for i in range(args.tracks)]
+    models = [TrackInfo(**row) for row in rows]
+    candidates = [Candidate(**row) for row in rows]
+
+    print(f"{args.tracks} tracks, {args.repeat} runs each (timings under tracemalloc)")
+    _measure("TrackInfo: construct rows", lambda: [TrackInfo(**row) for row in rows], args.repeat)
+    _measure("Candidate: construct rows", lambda: [Candidate(**row) for row in rows], args.repeat)
+    _measure("TrackInfo: deep copy per rerank", lambda: [m.model_copy(deep=True) for m in models], args.repeat)
+    _measure("Candidate: shallow copy per rerank", lambda: [c.copy() for c in candidates], args.repeat)
+    _measure("Candidate: to_info for response rows", lambda: [c.to_info() for c in candidates], args.repeat)
+
+    from backend.main import _rank_candidate_pool
+
+    pool = CandidatePool(
+        seed=Candidate(name="Seed", artists=["Seed Artist"], tags=TAGS[:3], bpm=120.0),
+        seed_tags=TAGS[:3],
+        limit=args.tracks,
+        strict_mapped_only=False,
+        use_metadata_fallback=True,
+        lastfm_rows=[],
+        listener_tracks=candidates[: args.tracks // 2],
+        audio_tracks=candidates,
+    )
+    _measure(
+        f"_rank_candidate_pool (limit={args.tracks})",
+        lambda: _rank_candidate_pool(
+            pool,
+            weights=AudioWeights(),
+            instrumental_similarity_only=False,
+            filters=SimilarityFilters(),
+        ),
+        args.repeat,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Train the tag + BPM -> audio-feature model from recorded feature samples.
+
+Reads the samples the service recorded (``FEATURE_SAMPLES_PATH``, or any
+number of sample databases from several replicas), scores a ridge fit on a
+held-out split against the hand-written tag table, then refits on every
+sample and writes the weights to ``TAG_FEATURE_MODEL_PATH``. Needs NumPy
+(``pip install numpy``); the service itself does not.
+
+    PYTHONPATH=. python scripts/train_tag_model.py --alpha 1.0 --min-tag-count 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from backend.config import FEATURE_SAMPLES_PATH, TAG_FEATURE_MODEL_PATH  # noqa: E402
+from backend.feature_samples import SqliteFeatureSampleStore  # noqa: E402
+from backend.tag_categories import TagVocabulary  # noqa: E402
+from backend.tag_model import fit, mean_abs_error, save_model, split_holdout  # noqa: E402
+
+
+def _estimator(vocab: TagVocabulary):
+    def estimate(tags: list[str], bpm: float | None) -> dict[str, float]:
+        return vocab.features(vocab.encode(tags), bpm).model_dump()
+
+    return estimate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--samples", nargs="+", default=[FEATURE_SAMPLES_PATH], help="sample sqlite files")
+    parser.add_argument("--out", default=TAG_FEATURE_MODEL_PATH)
+    parser.add_argument("--alpha", type=float, default=1.0, help="ridge penalty")
+    parser.add_argument("--min-tag-count", type=int, default=3, help="tags seen on fewer samples are dropped")
+    parser.add_argument("--max-tags", type=int, default=2000)
+    parser.add_argument("--holdout", type=float, default=0.2, help="fraction scored before the final refit")
+    parser.add_argument("--min-samples", type=int, default=200)
+    parser.add_argument("--dry-run", action="store_true", help="report holdout errors without writing")
+    args = parser.parse_args()
+
+    by_key = {}
+    for path in args.samples:
+        if not os.path.exists(path):
+            parser.error(f"no sample database at {path}")
+        for sample in SqliteFeatureSampleStore(path).iter_samples():
+            current = by_key.get(sample.key())
+            if current is None or sample.updated_at > current.updated_at:
+                by_key[sample.key()] = sample
+    samples = list(by_key.values())
+    print(f"{len(samples)} samples from {len(args.samples)} file(s)")
+    if len(samples) < args.min_samples:
+        sys.exit(f"need at least {args.min_samples} samples to train; keep the tag table for now")
+
+    fit_kwargs = {"alpha": args.alpha, "min_tag_count": args.min_tag_count, "max_tags": args.max_tags}
+    train, holdout = split_holdout(samples, args.holdout)
+    if holdout:
+        candidate = fit(train, **fit_kwargs)
+        report = {
+            "table": mean_abs_error(holdout, _estimator(TagVocabulary())),
+            "model": mean_abs_error(holdout, _estimator(TagVocabulary(candidate))),
+        }
+        print(f"holdout MAE on {len(holdout)} samples (tempo on the 0-1 scale, BPM-less tracks only):")
+        print(json.dumps(report, indent=2))
+    else:
+        report = {}
+
+    model = fit(samples, **fit_kwargs)
+    model.meta["holdout_mae"] = report
+    print(f"{model.meta['tags']} tags in the model")
+    if args.dry_run:
+        return
+    save_model(model, args.out)
+    print(f"wrote {args.out} ({os.path.getsize(args.out) / 1024:.1f} KiB)")
+
+
+if __name__ == "__main__":
+    main()